@@ -2,10 +2,14 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
+from shared.serializers import SparseFieldsMixin
+
 from .models import Plan
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    full_name = serializers.SerializerMethodField(read_only=True)
+
     class Meta:
         model = get_user_model()
         fields = [
@@ -19,12 +23,11 @@ class UserSerializer(serializers.ModelSerializer):
             "created_at",
             "is_active",
             "email_confirmed",
+            "full_name",
         ]
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["full_name"] = f"{instance.first_name} {instance.last_name}"
-        return representation
+    def get_full_name(self, obj):
+        return f"{obj.first_name} {obj.last_name}"
 
 
 class UserRegisterSerializer(serializers.ModelSerializer):
@@ -8,6 +8,7 @@ from rest_framework.views import APIView
 
 from core.serializers import ClinicSerializer
 from shared.email import TemplateEmail
+from shared.planner import plan_queryset
 
 from .models import PasswordResetToken, Plan
 from .serializers import (
@@ -106,7 +107,10 @@ class UserMeApi(APIView):
             {
                 "user": UserSerializer(request.user).data,
                 "plan": PlanSerializer(plan).data,
-                "clinics": ClinicSerializer(request.user.clinics.all(), many=True).data,
+                "clinics": ClinicSerializer(
+                    plan_queryset(request.user.clinics.all(), ClinicSerializer),
+                    many=True,
+                ).data,
             },
             status=status.HTTP_200_OK,
         )
@@ -0,0 +1,53 @@
+"""
+Benchmarks for the API's hot paths.
+
+Each module is a script run from the project root, for example
+`python -m benchmarks.bench_serializers`. Benchmarks that need rows create a
+throwaway test database with the same settings the test suite uses.
+"""
+import contextlib
+import os
+import time
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def best_of(function, repeat=5):
+    """Return the fastest of `repeat` runs of `function`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def report(name, seconds, rows=None):
+    line = f"{name:<40} {seconds * 1000:10.2f} ms"
+    if rows:
+        line += f" {rows / seconds:14,.0f} rows/s"
+    print(line)
@@ -0,0 +1,73 @@
+"""
+Total time and peak memory of the columnar order item export, as Parquet and
+as an Arrow IPC stream. Arrow buffers are outside tracemalloc, so the Arrow
+memory pool's peak is reported too.
+
+    python -m benchmarks.bench_analytics [rows]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks import report, setup, test_database
+
+setup()
+
+import pyarrow as pa  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.models import Order, OrderItem, Product  # noqa: E402
+
+
+def create_rows(count):
+    owner = get_user_model().objects.create(
+        email="owner@bench.com", first_name="a", last_name="b"
+    )
+    products = Product.objects.bulk_create(
+        Product(created_by=owner, name=f"Product {i}", sku=f"SKU-{i}", price=1)
+        for i in range(100)
+    )
+    orders = Order.objects.bulk_create(
+        (Order(created_by=owner) for _ in range(count // 10)), batch_size=5000
+    )
+    OrderItem.objects.bulk_create(
+        (
+            OrderItem(
+                order=orders[index // 10],
+                product=products[index % 100],
+                price=f"{index % 1000}.{index % 100:02}",
+                quantity=index % 7 + 1,
+            )
+            for index in range(count)
+        ),
+        batch_size=5000,
+    )
+    return owner
+
+
+def main(count):
+    client = APIClient()
+    client.force_authenticate(create_rows(count))
+    pool = pa.default_memory_pool()
+    for extension in ("parquet", "arrows"):
+        path = f"/analytics/order-items.{extension}"
+        started = time.perf_counter()
+        size = sum(len(chunk) for chunk in client.get(path).streaming_content)
+        report(f"{extension} {size / 1e6:.1f} MB", time.perf_counter() - started, count)
+
+        # A second pass for the memory, as tracing slows everything down.
+        tracemalloc.start()
+        for chunk in client.get(path).streaming_content:
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{extension} peak Python memory {peak / 1e6:.1f} MB, "
+            f"Arrow pool {pool.max_memory() / 1e6:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
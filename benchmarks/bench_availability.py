@@ -0,0 +1,89 @@
+"""
+Month-long free-slot search for every doctor of a clinic, over a table of
+reservations spread across a year.
+
+    python -m benchmarks.bench_availability [reservations]
+"""
+import datetime
+import sys
+
+from benchmarks import best_of, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.models import Clinic, Patient, Reservation, Staff  # noqa: E402
+
+DOCTORS = 40
+WORKING_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def create_rows(count):
+    User = get_user_model()
+    owner = User.objects.create(email="owner@bench.com", first_name="a", last_name="b")
+    clinic = Clinic.objects.create(
+        name="Clinic",
+        created_by=owner,
+        opening_hour=datetime.time(8),
+        closing_hour=datetime.time(18),
+    )
+    members = User.objects.bulk_create(
+        User(email=f"{index}@bench.com", first_name="Doc", last_name=str(index))
+        for index in range(DOCTORS)
+    )
+    clinic.members.add(*members)
+    doctors = Staff.objects.bulk_create(
+        Staff(
+            user=member,
+            staff_type=Staff.StaffType.DOCTOR,
+            working_days=WORKING_DAYS,
+        )
+        for member in members
+    )
+    patient = Patient.objects.create(clinic=clinic, first_name="P", age=30)
+
+    start = datetime.date.today() - datetime.timedelta(days=180)
+    batch = []
+    for index in range(count):
+        doctor = doctors[index % DOCTORS]
+        day, hour = divmod(index // DOCTORS, 10)
+        batch.append(
+            Reservation(
+                reservation_number=str(index),
+                patient=patient,
+                doctor=doctor,
+                reservation_date=start + datetime.timedelta(days=day % 365),
+                start_time=datetime.time(8 + hour),
+                end_time=datetime.time(8 + hour, 30),
+            )
+        )
+        if len(batch) == 5000:
+            Reservation.objects.bulk_create(batch)
+            batch = []
+    Reservation.objects.bulk_create(batch)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE core_reservation")
+    return owner
+
+
+def main(count):
+    client = APIClient()
+    client.force_authenticate(create_rows(count))
+    start = datetime.date.today()
+    end = start + datetime.timedelta(days=30)
+    url = f"/availability?start_date={start}&end_date={end}&duration=30"
+
+    response = client.get(url)
+    assert response.status_code == 200, response.content
+    slots = sum(len(doctor["slots"]) for doctor in response.json()["results"])
+    report(
+        f"{DOCTORS} doctors, 31 days ({slots} slots)", best_of(lambda: client.get(url))
+    )
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,75 @@
+"""
+Latency and query count of the dashboard: the /products/stats,
+/staff/stats and /patient/stats calls against the single /dashboard call,
+with a cold stats cache.
+
+    python -m benchmarks.bench_dashboard [rows]
+"""
+import sys
+
+from benchmarks import best_of, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.inventory import rebuild_summaries  # noqa: E402
+from core.models import Clinic, Patient, Product, Staff  # noqa: E402
+
+
+def create_rows(count):
+    User = get_user_model()
+    owner = User.objects.create(email="owner@bench.com", first_name="a", last_name="b")
+    clinic = Clinic.objects.create(name="Clinic", created_by=owner)
+    Product.objects.bulk_create(
+        Product(created_by=owner, name=f"Product {index}", price=index % 100 + 1)
+        for index in range(count)
+    )
+    rebuild_summaries([owner.id])
+    members = User.objects.bulk_create(
+        User(email=f"{index}@bench.com", first_name="a", last_name="b")
+        for index in range(count // 10)
+    )
+    staff_types = list(Staff.StaffType)
+    Staff.objects.bulk_create(
+        Staff(
+            created_by=owner,
+            user=member,
+            staff_type=staff_types[index % len(staff_types)],
+            working_days=["Monday"],
+        )
+        for index, member in enumerate(members)
+    )
+    Patient.objects.bulk_create(
+        Patient(clinic=clinic, first_name=f"P{index}", age=30, is_active=index % 2)
+        for index in range(count)
+    )
+    return owner
+
+
+def main(count):
+    client = APIClient()
+    client.force_authenticate(create_rows(count))
+
+    def separate():
+        cache.clear()
+        for url in ("/products/stats", "/staff/stats", "/patient/stats"):
+            client.get(url)
+
+    def dashboard():
+        cache.clear()
+        client.get("/dashboard")
+
+    for name, flow in (("three calls", separate), ("/dashboard", dashboard)):
+        with CaptureQueriesContext(connection) as context:
+            flow()
+        report(f"{name} ({len(context.captured_queries)} queries)", best_of(flow))
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,64 @@
+"""
+Time to first byte, total time and peak Python memory of the product
+export, as CSV and as .xlsx. The .xlsx writer needs lxml to keep its memory
+flat.
+
+    python -m benchmarks.bench_export [rows]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks import report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from core.models import Product  # noqa: E402
+
+
+def create_rows(count):
+    owner = get_user_model().objects.create(
+        email="owner@bench.com", first_name="a", last_name="b"
+    )
+    Product.objects.bulk_create(
+        (
+            Product(
+                created_by=owner,
+                name=f"Product {index}",
+                sku=f"SKU-{index}",
+                price=index % 100 + 1,
+            )
+            for index in range(count)
+        ),
+        batch_size=5000,
+    )
+    return owner
+
+
+def main(count):
+    client = APIClient()
+    client.force_authenticate(create_rows(count))
+    for extension in ("csv", "xlsx"):
+        started = time.perf_counter()
+        response = client.get(f"/export/products.{extension}")
+        content = iter(response.streaming_content)
+        size = len(next(content))
+        report(f"{extension} first byte", time.perf_counter() - started)
+        size += sum(len(chunk) for chunk in content)
+        report(f"{extension} {size / 1e6:.0f} MB", time.perf_counter() - started, count)
+
+        # A second pass for the memory, as tracing slows everything down.
+        tracemalloc.start()
+        for chunk in client.get(f"/export/products.{extension}").streaming_content:
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{extension} peak Python memory {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,72 @@
+"""
+Throughput of the product import engine on a generated catalog, with names
+resolved against categories and vendors, then of an upsert re-sync of the
+same catalog with 1% of the rows changed.
+
+    python -m benchmarks.bench_import [rows]
+"""
+import sys
+
+from benchmarks import best_of, report, setup, test_database
+
+setup()
+
+import pandas as pd  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from core.imports import ProductImporter  # noqa: E402
+from core.models import Category, Product, Vendor  # noqa: E402
+
+
+def create_frame(owner, count):
+    categories = [Category.objects.create(name=f"Category {i}") for i in range(20)]
+    vendors = [
+        Vendor.objects.create(
+            created_by=owner,
+            name=f"Vendor {i}",
+            email=f"{i}@vendor.com",
+            phone_number="1",
+            location="Nairobi",
+        )
+        for i in range(10)
+    ]
+    return pd.DataFrame(
+        {
+            "name": [f"PRODUCT {i}" for i in range(count)],
+            "price": [f"{i % 3000:,}.50" for i in range(count)],
+            "stock": [i % 60 for i in range(count)],
+            "category": [categories[i % 20].name.upper() for i in range(count)],
+            "vendor": [vendors[i % 10].name for i in range(count)],
+        }
+    )
+
+
+def main(count):
+    owner = get_user_model().objects.create(
+        email="owner@bench.com", first_name="a", last_name="b"
+    )
+    df = create_frame(owner, count)
+
+    timings = []
+    for _ in range(3):
+        # A queryset delete() would send a signal per product.
+        with connection.cursor() as cursor:
+            cursor.execute("TRUNCATE core_product, core_inventorysummary CASCADE")
+        timings.append(best_of(lambda: ProductImporter(owner).run(df), repeat=1))
+    report(f"import {count} products", min(timings), count)
+
+    df["sku"] = df["name"].map(dict(Product.objects.values_list("name", "sku")))
+    runs = iter(range(1, 100))
+
+    def resync():
+        changed = df.copy()
+        changed.loc[changed.index[::100], "stock"] = next(runs)
+        ProductImporter(owner, mode="Upsert").run(changed)
+
+    report(f"upsert {count} products, 1% changed", best_of(resync, repeat=3), count)
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,96 @@
+"""
+Render and parse time of DRF's stdlib JSON renderer and parser against the
+orjson ones on synthetic order and reservation list payloads.
+
+    python -m benchmarks.bench_json [rows]
+"""
+import datetime
+import decimal
+import io
+import sys
+import uuid
+
+from benchmarks import best_of, report, setup
+
+setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from shared.parsers import ORJSONParser  # noqa: E402
+from shared.renderers import ORJSONRenderer  # noqa: E402
+
+NOW = datetime.datetime(2024, 7, 15, 9, 30, 0, 123456, tzinfo=datetime.timezone.utc)
+
+
+def user():
+    return {
+        "id": uuid.uuid4(),
+        "email": "doctor@clinic.com",
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "full_name": "Jane Doe",
+    }
+
+
+def order(index):
+    return {
+        "id": uuid.uuid4(),
+        "order_number": 100000 + index,
+        "created_at": NOW,
+        "updated_at": NOW,
+        "created_by": user(),
+        "vendor": {"id": uuid.uuid4(), "name": "Vendor", "created_by": uuid.uuid4()},
+        "all_products": 5,
+        "received_products": 2,
+        "order_totals": decimal.Decimal("1234.50"),
+        "products": [
+            {
+                "id": uuid.uuid4(),
+                "quantity": item,
+                "price": decimal.Decimal("12.30"),
+                "total": decimal.Decimal("36.90"),
+                "status": "Pending",
+                "product": {"id": uuid.uuid4(), "name": f"Product {item}"},
+            }
+            for item in range(5)
+        ],
+    }
+
+
+def reservation(index):
+    return {
+        "id": uuid.uuid4(),
+        "created_at": NOW,
+        "updated_at": NOW,
+        "reservation_date": datetime.date(2024, 7, 15),
+        "start_time": datetime.time(9, 30),
+        "end_time": datetime.time(10),
+        "status": "Confirmed",
+        "created_by": user(),
+        "doctor": {"id": uuid.uuid4(), "user": user(), "working_days": ["Monday"]},
+        "patient": {"id": uuid.uuid4(), "first_name": "John", "age": 40 + index % 40},
+    }
+
+
+def main(count):
+    payloads = {
+        "orders": {"next": None, "previous": None, "results": []},
+        "reservations": {"next": None, "previous": None, "results": []},
+    }
+    payloads["orders"]["results"] = [order(index) for index in range(count)]
+    payloads["reservations"]["results"] = [reservation(index) for index in range(count)]
+
+    for name, payload in payloads.items():
+        body = JSONRenderer().render(payload)
+        assert ORJSONRenderer().render(payload) == body
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            seconds = best_of(lambda: renderer.render(payload))
+            report(f"{name} render {type(renderer).__name__}", seconds, count)
+        for parser in (JSONParser(), ORJSONParser()):
+            seconds = best_of(lambda: parser.parse(io.BytesIO(body)))
+            report(f"{name} parse {type(parser).__name__}", seconds, count)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,86 @@
+"""
+Per-render latency of the order PDF (templates/order.html), parsing the
+stylesheets and loading the fonts for every render as before, then with the
+parsed stylesheets cached. Last, a read of the rendered PDF from a throwaway
+PDF cache.
+
+    python -m benchmarks.bench_pdf [items]
+"""
+import sys
+import tempfile
+
+from benchmarks import best_of, report, setup, test_database
+
+
+def report_versions():
+    try:
+        import weasyprint
+        from weasyprint.text.ffi import pango
+    except OSError as exc:
+        sys.exit(f"WeasyPrint cannot load Pango (needs libpango >= 1.44): {exc}")
+    # Encoded as major * 10000 + minor * 100 + micro.
+    major, rest = divmod(pango.pango_version(), 10000)
+    minor, micro = divmod(rest, 100)
+    print(f"WeasyPrint {weasyprint.__version__}, Pango {major}.{minor}.{micro}")
+
+
+setup()
+# Before core.utils, which imports WeasyPrint.
+report_versions()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+from core.models import Clinic, Order, OrderItem, Product, Vendor  # noqa: E402
+from core.utils import generate_order_pdf, render_order_pdf  # noqa: E402
+from shared.pdf import clear_stylesheets  # noqa: E402
+
+
+def create_order(count):
+    owner = get_user_model().objects.create(
+        email="owner@bench.com", first_name="a", last_name="b"
+    )
+    Clinic.objects.create(name="Clinic", created_by=owner, location="Nairobi")
+    vendor = Vendor.objects.create(
+        created_by=owner,
+        name="Vendor",
+        email="vendor@bench.com",
+        phone_number="1",
+        location="Nairobi",
+    )
+    order = Order.objects.create(created_by=owner, vendor=vendor, notes="Urgent")
+    for index in range(count):
+        product = Product.objects.create(
+            created_by=owner, name=f"Product {index}", price=index + 1
+        )
+        OrderItem.objects.create(order=order, product=product, price=index + 1)
+    return order
+
+
+def main(count):
+    order = create_order(count)
+    request = RequestFactory().get("/")
+
+    def uncached():
+        clear_stylesheets()
+        render_order_pdf(order, request)
+
+    render_order_pdf(order, request)
+    report(f"order pdf, {count} items, parsed each time", best_of(uncached, 10))
+    report(
+        f"order pdf, {count} items, cached stylesheets",
+        best_of(lambda: render_order_pdf(order, request), 10),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        with override_settings(PDF_CACHE_DIR=directory):
+            generate_order_pdf(order, request)
+            report(
+                f"order pdf, {count} items, from the PDF cache",
+                best_of(lambda: generate_order_pdf(order, request), 10),
+            )
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
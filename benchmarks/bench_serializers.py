@@ -0,0 +1,105 @@
+"""
+Rows per second of the ModelSerializer classes against the values-based
+FastSerializer on the product, patient and reservation lists.
+
+    python -m benchmarks.bench_serializers [rows]
+"""
+import datetime
+import sys
+import uuid
+
+from benchmarks import best_of, report, setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from core.models import (  # noqa: E402
+    Category,
+    Clinic,
+    Patient,
+    Product,
+    Reservation,
+    Staff,
+    Vendor,
+)
+from core.serializers import (  # noqa: E402
+    PatientSerializer,
+    ProductSerializer,
+    ReservationSerializer,
+)
+from shared.fast import get_fast_serializer  # noqa: E402
+from shared.planner import plan_queryset  # noqa: E402
+
+
+def create_rows(count):
+    User = get_user_model()
+    owner = User.objects.create(email="owner@bench.com", first_name="a", last_name="b")
+    vendor = Vendor.objects.create(
+        created_by=owner, name="Vendor", email="v@bench.com", phone_number="1"
+    )
+    category = Category.objects.create(name="Category")
+    clinic = Clinic.objects.create(name="Clinic", created_by=owner)
+    members = User.objects.bulk_create(
+        User(email=f"{uuid.uuid4().hex}@bench.com", first_name="a", last_name="b")
+        for _ in range(10)
+    )
+    clinic.members.add(*members)
+    doctors = Staff.objects.bulk_create(
+        Staff(created_by=owner, user=member, working_days=["Monday"])
+        for member in members
+    )
+
+    Product.objects.bulk_create(
+        Product(
+            created_by=owner,
+            vendor=vendor,
+            category=category,
+            name=f"Product {index}",
+            price=index,
+            stock_number=index % 40,
+        )
+        for index in range(count)
+    )
+    patients = Patient.objects.bulk_create(
+        Patient(created_by=owner, clinic=clinic, first_name=f"P{index}", age=30)
+        for index in range(count)
+    )
+    Reservation.objects.bulk_create(
+        Reservation(
+            created_by=owner,
+            patient=patient,
+            doctor=doctors[index % len(doctors)],
+            reservation_date=datetime.date.today(),
+            start_time=datetime.time(9),
+            end_time=datetime.time(10),
+        )
+        for index, patient in enumerate(patients)
+    )
+
+
+def main(count):
+    create_rows(count)
+    for model, serializer_class in (
+        (Product, ProductSerializer),
+        (Patient, PatientSerializer),
+        (Reservation, ReservationSerializer),
+    ):
+        queryset = model.objects.all()
+        fast_serializer = get_fast_serializer(serializer_class)
+
+        def serializer():
+            return serializer_class(
+                plan_queryset(queryset, serializer_class), many=True
+            ).data
+
+        def fast():
+            return fast_serializer.serialize(fast_serializer.values(queryset))
+
+        report(f"{serializer_class.__name__}", best_of(serializer, 3), count)
+        report(f"FastSerializer({serializer_class.__name__})", best_of(fast, 3), count)
+
+
+if __name__ == "__main__":
+    with test_database():
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
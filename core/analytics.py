@@ -0,0 +1,302 @@
+"""
+Typed columnar exports of the owner's orders, order items, reservations and
+patients, for pandas, Polars or DuckDB.
+
+The column types come from the model fields: prices stay exact as
+`decimal128`, dates and times keep their types, and timestamps are in UTC.
+Rows are read with a server-side cursor and converted to Arrow record
+batches of ANALYTICS_BATCH_SIZE rows. Each batch is written out before the
+next is read, so an export of millions of rows never holds the whole table.
+
+Formats:
+- Parquet: each batch is a zstd-compressed row group.
+- Arrow IPC file (`.arrow`, the Feather v2 format).
+- Arrow IPC stream (`.arrows`): can be sent while it is written.
+"""
+import io
+import tempfile
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Sum,
+    TextField,
+)
+from django.db.models.functions import Cast
+from django.http import FileResponse, StreamingHttpResponse
+
+from .exports import EXPORT_CHUNK_SIZE
+from .models import Order, OrderItem, Patient, Reservation
+from .schedule import get_user_clinic
+
+ANALYTICS_BATCH_SIZE = 65536
+COMPRESSION = "zstd"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.file"
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+# By Field.get_internal_type(); decimals and relations are handled apart.
+ARROW_TYPES = {
+    "AutoField": pa.int32(),
+    "BigAutoField": pa.int64(),
+    "BigIntegerField": pa.int64(),
+    "BooleanField": pa.bool_(),
+    "CharField": pa.string(),
+    "DateField": pa.date32(),
+    "DateTimeField": pa.timestamp("us", tz="UTC"),
+    "FloatField": pa.float64(),
+    "IntegerField": pa.int32(),
+    "PositiveIntegerField": pa.int64(),
+    "SmallIntegerField": pa.int16(),
+    "TextField": pa.string(),
+    "TimeField": pa.time64("us"),
+    "UUIDField": pa.string(),
+}
+# Money computed in the database.
+Money = DecimalField(max_digits=18, decimal_places=2)
+
+
+def resolve_field(queryset, lookup):
+    """The model field, or annotation output field, `lookup` reads."""
+    if lookup in queryset.query.annotations:
+        field = queryset.query.annotations[lookup].output_field
+    else:
+        model = queryset.model
+        for name in lookup.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model
+    # A foreign key holds the value of the field it points to.
+    while field.is_relation:
+        field = field.target_field
+    return field
+
+
+def arrow_type(field):
+    if field.get_internal_type() == "DecimalField":
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    return ARROW_TYPES[field.get_internal_type()]
+
+
+class AnalyticsExport:
+    # The lookups read, which are also the column names.
+    fields = ()
+
+    def get_queryset(self, user):
+        raise NotImplementedError
+
+    def get_batches(self, user, batch_size=ANALYTICS_BATCH_SIZE):
+        """Return the schema and an iterator of its record batches."""
+        queryset = self.get_queryset(user)
+        fields = [resolve_field(queryset, lookup) for lookup in self.fields]
+        schema = pa.schema(
+            [
+                pa.field(lookup, arrow_type(field))
+                for lookup, field in zip(self.fields, fields)
+            ]
+        )
+        columns = [
+            # UUIDs are read as text, which skips parsing them into objects
+            # only to write them back out as text.
+            Cast(lookup, TextField())
+            if field.get_internal_type() == "UUIDField"
+            else lookup
+            for lookup, field in zip(self.fields, fields)
+        ]
+        rows = (
+            # The order of the cursor pagination indexes.
+            queryset.order_by("-updated_at", "-id")
+            .values_list(*columns)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return schema, iter_batches(schema, rows, batch_size)
+
+
+def iter_batches(schema, rows, batch_size):
+    """
+    Record batches of `batch_size` rows. The rows are converted to Arrow
+    EXPORT_CHUNK_SIZE at a time, so only that many are held as Python objects.
+    """
+    chunks, count = [], 0
+    while chunk := list(islice(rows, min(batch_size - count, EXPORT_CHUNK_SIZE))):
+        columns = zip(*chunk)
+        chunks.append(
+            pa.RecordBatch.from_arrays(
+                [
+                    pa.array(column, type=field.type)
+                    for column, field in zip(columns, schema)
+                ],
+                schema=schema,
+            )
+        )
+        count += len(chunk)
+        if count == batch_size:
+            yield combine_batches(schema, chunks)
+            chunks, count = [], 0
+    if chunks:
+        yield combine_batches(schema, chunks)
+
+
+def combine_batches(schema, batches):
+    return pa.Table.from_batches(batches, schema).combine_chunks().to_batches()[0]
+
+
+class OrderAnalytics(AnalyticsExport):
+    fields = (
+        "id",
+        "order_number",
+        "status",
+        "vendor_id",
+        "vendor__name",
+        "email_sent",
+        "notes",
+        "items_count",
+        "items_amount",
+        "created_at",
+        "updated_at",
+    )
+
+    def get_queryset(self, user):
+        return Order.objects.filter(created_by=user).annotate(
+            items_count=Count("items"),
+            # OrderItem.total is a float; this sum stays exact.
+            items_amount=Sum(
+                F("items__price") * F("items__quantity"), output_field=Money
+            ),
+        )
+
+
+class OrderItemAnalytics(AnalyticsExport):
+    fields = (
+        "id",
+        "order_id",
+        "order__order_number",
+        "product_id",
+        "product__name",
+        "product__sku",
+        "status",
+        "price",
+        "quantity",
+        "amount",
+        "created_at",
+        "updated_at",
+    )
+
+    def get_queryset(self, user):
+        return OrderItem.objects.filter(order__created_by=user).annotate(
+            # OrderItem.total is a float.
+            amount=ExpressionWrapper(F("price") * F("quantity"), output_field=Money)
+        )
+
+
+class ReservationAnalytics(AnalyticsExport):
+    fields = (
+        "id",
+        "reservation_number",
+        "reservation_date",
+        "start_time",
+        "end_time",
+        "status",
+        "reservation_type",
+        "patient_id",
+        "doctor_id",
+        "created_at",
+        "updated_at",
+    )
+
+    def get_queryset(self, user):
+        clinic = get_user_clinic(user)
+        if clinic is None:
+            return Reservation.objects.none()
+        return Reservation.objects.filter(patient__clinic=clinic)
+
+
+class PatientAnalytics(AnalyticsExport):
+    fields = (
+        "id",
+        "first_name",
+        "last_name",
+        "gender",
+        "age",
+        "blood_group",
+        "hiv_status",
+        "is_allergic",
+        "is_active",
+        "last_visit",
+        "created_at",
+        "updated_at",
+    )
+
+    def get_queryset(self, user):
+        clinic = get_user_clinic(user)
+        if clinic is None:
+            return Patient.objects.none()
+        return Patient.objects.filter(clinic=clinic)
+
+
+ANALYTICS_EXPORTS = {
+    "orders": OrderAnalytics(),
+    "order-items": OrderItemAnalytics(),
+    "reservations": ReservationAnalytics(),
+    "patients": PatientAnalytics(),
+}
+
+
+def write_parquet(where, schema, batches):
+    """Write the batches to a path or binary file, one row group each."""
+    with pq.ParquetWriter(where, schema, compression=COMPRESSION) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def write_arrow(where, schema, batches):
+    """Write the batches as an Arrow IPC file to a path or binary file."""
+    options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+    with pa.ipc.new_file(where, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def iter_arrow_stream(schema, batches):
+    """Yield the bytes of an Arrow IPC stream, one record batch at a time."""
+    buffer = io.BytesIO()
+    options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+    with pa.ipc.new_stream(buffer, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+WRITERS = {"parquet": write_parquet, "arrow": write_arrow}
+CONTENT_TYPES = {
+    "parquet": PARQUET_CONTENT_TYPE,
+    "arrow": ARROW_CONTENT_TYPE,
+    "arrows": ARROW_STREAM_CONTENT_TYPE,
+}
+
+
+def analytics_response(schema, batches, extension, filename):
+    if extension == "arrows":
+        response = StreamingHttpResponse(
+            iter_arrow_stream(schema, batches), content_type=ARROW_STREAM_CONTENT_TYPE
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+    # Parquet and Arrow files end with a footer indexing the whole file, so
+    # they are written to disk first, as .xlsx exports are.
+    file_obj = tempfile.TemporaryFile()
+    WRITERS[extension](file_obj, schema, batches)
+    file_obj.seek(0)
+    return FileResponse(
+        file_obj,
+        as_attachment=True,
+        filename=filename,
+        content_type=CONTENT_TYPES[extension],
+    )
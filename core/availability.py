@@ -0,0 +1,193 @@
+"""
+Free-slot search over doctors' working days, clinic hours and reservations.
+
+The engine works on minutes since midnight and plain tuples so a month of
+slots for a whole clinic is a few thousand integer comparisons. The busy
+intervals are loaded with one grouped query (see `get_busy_intervals`).
+"""
+import calendar
+import datetime
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Func, IntegerField
+
+from .models import Reservation
+
+DEFAULT_OPENING_HOUR = datetime.time(8)
+DEFAULT_CLOSING_HOUR = datetime.time(17)
+# Reservations saved without an end time block this many minutes.
+DEFAULT_RESERVATION_MINUTES = 30
+
+DAY_NUMBERS = {name.lower(): number for number, name in enumerate(calendar.day_name)}
+DAY_NUMBERS.update(
+    {name.lower(): number for number, name in enumerate(calendar.day_abbr)}
+)
+
+
+def parse_working_days(working_days):
+    """Return the weekday numbers of `["Monday", "tue", 2, ...]`."""
+    days = set()
+    for day in working_days or ():
+        if isinstance(day, int) and 0 <= day <= 6:
+            days.add(day)
+        elif isinstance(day, str) and day.strip().lower() in DAY_NUMBERS:
+            days.add(DAY_NUMBERS[day.strip().lower()])
+    return frozenset(days)
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def align(minutes, origin, step):
+    """Round `minutes` up to the next `step` boundary counted from `origin`."""
+    return origin + -(-(minutes - origin) // step) * step
+
+
+def merge_intervals(intervals):
+    """Sort and merge overlapping or touching `(start, end)` intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def free_slots(opening, closing, busy, duration, step):
+    """
+    Yield the `(start, end)` minutes of the `duration`-long slots between
+    `opening` and `closing` that overlap none of the merged `busy` intervals.
+    Slot starts are aligned on `step` minutes from the opening.
+    """
+    cursor = opening
+    for busy_start, busy_end in busy + [[closing, closing]]:
+        gap_end = min(busy_start, closing)
+        start = align(cursor, opening, step)
+        while start + duration <= gap_end:
+            yield start, start + duration
+            start += step
+        cursor = max(cursor, busy_end)
+        if cursor >= closing:
+            return
+
+
+def find_slots(
+    doctors,
+    busy,
+    start_date,
+    end_date,
+    duration,
+    step=None,
+    opening_hour=None,
+    closing_hour=None,
+    not_before=None,
+):
+    """
+    Return `{doctor_id: [(date, start_time, end_time), ...]}` of free slots.
+
+    `doctors` are `(doctor_id, working_days)` pairs and `busy` maps
+    `(doctor_id, date)` to the `(start, end)` minutes reserved that day. Slots
+    starting before the naive local datetime `not_before` are left out.
+    """
+    step = step or duration
+    opening = to_minutes(opening_hour or DEFAULT_OPENING_HOUR)
+    closing = to_minutes(closing_hour or DEFAULT_CLOSING_HOUR)
+    dates = [
+        start_date + datetime.timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    times = {}
+
+    slots = {}
+    for doctor_id, working_days in doctors:
+        days = parse_working_days(working_days)
+        doctor_slots = slots[doctor_id] = []
+        for date in dates:
+            if date.weekday() not in days:
+                continue
+            day_opening = opening
+            if not_before is not None:
+                if date < not_before.date():
+                    continue
+                if date == not_before.date():
+                    now = max(opening, to_minutes(not_before) + 1)
+                    day_opening = align(now, opening, step)
+            intervals = merge_intervals(busy.get((doctor_id, date), ()))
+            for start, end in free_slots(
+                day_opening, closing, intervals, duration, step
+            ):
+                if start not in times:
+                    times[start] = to_time(start)
+                if end not in times:
+                    times[end] = to_time(end)
+                doctor_slots.append((date, times[start], times[end]))
+    return slots
+
+
+class Minutes(Func):
+    """Minutes since midnight of a time, rounded down or up."""
+
+    template = "%(rounding)s(date_part('epoch', %(expressions)s) / 60)::integer"
+    output_field = IntegerField()
+
+    def __init__(self, expression, rounding="FLOOR", **extra):
+        super().__init__(expression, rounding=rounding, **extra)
+
+
+def get_busy_intervals(doctor_ids, start_date, end_date):
+    """
+    The reserved `(start, end)` minutes of the doctors per `(doctor_id, date)`
+    in the range, from one query. The intervals are aggregated per doctor and
+    day in the database: a busy month is a few hundred rows of integer arrays instead of
+    tens of thousands of rows.
+    """
+    rows = (
+        Reservation.objects.filter(
+            doctor__in=doctor_ids,
+            reservation_date__range=(start_date, end_date),
+            start_time__isnull=False,
+        )
+        .exclude(status=Reservation.Status.CANCELLED)
+        .order_by()
+        .values_list("doctor_id", "reservation_date")
+        .annotate(
+            starts=ArrayAgg(Minutes("start_time")),
+            # A partial minute is rounded up so it still blocks the slot after.
+            ends=ArrayAgg(Minutes("end_time", rounding="CEIL")),
+        )
+    )
+    busy = {}
+    for doctor_id, date, starts, ends in rows:
+        busy[doctor_id, date] = [
+            (start, start + DEFAULT_RESERVATION_MINUTES if end is None else end)
+            for start, end in zip(starts, ends)
+        ]
+    return busy
+
+
+def find_conflicts(doctor_id, date, start_time, end_time, exclude_pk=None):
+    """The live reservations of a doctor overlapping `[start_time, end_time)`."""
+    conflicts = (
+        Reservation.objects.filter(
+            doctor=doctor_id,
+            reservation_date=date,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        )
+        .exclude(status=Reservation.Status.CANCELLED)
+        .order_by("start_time")
+    )
+    if exclude_pk is not None:
+        conflicts = conflicts.exclude(pk=exclude_pk)
+    return list(
+        conflicts.values(
+            "id", "reservation_number", "reservation_date", "start_time", "end_time"
+        )
+    )
@@ -0,0 +1,13 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class ReservationConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The doctor already has a reservation at this time."
+    default_code = "reservation_conflict"
+
+    def __init__(self, conflicts):
+        super().__init__()
+        # Set after __init__, which would turn every value into a string.
+        self.detail = {"detail": self.detail, "conflicts": conflicts}
@@ -0,0 +1,264 @@
+"""
+The owner's products, orders, patients and reservations as spreadsheets.
+
+Rows are read with `.iterator()`, which uses a server-side cursor on
+PostgreSQL, and handed to the writers in shared/exports.py one at a time.
+
+Exports can also be prebuilt per owner as `ExportFile`s. A change to the
+owner's rows marks the file dirty, and the `export_worker` command rebuilds
+it once the rows have been quiet for EXPORT_DEBOUNCE, so a bulk import
+causes a single rebuild. A download is then a file read with no query over
+the rows.
+"""
+import datetime
+import logging
+import tempfile
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from shared.exports import file_hash, tee_csv, write_xlsx
+
+from .models import ExportFile, Order, Patient, Product, Reservation
+from .schedule import get_user_clinic
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_DEBOUNCE = datetime.timedelta(seconds=30)
+# Rows changing without a pause are still exported this often.
+EXPORT_MAX_DELAY = datetime.timedelta(minutes=5)
+# A build not finished by then is taken over by another worker.
+EXPORT_STALE_AFTER = datetime.timedelta(minutes=10)
+EXPORT_FORMATS = ("csv", "xlsx")
+
+
+class Export:
+    # (header, lookup) pairs.
+    columns = ()
+    title = None
+
+    def get_queryset(self, user):
+        raise NotImplementedError
+
+    @property
+    def header(self):
+        return [header for header, _ in self.columns]
+
+    def get_rows(self, user):
+        return (
+            self.get_queryset(user)
+            # The order of the cursor pagination indexes.
+            .order_by("-updated_at", "-id")
+            .values_list(*[lookup for _, lookup in self.columns])
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+
+class ProductExport(Export):
+    title = "Products"
+    columns = (
+        ("Name", "name"),
+        ("SKU", "sku"),
+        ("Category", "category__name"),
+        ("Vendor", "vendor__name"),
+        ("Stock Number", "stock_number"),
+        ("Price", "price"),
+        ("Image URL", "image_url"),
+        ("Updated At", "updated_at"),
+    )
+
+    def get_queryset(self, user):
+        return Product.objects.filter(created_by=user)
+
+
+class OrderExport(Export):
+    title = "Orders"
+    columns = (
+        ("Order Number", "order_number"),
+        ("Vendor", "vendor__name"),
+        ("Status", "status"),
+        ("Items", "items_count"),
+        ("Total", "items_total"),
+        ("Email Sent", "email_sent"),
+        ("Notes", "notes"),
+        ("Created At", "created_at"),
+    )
+
+    def get_queryset(self, user):
+        return Order.objects.filter(created_by=user).annotate(
+            items_count=Count("items"), items_total=Sum("items__total")
+        )
+
+
+class PatientExport(Export):
+    title = "Patients"
+    columns = (
+        ("First Name", "first_name"),
+        ("Last Name", "last_name"),
+        ("Email", "email"),
+        ("Phone Number", "phone_number"),
+        ("Address", "address"),
+        ("Gender", "gender"),
+        ("Age", "age"),
+        ("Blood Group", "blood_group"),
+        ("Blood Pressure", "blood_pressure"),
+        ("HIV Status", "hiv_status"),
+        ("Allergic", "is_allergic"),
+        ("Active", "is_active"),
+        ("Last Visit", "last_visit"),
+    )
+
+    def get_queryset(self, user):
+        clinic = get_user_clinic(user)
+        if clinic is None:
+            return Patient.objects.none()
+        return Patient.objects.filter(clinic=clinic)
+
+
+class ReservationExport(Export):
+    title = "Reservations"
+    columns = (
+        ("Reservation Number", "reservation_number"),
+        ("Date", "reservation_date"),
+        ("Start Time", "start_time"),
+        ("End Time", "end_time"),
+        ("Patient First Name", "patient__first_name"),
+        ("Patient Last Name", "patient__last_name"),
+        ("Doctor First Name", "doctor__user__first_name"),
+        ("Doctor Last Name", "doctor__user__last_name"),
+        ("Type", "reservation_type"),
+        ("Status", "status"),
+    )
+
+    def get_queryset(self, user):
+        clinic = get_user_clinic(user)
+        if clinic is None:
+            return Reservation.objects.none()
+        return Reservation.objects.filter(patient__clinic=clinic)
+
+
+EXPORTS = {
+    "products": ProductExport(),
+    "orders": OrderExport(),
+    "patients": PatientExport(),
+    "reservations": ReservationExport(),
+}
+
+
+def get_export_file(owner, name):
+    """The owner's prebuilt export, queued for its first build if new."""
+    export_file = ExportFile.objects.filter(owner=owner, name=name).first()
+    if export_file is None:
+        # Due at once: there is nothing to wait for.
+        due = timezone.now() - EXPORT_DEBOUNCE
+        export_file, _ = ExportFile.objects.get_or_create(
+            owner=owner, name=name, defaults={"changed_at": due, "dirty_since": due}
+        )
+    return export_file
+
+
+def mark_export_changed(owner_id, name):
+    """
+    Push back the rebuild of the owner's export, if one was ever requested.
+    Call it once the change is committed, or the worker may export the rows
+    as they were.
+    """
+    now = timezone.now()
+    ExportFile.objects.filter(owner_id=owner_id, name=name).update(
+        changed_at=now, dirty_since=Coalesce(F("dirty_since"), Value(now))
+    )
+
+
+def claim_export_file(worker):
+    """Lease the longest dirty export that is due to `worker`, if any."""
+    now = timezone.now()
+    with transaction.atomic():
+        export_file = (
+            ExportFile.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(changed_at__lte=now - EXPORT_DEBOUNCE)
+                | Q(dirty_since__lte=now - EXPORT_MAX_DELAY),
+                dirty_since__isnull=False,
+            )
+            .filter(
+                Q(worker__isnull=True) | Q(heartbeat_at__lt=now - EXPORT_STALE_AFTER)
+            )
+            .order_by("dirty_since")
+            .first()
+        )
+        if export_file is None:
+            return None
+        export_file.worker = worker
+        export_file.heartbeat_at = now
+        export_file.save(update_fields=["worker", "heartbeat_at"])
+    return export_file
+
+
+def build_export_file(export_file):
+    """Write the owner's rows to new files and swap them in."""
+    export = EXPORTS[export_file.name]
+    changed_at = export_file.changed_at
+    with tempfile.TemporaryFile() as csv_file, tempfile.TemporaryFile() as xlsx_file:
+        # One pass over the rows writes both files.
+        rows = export.get_rows(export_file.owner)
+        rows = tee_csv(csv_file, export.header, rows)
+        write_xlsx(xlsx_file, export.header, rows, export.title)
+
+        files = {"csv": csv_file, "xlsx": xlsx_file}
+        with transaction.atomic():
+            current = ExportFile.objects.select_for_update().get(pk=export_file.pk)
+            if current.worker != export_file.worker:
+                logger.warning("Export %s was taken over", export_file.pk)
+                return
+            replaced = []
+            for extension, file_obj in files.items():
+                digest = file_hash(file_obj)
+                if digest == getattr(current, f"{extension}_hash"):
+                    continue
+                field = getattr(current, f"{extension}_file")
+                if field:
+                    replaced.append(field.name)
+                # Named after the content, so a new version never shares a
+                # name (and a cached response) with an old one.
+                field.save(
+                    f"{current.name}-{digest[:16]}.{extension}",
+                    File(file_obj),
+                    save=False,
+                )
+                setattr(current, f"{extension}_hash", digest)
+            current.built_at = timezone.now()
+            current.worker = None
+            current.heartbeat_at = None
+            current.error = None
+            if current.changed_at == changed_at:
+                current.dirty_since = None
+            current.save()
+            storage = current.csv_file.storage
+            for name in replaced:
+                transaction.on_commit(lambda name=name: storage.delete(name))
+
+
+def process_export_file(export_file):
+    try:
+        build_export_file(export_file)
+    except Exception as exc:
+        logger.exception("Export %s failed", export_file.pk)
+        # The lease is kept, so the build is retried once it runs out.
+        ExportFile.objects.filter(pk=export_file.pk, worker=export_file.worker).update(
+            error=str(exc), heartbeat_at=timezone.now()
+        )
+
+
+def process_export_files(worker, once=False):
+    """Rebuild the due exports until none is left; return how many were built."""
+    processed = 0
+    while export_file := claim_export_file(worker):
+        process_export_file(export_file)
+        processed += 1
+        if once:
+            break
+    return processed
@@ -0,0 +1,564 @@
+"""
+Spreadsheet imports.
+
+A sheet is validated column by column with pandas: every check builds a mask
+of the rows it rejects, so a 20k row catalog is a few dozen vectorized
+operations instead of one serializer per row. Rejected rows are reported with
+their spreadsheet row number and the rest are written with chunked
+`bulk_create` calls in one transaction.
+
+`.xlsx`, `.csv` and `.tsv` uploads are read row by row (see `read_frames`)
+and imported one batch at a time, so memory use does not grow with the size
+of the file.
+
+In upsert mode rows matching an existing record of the owner update it
+instead: each batch loads the matching rows in one query, compares them with
+the file and writes only the new and changed rows, with set-based statements.
+"""
+import codecs
+import csv
+import os
+from collections import Counter, defaultdict
+from decimal import Decimal
+from itertools import islice
+from zipfile import BadZipFile
+
+import pandas as pd
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from shared.signals import mark_changed_on_commit
+
+from .exports import mark_export_changed
+from .inventory import apply_delta, stock_level
+from .models import SKU_NUMBERS, Category, ImportJob, Product, Vendor
+
+IMPORT_CHUNK_SIZE = 1000
+# Only the first errors are returned; a wrong file fails on every row.
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED = "This field is required."
+URL_PATTERN = r"^https?://\S+$"
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+# What reading an unsupported or corrupt file raises.
+FILE_ERRORS = (ValueError, OSError, csv.Error, BadZipFile, InvalidFileException)
+
+
+def iter_xlsx_rows(file_obj):
+    workbook = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_csv_rows(file_obj, delimiter=","):
+    lines = codecs.iterdecode(file_obj, "utf-8-sig")
+    yield from csv.reader(lines, delimiter=delimiter)
+
+
+def iter_rows(file_obj):
+    """Yield the rows of an uploaded `.xlsx`, `.csv` or `.tsv` file lazily."""
+    extension = os.path.splitext(file_obj.name or "")[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(file_obj)
+    if extension == ".csv":
+        return iter_csv_rows(file_obj)
+    if extension == ".tsv":
+        return iter_csv_rows(file_obj, delimiter="\t")
+    return None
+
+
+def count_rows(file_obj):
+    """The number of rows below the header, blank ones included."""
+    if file_obj.name.lower().endswith((".xlsx", ".xlsm")):
+        workbook = load_workbook(file_obj, read_only=True)
+        try:
+            # From the sheet's dimensions, when the writer recorded them.
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        if max_row:
+            return max(max_row - 1, 0)
+        file_obj.seek(0)
+    rows = iter_rows(file_obj)
+    if rows is None:
+        return len(pd.read_excel(file_obj))
+    return max(sum(1 for _ in rows) - 1, 0)
+
+
+def read_frames(file_obj, size=IMPORT_CHUNK_SIZE, start=0):
+    """
+    Yield the rows of `file_obj` as DataFrames of at most `size` rows, indexed
+    by spreadsheet row number minus two like a whole-sheet `pd.read_excel`.
+    The rows before index `start` are skipped. Other formats than `.xlsx`,
+    `.csv` and `.tsv` are read by pandas at once.
+    """
+    rows = iter_rows(file_obj)
+    if rows is None:
+        df = pd.read_excel(file_obj).iloc[start:]
+        if len(df):
+            yield df
+        return
+
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = ["" if name is None else str(name) for name in header]
+    width = len(columns)
+    numbered = islice(enumerate(rows), start, None)
+    while batch := list(islice(numbered, size)):
+        index, records = [], []
+        for number, row in batch:
+            # Blank rows are skipped but still count for the row numbers.
+            if all(value is None or value == "" for value in row):
+                continue
+            row = tuple(row[:width])
+            index.append(number)
+            records.append(row + (None,) * (width - len(row)))
+        if records:
+            yield pd.DataFrame.from_records(records, columns=columns, index=index)
+
+
+def changed_rows(new, old):
+    """Mask of the rows of `new` differing from `old`; missing equals missing."""
+    new = new.astype(object).where(new.notna(), None)
+    old = old.astype(object).where(old.notna(), None)
+    differs = new.ne(old) & ~(new.isna() & old.isna())
+    return differs.any(axis=1)
+
+
+def summary_delta(df):
+    """The inventory summary delta of the products in `df`, vectorized."""
+    stock = df["stock_number"].astype("int64")
+    cents = (df["price"].astype(float) * 100).round().astype("int64") * stock
+    delta = Counter(
+        {
+            level: int(count)
+            for level, count in stock.map(stock_level).value_counts().items()
+        }
+    )
+    delta["total_products"] = len(df)
+    delta["total_stock_value"] = Decimal(int(cents.sum())) / 100
+    return delta
+
+
+class Importer:
+    model = None
+    # Other spellings of the column names, after lowercasing.
+    aliases = {}
+    # The prebuilt exports the imported rows appear in.
+    exports = ()
+
+    def __init__(self, owner, chunk_size=IMPORT_CHUNK_SIZE, mode=ImportJob.Mode.CREATE):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.upsert = mode == ImportJob.Mode.UPSERT
+        # The errors of the frame being imported, by row index.
+        self.errors = defaultdict(dict)
+        self.reported_errors = []
+        self.created = self.updated = self.unchanged = self.failed = 0
+        # Names resolved by earlier frames, per column.
+        self.resolved = defaultdict(dict)
+
+    def normalize_columns(self, df):
+        columns = df.columns.astype(str).str.strip().str.lower().str.replace(" ", "_")
+        return df.set_axis([self.aliases.get(c, c) for c in columns], axis=1)
+
+    def reject(self, mask, field, message, values=None):
+        for index in mask[mask].index:
+            text = message if values is None else message.format(value=values[index])
+            self.errors[index].setdefault(field, []).append(text)
+
+    def text(self, df, column, max_length=None, required=False):
+        """The stripped strings of `column`, with blanks as missing values."""
+        if column not in df:
+            values = pd.Series(pd.NA, index=df.index, dtype="string")
+        else:
+            values = df[column].astype("string").str.strip().replace("", pd.NA)
+        if required:
+            self.reject(values.isna(), column, REQUIRED)
+        if max_length:
+            self.reject(
+                values.str.len().fillna(0) > max_length,
+                column,
+                f"Ensure this field has no more than {max_length} characters.",
+            )
+        return values
+
+    def number(self, df, column, required=False):
+        """`column` as floats; thousands separators and spaces are ignored."""
+        raw = self.text(df, column, required=required)
+        values = pd.to_numeric(
+            raw.str.replace(r"[,\s]", "", regex=True), errors="coerce"
+        )
+        self.reject(raw.notna() & values.isna(), column, "A valid number is required.")
+        return values
+
+    def resolve(self, df, column, queryset):
+        """Map the names in `column` to the pks of `queryset`, ignoring case."""
+        names = self.text(df, column)
+        keys = names.str.lower()
+        pks = self.resolved[column]
+        missing = [key for key in keys.dropna().unique() if key not in pks]
+        if missing:
+            pks.update(dict.fromkeys(missing))
+            pks.update(
+                queryset.annotate(key=Lower("name"))
+                .filter(key__in=missing)
+                # The oldest row wins when names repeat.
+                .order_by("-created_at")
+                .values_list("key", "pk")
+            )
+        resolved = keys.map(pks)
+        self.reject(
+            names.notna() & resolved.isna(),
+            column,
+            f'No {column} named "{{value}}".',
+            names,
+        )
+        return resolved
+
+    def clean(self, df):
+        """Return the frame of the model field values; rejects invalid rows."""
+        raise NotImplementedError
+
+    def build(self, df):
+        raise NotImplementedError
+
+    def save(self, instances, df):
+        self.model.objects.bulk_create(instances, batch_size=self.chunk_size)
+
+    def write(self, df):
+        """Insert the rows of `df`, or upsert them in upsert mode."""
+        self.save(self.build(df), df)
+        self.created += len(df)
+
+    def import_frame(self, df):
+        self.errors.clear()
+        cleaned = self.clean(self.normalize_columns(df))
+        valid = cleaned[~cleaned.index.isin(list(self.errors))]
+        written = self.created + self.updated
+        for start in range(0, len(valid), self.chunk_size):
+            self.write(valid.iloc[start : start + self.chunk_size])
+        if self.created + self.updated != written:
+            # bulk_create() sends no signals either.
+            mark_changed_on_commit(self.model)
+            for name in self.exports:
+                transaction.on_commit(
+                    lambda name=name: mark_export_changed(self.owner.pk, name)
+                )
+
+        self.failed += len(self.errors)
+        for index in sorted(self.errors):
+            if len(self.reported_errors) >= MAX_REPORTED_ERRORS:
+                break
+            self.reported_errors.append(
+                {"row": index + 2, "errors": self.errors[index]}
+            )
+
+    @property
+    def processed(self):
+        return self.created + self.updated + self.unchanged
+
+    def run(self, frames):
+        """
+        Import a DataFrame, or the frames of `read_frames()` one at a time, in
+        one transaction.
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames.reset_index(drop=True)]
+        with transaction.atomic():
+            for df in frames:
+                self.import_frame(df)
+        return {
+            "status": "failed" if self.failed and not self.processed else "success",
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "errors": self.reported_errors,
+        }
+
+
+class ProductImporter(Importer):
+    model = Product
+    exports = ("products",)
+    aliases = {
+        "image": "image_url",
+        "stock": "stock_number",
+        "quantity": "stock_number",
+    }
+    max_price = 10**7
+    # The fields compared to tell changed rows in upsert mode.
+    compared_fields = [
+        "name",
+        "price",
+        "stock_number",
+        "image_url",
+        "category",
+        "vendor",
+    ]
+
+    def clean(self, df):
+        name = self.text(df, "name", max_length=255, required=True)
+
+        price = self.number(df, "price", required=True).round(2)
+        self.reject(
+            (price < 0) | (price >= self.max_price),
+            "price",
+            f"Ensure this value is between 0 and {self.max_price}.",
+        )
+
+        stock = self.number(df, "stock_number")
+        self.reject(
+            (stock < 0) | (stock % 1 > 0),
+            "stock_number",
+            "Ensure this value is a whole number of at least 0.",
+        )
+        default_stock = Product._meta.get_field("stock_number").default
+        stock = stock.fillna(default_stock)
+
+        image_url = self.text(df, "image_url", max_length=200)
+        self.reject(
+            image_url.notna() & ~image_url.str.match(URL_PATTERN).fillna(False),
+            "image_url",
+            "Enter a valid URL.",
+        )
+
+        sku = self.text(df, "sku", max_length=255)
+        self.reject(
+            sku.notna() & sku.duplicated(keep=False),
+            "sku",
+            "This SKU appears more than once in the file.",
+        )
+        # Also catches SKUs repeated in an earlier frame of a streamed file,
+        # which is already saved.
+        existing = Product.objects.filter(sku__in=list(sku.dropna().unique()))
+        if self.upsert:
+            # Only the owner's own products are updated.
+            existing = existing.exclude(created_by=self.owner)
+        self.reject(
+            sku.isin(set(existing.values_list("sku", flat=True))).fillna(False),
+            "sku",
+            "A product with this SKU already exists.",
+        )
+
+        cleaned = pd.DataFrame(
+            {
+                "name": name,
+                "price": price,
+                "stock_number": stock,
+                "image_url": image_url,
+                "sku": sku,
+                "category": self.resolve(df, "category", Category.objects.all()),
+                "vendor": self.resolve(
+                    df, "vendor", Vendor.objects.filter(created_by=self.owner)
+                ),
+            }
+        )
+        if self.upsert:
+            # Rows without a SKU are matched on their name and vendor.
+            keyless = cleaned[cleaned["sku"].isna()]
+            repeated = keyless[["name", "vendor"]].astype(object).duplicated(keep=False)
+            self.reject(
+                repeated.reindex(cleaned.index, fill_value=False),
+                "name",
+                "This product and vendor appear more than once in the file.",
+            )
+        return cleaned
+
+    def build(self, df):
+        df = df.astype(object).where(df.notna(), None)
+        numbers = iter(SKU_NUMBERS.allocate(int(df["sku"].isna().sum())))
+        products = []
+        for row in df.itertuples(index=False):
+            product = Product(
+                created_by=self.owner,
+                name=row.name,
+                price=Decimal(f"{row.price:.2f}"),
+                stock_number=int(row.stock_number),
+                image_url=row.image_url,
+                category_id=row.category,
+                vendor_id=row.vendor,
+            )
+            product.sku = row.sku or product.generate_unique_sku(next(numbers))
+            products.append(product)
+        return products
+
+    def save(self, instances, df):
+        # bulk_create() sends no signals, so the owner's inventory summary
+        # gets the delta of the whole chunk here.
+        super().save(instances, df)
+        apply_delta(self.owner.pk, summary_delta(df))
+
+    def find_existing(self, df):
+        """
+        The owner's products matching the rows of `df`, indexed like it. A
+        row without a SKU matching the product of a row with one is rejected.
+        """
+        fields = ["sku", *self.compared_fields]
+        products = Product.objects.filter(created_by=self.owner)
+        matches = {}
+
+        skus = df["sku"].dropna()
+        if len(skus):
+            rows = dict(zip(skus, skus.index))
+            for product in products.filter(sku__in=list(skus)).values(*fields):
+                matches[rows[product["sku"]]] = product
+
+        keyless = df[df["sku"].isna()]
+        if len(keyless):
+            rows = {
+                (name, None if pd.isna(vendor) else vendor): index
+                for index, name, vendor in zip(
+                    keyless.index, keyless["name"], keyless["vendor"]
+                )
+            }
+            candidates = (
+                products.filter(name__in=list(keyless["name"].unique()))
+                # The oldest product wins when several match.
+                .order_by("-created_at").values(*fields)
+            )
+            sku_rows = {product["sku"]: index for index, product in matches.items()}
+            keyless_matches = {}
+            for product in candidates:
+                index = rows.get((product["name"], product["vendor"]))
+                if index is not None:
+                    keyless_matches[index] = product
+            for index, product in keyless_matches.items():
+                # Updating a product twice in one INSERT ... ON CONFLICT is an
+                # error in Postgres.
+                if product["sku"] in sku_rows:
+                    self.errors[index].setdefault("sku", []).append(
+                        "This row matches the same product as row "
+                        f"{sku_rows[product['sku']] + 2}."
+                    )
+                else:
+                    matches[index] = product
+
+        return pd.DataFrame.from_dict(matches, orient="index", columns=fields)
+
+    def write(self, df):
+        if not self.upsert:
+            return super().write(df)
+
+        existing = self.find_existing(df)
+        # Rows find_existing rejected.
+        df = df[~df.index.isin(list(self.errors))]
+        matched = df.loc[existing.index]
+        # The file's prices are rounded floats; a Decimal 10.10 is never equal
+        # to the float 10.1, so the stored prices are compared as floats too.
+        stored = existing[self.compared_fields].assign(
+            price=existing["price"].astype(float).round(2)
+        )
+        changed = changed_rows(matched[self.compared_fields], stored)
+        updates = matched[changed].assign(sku=existing["sku"][changed])
+        inserts = df.drop(existing.index)
+        rows = pd.concat([inserts, updates])
+        if len(rows):
+            # One INSERT ... ON CONFLICT (sku) DO UPDATE for new and changed rows.
+            Product.objects.bulk_create(
+                self.build(rows),
+                batch_size=self.chunk_size,
+                update_conflicts=True,
+                unique_fields=["sku"],
+                update_fields=[*self.compared_fields, "updated_at"],
+            )
+            delta = summary_delta(rows)
+            delta.subtract(summary_delta(existing[changed]))
+            apply_delta(self.owner.pk, delta)
+
+        self.created += len(inserts)
+        self.updated += len(updates)
+        self.unchanged += len(matched) - len(updates)
+
+
+class VendorImporter(Importer):
+    model = Vendor
+    exports = ("products",)
+    aliases = {"contact_number": "phone_number", "phone": "phone_number"}
+
+    compared_fields = ["name", "email", "phone_number", "location"]
+
+    def clean(self, df):
+        email = self.text(df, "email", max_length=254, required=True)
+        self.reject(
+            email.notna() & ~email.str.match(EMAIL_PATTERN).fillna(False),
+            "email",
+            "Enter a valid email address.",
+        )
+        if self.upsert:
+            self.reject(
+                email.notna() & email.str.lower().duplicated(keep=False),
+                "email",
+                "This email appears more than once in the file.",
+            )
+        return pd.DataFrame(
+            {
+                "name": self.text(df, "name", max_length=250, required=True),
+                "email": email,
+                "phone_number": self.text(
+                    df, "phone_number", max_length=20, required=True
+                ),
+                "location": self.text(df, "location", max_length=250, required=True),
+            }
+        )
+
+    def build(self, df):
+        return [
+            Vendor(created_by=self.owner, **row)
+            for row in df.astype(object).to_dict("records")
+        ]
+
+    def find_existing(self, df):
+        """The owner's vendors with the emails of `df`, indexed like it."""
+        rows = dict(zip(df["email"].str.lower(), df.index))
+        vendors = (
+            Vendor.objects.filter(created_by=self.owner)
+            .annotate(key=Lower("email"))
+            .filter(key__in=list(rows))
+            # The oldest vendor wins when several match.
+            .order_by("-created_at")
+            .values("id", "key", *self.compared_fields)
+        )
+        matches = {rows[vendor.pop("key")]: vendor for vendor in vendors}
+        return pd.DataFrame.from_dict(
+            matches, orient="index", columns=["id", *self.compared_fields]
+        )
+
+    def write(self, df):
+        if not self.upsert:
+            return super().write(df)
+
+        existing = self.find_existing(df)
+        # Rows find_existing rejected.
+        df = df[~df.index.isin(list(self.errors))]
+        matched = df.loc[existing.index]
+        changed = changed_rows(matched, existing[self.compared_fields])
+        updates = matched[changed]
+        if len(updates):
+            # bulk_update() skips auto_now, so updated_at is set here.
+            now = timezone.now()
+            Vendor.objects.bulk_update(
+                [
+                    Vendor(id=pk, updated_at=now, **row)
+                    for pk, row in zip(
+                        existing["id"][changed],
+                        updates.astype(object).to_dict("records"),
+                    )
+                ],
+                [*self.compared_fields, "updated_at"],
+                batch_size=self.chunk_size,
+            )
+        inserts = df.drop(existing.index)
+        if len(inserts):
+            self.save(self.build(inserts), inserts)
+
+        self.created += len(inserts)
+        self.updated += len(updates)
+        self.unchanged += len(matched) - len(updates)
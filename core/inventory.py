@@ -0,0 +1,129 @@
+"""
+Keeps InventorySummary in step with the Product table.
+
+Every product write turns into a delta on its owner's summary row, applied
+with `F()` expressions in the transaction of the write, so concurrent writers
+never overwrite each other's counts. Writes that bypass the model (queryset
+`update()`, raw SQL) are not tracked; `manage.py inventory_summary --rebuild`
+recomputes the rows from the product table.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from accounts.models import User
+
+from .models import InventorySummary, Product
+
+LOW_STOCK_THRESHOLD = 20
+
+SUMMARY_FIELDS = (
+    "total_products",
+    "low_stock_products",
+    "out_of_stock_products",
+    "in_stock_products",
+    "total_stock_value",
+)
+
+
+def stock_level(stock_number):
+    if stock_number == 0:
+        return "out_of_stock_products"
+    if 0 < stock_number <= LOW_STOCK_THRESHOLD:
+        return "low_stock_products"
+    return "in_stock_products"
+
+
+def product_delta(stock_number, price, sign=1):
+    """The change one product makes to its owner's summary."""
+    return Counter(
+        {
+            "total_products": sign,
+            stock_level(stock_number): sign,
+            "total_stock_value": sign * Decimal(price) * stock_number,
+        }
+    )
+
+
+def apply_delta(owner_id, delta):
+    delta = {field: value for field, value in delta.items() if value}
+    if owner_id is None or not delta:
+        return
+
+    updates = {field: F(field) + value for field, value in delta.items()}
+    summaries = InventorySummary.objects.filter(owner_id=owner_id)
+    if summaries.update(**updates, updated_at=timezone.now()):
+        return
+
+    # First product of this owner. Lock the owner so concurrent first writes
+    # are serialized, then either apply the delta to the row the other writer
+    # created or build the row from the table, which already holds this write.
+    if not User.objects.select_for_update().filter(pk=owner_id).exists():
+        return
+    if not summaries.update(**updates, updated_at=timezone.now()):
+        rebuild_summaries([owner_id])
+
+
+def compute_summaries(owner_ids=None):
+    """Return `{owner_id: {field: value}}` computed from the product table."""
+    products = Product.objects.exclude(created_by=None)
+    if owner_ids is not None:
+        products = products.filter(created_by__in=owner_ids)
+    rows = (
+        products.order_by()
+        .values("created_by")
+        .annotate(
+            total_products=Count("pk"),
+            low_stock_products=Count(
+                "pk",
+                filter=Q(stock_number__gt=0, stock_number__lte=LOW_STOCK_THRESHOLD),
+            ),
+            out_of_stock_products=Count("pk", filter=Q(stock_number=0)),
+            total_stock_value=Sum(F("price") * F("stock_number")),
+        )
+    )
+    summaries = {}
+    for row in rows:
+        owner_id = row.pop("created_by")
+        row["in_stock_products"] = row["total_products"] - (
+            row["low_stock_products"] + row["out_of_stock_products"]
+        )
+        row["total_stock_value"] = row["total_stock_value"] or Decimal(0)
+        summaries[owner_id] = row
+    return summaries
+
+
+def empty_summary():
+    return {field: 0 for field in SUMMARY_FIELDS}
+
+
+def rebuild_summaries(owner_ids=None):
+    """Recompute the summary rows of `owner_ids`, or every owner's."""
+    if owner_ids is None:
+        owner_ids = User.objects.values_list("pk", flat=True)
+    summaries = compute_summaries(owner_ids)
+    for owner_id in owner_ids:
+        InventorySummary.objects.update_or_create(
+            owner_id=owner_id, defaults=summaries.get(owner_id, empty_summary())
+        )
+
+
+def verify_summaries(owner_ids=None):
+    """Return `{owner_id: (stored, expected)}` for every summary out of step."""
+    expected = compute_summaries(owner_ids)
+    stored = InventorySummary.objects.all()
+    if owner_ids is not None:
+        stored = stored.filter(owner_id__in=owner_ids)
+    stored = {
+        row.pop("owner_id"): row for row in stored.values("owner_id", *SUMMARY_FIELDS)
+    }
+
+    mismatches = {}
+    for owner_id in set(stored) | set(expected):
+        actual = stored.get(owner_id, empty_summary())
+        wanted = expected.get(owner_id, empty_summary())
+        if actual != wanted:
+            mismatches[owner_id] = (actual, wanted)
+    return mismatches
@@ -0,0 +1,157 @@
+"""
+Background imports with the database as the queue.
+
+`ImportJob` rows are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so any
+number of `import_worker` processes can run side by side. A job is imported
+one batch per transaction, and each transaction also moves the job's
+checkpoint (`rows_done`) and counters. A worker that dies loses at most the
+batch it was writing. Once the job's heartbeat is older than STALE_AFTER,
+another worker claims it and resumes from the checkpoint.
+"""
+import datetime
+import logging
+import os
+import socket
+import uuid
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .imports import (
+    FILE_ERRORS,
+    IMPORT_CHUNK_SIZE,
+    ProductImporter,
+    VendorImporter,
+    count_rows,
+    read_frames,
+)
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+IMPORTERS = {
+    ImportJob.Kind.PRODUCTS: ProductImporter,
+    ImportJob.Kind.VENDORS: VendorImporter,
+}
+STALE_AFTER = datetime.timedelta(minutes=5)
+MAX_ATTEMPTS = 3
+
+
+class LostJob(Exception):
+    """Another worker took over the job."""
+
+
+def get_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim_job(worker):
+    """Lease the oldest pending or abandoned job to `worker`, if any."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ImportJob.Status.PENDING)
+                | Q(status=ImportJob.Status.RUNNING, heartbeat_at__lt=now - STALE_AFTER)
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ImportJob.Status.RUNNING
+        job.worker = worker
+        job.heartbeat_at = now
+        job.started_at = job.started_at or now
+        job.attempts += 1
+        job.save()
+    return job
+
+
+def checkpoint(job, **fields):
+    """Save `fields` on the job if `job.worker` still holds it."""
+    fields.update(heartbeat_at=timezone.now(), updated_at=timezone.now())
+    if not ImportJob.objects.filter(pk=job.pk, worker=job.worker).update(**fields):
+        raise LostJob(job.pk)
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def run_job(job, chunk_size=IMPORT_CHUNK_SIZE):
+    importer = IMPORTERS[job.kind](job.owner, chunk_size=chunk_size, mode=job.mode)
+    # Carry on from the counts of the committed batches.
+    importer.created = job.created_count
+    importer.updated = job.updated_count
+    importer.unchanged = job.unchanged_count
+    importer.failed = job.failed_count
+    importer.reported_errors = list(job.errors)
+
+    if job.total_rows is None:
+        with job.file.open("rb") as file_obj:
+            checkpoint(job, total_rows=count_rows(file_obj))
+
+    with job.file.open("rb") as file_obj:
+        for df in read_frames(file_obj, size=chunk_size, start=job.rows_done):
+            reported = len(importer.reported_errors)
+            with transaction.atomic():
+                importer.import_frame(df)
+                fields = {
+                    "rows_done": int(df.index[-1]) + 1,
+                    "created_count": importer.created,
+                    "updated_count": importer.updated,
+                    "unchanged_count": importer.unchanged,
+                    "failed_count": importer.failed,
+                }
+                if len(importer.reported_errors) != reported:
+                    fields["errors"] = importer.reported_errors
+                checkpoint(job, **fields)
+
+    finish_job(job, ImportJob.Status.COMPLETE, rows_done=job.total_rows)
+
+
+def finish_job(job, status, **fields):
+    """Save the job's final status and remove its upload."""
+    name = job.file.name
+    checkpoint(job, status=status, finished_at=timezone.now(), file="", **fields)
+    if name:
+        job.file.storage.delete(name)
+
+
+def process_job(job, chunk_size=IMPORT_CHUNK_SIZE):
+    try:
+        run_job(job, chunk_size=chunk_size)
+    except LostJob:
+        logger.warning("Import job %s was taken over by another worker", job.pk)
+    except Exception as exc:
+        logger.exception("Import job %s failed", job.pk)
+        try:
+            fail_job(job, exc)
+        except LostJob:
+            logger.warning("Import job %s was taken over by another worker", job.pk)
+
+
+def fail_job(job, exc):
+    if job.attempts >= MAX_ATTEMPTS or not is_retryable(exc):
+        finish_job(job, ImportJob.Status.FAILED, error=str(exc))
+    else:
+        # Back in the queue; the next claim resumes from the checkpoint.
+        checkpoint(job, status=ImportJob.Status.PENDING, error=str(exc))
+
+
+def is_retryable(exc):
+    """Broken files fail for good; anything else may be a passing problem."""
+    return not isinstance(exc, FILE_ERRORS)
+
+
+def process_jobs(worker=None, once=False):
+    """Run queued jobs until the queue is empty; return how many ran."""
+    worker = worker or get_worker_name()
+    processed = 0
+    while job := claim_job(worker):
+        process_job(job)
+        processed += 1
+        if once:
+            break
+    return processed
@@ -0,0 +1,38 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analytics import ANALYTICS_BATCH_SIZE, ANALYTICS_EXPORTS, WRITERS
+
+
+class Command(BaseCommand):
+    help = (
+        "Write an owner's orders, order items, reservations or patients to a "
+        "Parquet (.parquet) or Arrow IPC (.arrow) file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(ANALYTICS_EXPORTS))
+        parser.add_argument("output", help="The .parquet or .arrow file to write.")
+        parser.add_argument(
+            "--owner", required=True, help="Email of the user whose data to export."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ANALYTICS_BATCH_SIZE,
+            help="Rows per Parquet row group or Arrow record batch.",
+        )
+
+    def handle(self, name, output, owner, batch_size, **options):
+        extension = os.path.splitext(output)[1].lstrip(".").lower()
+        if extension not in WRITERS:
+            raise CommandError("The output must be a .parquet or .arrow file.")
+        user = get_user_model().objects.filter(email=owner).first()
+        if user is None:
+            raise CommandError(f'No user with the email "{owner}".')
+
+        schema, batches = ANALYTICS_EXPORTS[name].get_batches(user, batch_size)
+        WRITERS[extension](output, schema, batches)
+        self.stdout.write(f"Wrote {name} to {output}.")
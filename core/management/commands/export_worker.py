@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.exports import process_export_files
+from core.jobs import get_worker_name
+
+
+class Command(BaseCommand):
+    help = "Rebuild the prebuilt exports whose rows changed. Several can run at once."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when no export is due instead of polling for changes.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=5.0,
+            help="Seconds to wait between checks when no export is due.",
+        )
+
+    def handle(self, *args, once=False, poll=5.0, **options):
+        worker = get_worker_name()
+        self.stdout.write(f"Export worker {worker} started.")
+        while True:
+            close_old_connections()
+            processed = process_export_files(worker)
+            if processed:
+                self.stdout.write(f"Built {processed} exports.")
+            if once:
+                return
+            time.sleep(poll)
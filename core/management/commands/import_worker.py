@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import get_worker_name, process_jobs
+
+
+class Command(BaseCommand):
+    help = "Run the queued import jobs. Several workers can run at once."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of polling for new jobs.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between checks of an empty queue.",
+        )
+
+    def handle(self, *args, once=False, poll=2.0, **options):
+        worker = get_worker_name()
+        self.stdout.write(f"Import worker {worker} started.")
+        while True:
+            close_old_connections()
+            processed = process_jobs(worker)
+            if processed:
+                self.stdout.write(f"Processed {processed} import jobs.")
+            if once:
+                return
+            time.sleep(poll)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.inventory import rebuild_summaries, verify_summaries
+
+
+class Command(BaseCommand):
+    help = "Verify or rebuild the per-owner inventory summaries from the products."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute the summaries instead of only checking them.",
+        )
+        parser.add_argument(
+            "--owner",
+            action="append",
+            dest="owners",
+            help="Limit to this owner id. Can be repeated.",
+        )
+
+    def handle(self, *args, rebuild=False, owners=None, **options):
+        if rebuild:
+            rebuild_summaries(owners)
+            self.stdout.write(self.style.SUCCESS("Inventory summaries rebuilt."))
+            return
+
+        mismatches = verify_summaries(owners)
+        for owner_id, (stored, expected) in mismatches.items():
+            self.stdout.write(f"{owner_id}: stored {stored}, expected {expected}")
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} inventory summaries are out of step; "
+                "run with --rebuild to fix them."
+            )
+        self.stdout.write(self.style.SUCCESS("Inventory summaries are up to date."))
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.4 on 2026-10-18 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0019_reservation_reservation_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["-updated_at", "-id"], name="category_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clinic",
+            index=models.Index(fields=["-updated_at", "-id"], name="clinic_cursor_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="order_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orderitem",
+            index=models.Index(
+                fields=["-updated_at", "-id"], name="orderitem_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "-updated_at", "-id"], name="patient_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="product_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["-updated_at", "-id"], name="reservation_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="staff",
+            index=models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="staff_cursor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="vendor",
+            index=models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="vendor_cursor_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def populate_summaries(apps, schema_editor):
+    Product = apps.get_model("core", "Product")
+    InventorySummary = apps.get_model("core", "InventorySummary")
+    rows = (
+        Product.objects.exclude(created_by=None)
+        .order_by()
+        .values("created_by")
+        .annotate(
+            total_products=Count("pk"),
+            low_stock_products=Count(
+                "pk", filter=Q(stock_number__gt=0, stock_number__lte=20)
+            ),
+            out_of_stock_products=Count("pk", filter=Q(stock_number=0)),
+            total_stock_value=Sum(F("price") * F("stock_number")),
+        )
+    )
+    InventorySummary.objects.bulk_create(
+        InventorySummary(
+            owner_id=row["created_by"],
+            total_products=row["total_products"],
+            low_stock_products=row["low_stock_products"],
+            out_of_stock_products=row["out_of_stock_products"],
+            in_stock_products=row["total_products"]
+            - row["low_stock_products"]
+            - row["out_of_stock_products"],
+            total_stock_value=row["total_stock_value"] or 0,
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0020_cursor_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventorySummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("total_products", models.IntegerField(default=0)),
+                ("low_stock_products", models.IntegerField(default=0)),
+                ("out_of_stock_products", models.IntegerField(default=0)),
+                ("in_stock_products", models.IntegerField(default=0)),
+                (
+                    "total_stock_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                (
+                    "owner",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inventory_summary",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-updated_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
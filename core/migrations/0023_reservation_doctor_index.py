@@ -0,0 +1,22 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0022_reservation_date_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["doctor", "reservation_date", "start_time"],
+                include=("end_time", "status"),
+                name="reservation_doctor_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:22
+
+import core.models
+import django.contrib.postgres.constraints
+from django.conf import settings
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0023_reservation_doctor_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name="reservation",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("end_time__gt", models.F("start_time")),
+                    ("start_time", None),
+                    ("end_time", None),
+                    _connector="OR",
+                ),
+                name="reservation_end_after_start",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reservation",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(
+                    ("end_time__isnull", False),
+                    ("reservation_date__isnull", False),
+                    ("start_time__isnull", False),
+                    models.Q(("status", "Cancelled"), _negated=True),
+                ),
+                expressions=[("doctor", "="), (core.models.ReservationPeriod(), "&&")],
+                name="reservation_no_overlap",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+# Numbers start one digit above the random five character suffixes used so
+# far, so they can never collide with existing rows. The increment is the
+# block size of shared.numbers.NumberAllocator.
+SEQUENCES = {
+    "core_order_number_seq": 100000,
+    "core_reservation_number_seq": 100000,
+    "core_bill_number_seq": 100000,
+    "core_product_sku_seq": 36**5,
+}
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0024_reservation_overlap_constraint"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"CREATE SEQUENCE IF NOT EXISTS {name} INCREMENT BY 100 START WITH {start}",
+            f"DROP SEQUENCE IF EXISTS {name}",
+        )
+        for name, start in SEQUENCES.items()
+    ]
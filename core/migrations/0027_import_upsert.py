@@ -0,0 +1,31 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0026_import_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="mode",
+            field=models.CharField(
+                choices=[("Create", "Create"), ("Upsert", "Upsert")],
+                default="Create",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="unchanged_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="updated_count",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:20
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import core.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0027_import_upsert"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportFile",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "csv_file",
+                    models.FileField(
+                        blank=True, upload_to=core.models.export_file_path
+                    ),
+                ),
+                ("csv_hash", models.CharField(blank=True, max_length=64)),
+                (
+                    "xlsx_file",
+                    models.FileField(
+                        blank=True, upload_to=core.models.export_file_path
+                    ),
+                ),
+                ("xlsx_hash", models.CharField(blank=True, max_length=64)),
+                ("changed_at", models.DateTimeField(blank=True, null=True)),
+                ("dirty_since", models.DateTimeField(blank=True, null=True)),
+                ("built_at", models.DateTimeField(blank=True, null=True)),
+                ("worker", models.CharField(blank=True, max_length=255, null=True)),
+                ("heartbeat_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, null=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_files",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-updated_at"],
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("dirty_since__isnull", False)),
+                        fields=["dirty_since"],
+                        name="exportfile_queue_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="exportfile",
+            constraint=models.UniqueConstraint(
+                fields=("owner", "name"), name="exportfile_owner_name"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2026-10-18 13:29
+
+import os
+import shutil
+
+from django.conf import settings
+from django.db import migrations, models
+
+import core.models
+import shared.storage
+
+
+def move_private_files(apps, schema_editor):
+    """Move the files already stored out of MEDIA_ROOT, keeping their names."""
+    ImportJob = apps.get_model("core", "ImportJob")
+    ExportFile = apps.get_model("core", "ExportFile")
+    names = [
+        *ImportJob.objects.exclude(file="").values_list("file", flat=True),
+        *ExportFile.objects.exclude(csv_file="").values_list("csv_file", flat=True),
+        *ExportFile.objects.exclude(xlsx_file="").values_list("xlsx_file", flat=True),
+    ]
+    for name in names:
+        source = os.path.join(settings.MEDIA_ROOT, name)
+        if not os.path.exists(source):
+            continue
+        target = os.path.join(settings.PRIVATE_FILES_DIR, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(source, target)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0028_export_files"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="exportfile",
+            name="csv_file",
+            field=models.FileField(
+                blank=True,
+                storage=shared.storage.get_private_storage,
+                upload_to=core.models.export_file_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="exportfile",
+            name="xlsx_file",
+            field=models.FileField(
+                blank=True,
+                storage=shared.storage.get_private_storage,
+                upload_to=core.models.export_file_path,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="importjob",
+            name="file",
+            field=models.FileField(
+                storage=shared.storage.get_private_storage,
+                upload_to=core.models.import_file_path,
+            ),
+        ),
+        migrations.RunPython(move_private_files, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,21 @@
-import random
-import string
+import os
+import uuid
 
-from django.db import models
-from django.db.models import F, Sum
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.db import models, transaction
+from django.db.models import ExpressionWrapper, F, Func, Q, Sum, Value
 from django.utils.text import slugify
 
 from accounts.models import User
 from shared.models import BaseModel
+from shared.numbers import NumberAllocator, to_base36
+from shared.storage import get_private_storage
+
+ORDER_NUMBERS = NumberAllocator("core_order_number_seq")
+RESERVATION_NUMBERS = NumberAllocator("core_reservation_number_seq")
+BILL_NUMBERS = NumberAllocator("core_bill_number_seq")
+SKU_NUMBERS = NumberAllocator("core_product_sku_seq")
 
 
 class Clinic(BaseModel):
@@ -22,6 +31,11 @@ class Clinic(BaseModel):
     clinic_phone_number = models.CharField(null=True, blank=True)
     logo = models.ImageField(upload_to="clinic-logos", null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=["-updated_at", "-id"], name="clinic_cursor_idx"),
+        ]
+
 
 class Staff(BaseModel):
     class StaffType(models.TextChoices):
@@ -47,6 +61,13 @@ class Staff(BaseModel):
     )
     working_days = models.JSONField()
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="staff_cursor_idx"
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.job_title)
 
@@ -61,6 +82,13 @@ class Vendor(BaseModel):
     location = models.CharField(max_length=250)
     logo = models.ImageField(upload_to="vendors", null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="vendor_cursor_idx"
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.name)
 
@@ -68,6 +96,11 @@ class Vendor(BaseModel):
 class Category(BaseModel):
     name = models.CharField(max_length=250)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=["-updated_at", "-id"], name="category_cursor_idx"),
+        ]
+
     def __str__(self) -> str:
         return str(self.name)
 
@@ -97,20 +130,172 @@ class Product(BaseModel):
     image_url = models.URLField(null=True, blank=True)
     image = models.ImageField(upload_to="products", null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="product_cursor_idx"
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.sku or self.sku == "":
             self.sku = self.generate_unique_sku()
-        super().save(*args, **kwargs)
+        # The owner's InventorySummary is updated by the save signals in the
+        # same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
-    def generate_unique_sku(self):
+    def generate_unique_sku(self, number=None):
         prefix = slugify(self.name)[:3].upper()
-        suffix = "".join(random.choices(string.ascii_uppercase + string.digits, k=5))
+        suffix = to_base36(number or SKU_NUMBERS.next())
         return f"{prefix}-{suffix}"
 
     def __str__(self) -> str:
         return str(self.name)
 
 
+class InventorySummary(BaseModel):
+    """
+    Per-owner product totals behind the product stats, kept up to date by
+    deltas from the Product signals (see core/inventory.py).
+    """
+
+    owner = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="inventory_summary"
+    )
+    total_products = models.IntegerField(default=0)
+    low_stock_products = models.IntegerField(default=0)
+    out_of_stock_products = models.IntegerField(default=0)
+    in_stock_products = models.IntegerField(default=0)
+    total_stock_value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    def __str__(self) -> str:
+        return str(self.owner)
+
+
+def import_file_path(instance, filename):
+    # A random name: the uploader's file name may say whose data it holds.
+    extension = os.path.splitext(filename)[1].lower()
+    return f"imports/{uuid.uuid4().hex}{extension}"
+
+
+class ImportJob(BaseModel):
+    """
+    A spreadsheet import run by the `import_worker` command (see core/jobs.py).
+    `rows_done` is the checkpoint: the rows before it are committed, so a
+    worker picking the job up again resumes from there.
+    """
+
+    class Kind(models.TextChoices):
+        PRODUCTS = "Products"
+        VENDORS = "Vendors"
+
+    class Status(models.TextChoices):
+        PENDING = "Pending"
+        RUNNING = "Running"
+        COMPLETE = "Complete"
+        FAILED = "Failed"
+
+    class Mode(models.TextChoices):
+        CREATE = "Create"
+        # Rows matching an existing record update it (see core/imports.py).
+        UPSERT = "Upsert"
+
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="import_jobs"
+    )
+    kind = models.CharField(max_length=255, choices=Kind.choices)
+    mode = models.CharField(max_length=255, choices=Mode.choices, default=Mode.CREATE)
+    file = models.FileField(upload_to=import_file_path, storage=get_private_storage)
+    status = models.CharField(
+        max_length=255, choices=Status.choices, default=Status.PENDING
+    )
+    total_rows = models.IntegerField(null=True, blank=True)
+    rows_done = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    unchanged_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(null=True, blank=True)
+    # The worker holding the job and when it last checkpointed.
+    worker = models.CharField(max_length=255, null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["owner", "-updated_at", "-id"], name="importjob_cursor_idx"
+            ),
+            models.Index(
+                fields=["created_at"],
+                condition=Q(status__in=["Pending", "Running"]),
+                name="importjob_queue_idx",
+            ),
+        ]
+
+    @property
+    def remaining_rows(self):
+        if self.total_rows is None:
+            return None
+        return max(self.total_rows - self.rows_done, 0)
+
+    def __str__(self) -> str:
+        return f"{self.kind} import {self.id} ({self.status})"
+
+
+def export_file_path(instance, filename):
+    return f"exports/{instance.owner_id}/{filename}"
+
+
+class ExportFile(BaseModel):
+    """
+    An owner's export, prebuilt as .csv and .xlsx files by the `export_worker`
+    command (see core/exports.py). `dirty_since` is set by the first change
+    after the last build and `changed_at` by the latest one.
+    """
+
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="export_files"
+    )
+    name = models.CharField(max_length=255)
+    csv_file = models.FileField(
+        upload_to=export_file_path, storage=get_private_storage, blank=True
+    )
+    csv_hash = models.CharField(max_length=64, blank=True)
+    xlsx_file = models.FileField(
+        upload_to=export_file_path, storage=get_private_storage, blank=True
+    )
+    xlsx_hash = models.CharField(max_length=64, blank=True)
+    changed_at = models.DateTimeField(null=True, blank=True)
+    dirty_since = models.DateTimeField(null=True, blank=True)
+    built_at = models.DateTimeField(null=True, blank=True)
+    # The worker building the files and since when.
+    worker = models.CharField(max_length=255, null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "name"], name="exportfile_owner_name"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["dirty_since"],
+                condition=Q(dirty_since__isnull=False),
+                name="exportfile_queue_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} export of {self.owner_id}"
+
+
 class Order(BaseModel):
     class Status(models.TextChoices):
         COMPLETE = "Complete"
@@ -134,6 +319,13 @@ class Order(BaseModel):
     notes = models.TextField(null=True, blank=True)
     email_sent = models.BooleanField(default=False)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["created_by", "-updated_at", "-id"], name="order_cursor_idx"
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.order_number or self.order_number == "":
             self.order_number = self.generate_unique_order_number()
@@ -141,7 +333,7 @@ class Order(BaseModel):
 
     def generate_unique_order_number(self):
         prefix = "ORD"
-        suffix = "".join(random.choices(string.digits, k=5))
+        suffix = ORDER_NUMBERS.next()
         return f"{prefix}-{suffix}"
 
     def order_totals(self):
@@ -171,6 +363,11 @@ class OrderItem(BaseModel):
         db_persist=True,
     )
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=["-updated_at", "-id"], name="orderitem_cursor_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.order.order_number} - {self.product.name} - {self.total}"
 
@@ -219,10 +416,41 @@ class Patient(BaseModel):
     medical_condition = models.TextField(null=True, blank=True)
     last_visit = models.DateField(null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["clinic", "-updated_at", "-id"], name="patient_cursor_idx"
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"{self.first_name} - {self.last_name}"
 
 
+RESERVATION_OVERLAP_CONSTRAINT = "reservation_no_overlap"
+
+
+class ReservationPeriod(Func):
+    """The `[start, end)` timestamp range a reservation occupies."""
+
+    function = "TSRANGE"
+    output_field = DateTimeRangeField()
+
+    def __init__(self, **extra):
+        super().__init__(
+            ExpressionWrapper(
+                F("reservation_date") + F("start_time"),
+                output_field=models.DateTimeField(),
+            ),
+            ExpressionWrapper(
+                F("reservation_date") + F("end_time"),
+                output_field=models.DateTimeField(),
+            ),
+            Value("[)"),
+            **extra,
+        )
+
+
 class Reservation(BaseModel):
     class ReservationType(models.TextChoices):
         GENERAL = "General"
@@ -259,6 +487,44 @@ class Reservation(BaseModel):
     description = models.TextField(null=True, blank=True)
     treatment = models.TextField(null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=["-updated_at", "-id"], name="reservation_cursor_idx"),
+            models.Index(
+                fields=["reservation_date", "start_time"], name="reservation_date_idx"
+            ),
+            # Covers the availability search's busy-interval query.
+            models.Index(
+                fields=["doctor", "reservation_date", "start_time"],
+                include=["end_time", "status"],
+                name="reservation_doctor_idx",
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(end_time__gt=F("start_time"))
+                | Q(start_time=None)
+                | Q(end_time=None),
+                name="reservation_end_after_start",
+            ),
+            # A doctor cannot have two live reservations overlapping in time.
+            # The GiST index behind it needs the btree_gist extension for the
+            # equality on the doctor's uuid.
+            ExclusionConstraint(
+                name=RESERVATION_OVERLAP_CONSTRAINT,
+                expressions=[
+                    ("doctor", RangeOperators.EQUAL),
+                    (ReservationPeriod(), RangeOperators.OVERLAPS),
+                ],
+                condition=Q(
+                    reservation_date__isnull=False,
+                    start_time__isnull=False,
+                    end_time__isnull=False,
+                )
+                & ~Q(status="Cancelled"),
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.reservation_number or self.reservation_number == "":
             self.reservation_number = self.generate_unique_reservation_number()
@@ -266,7 +532,7 @@ class Reservation(BaseModel):
 
     def generate_unique_reservation_number(self):
         prefix = "RSV"
-        suffix = "".join(random.choices(string.digits, k=5))
+        suffix = RESERVATION_NUMBERS.next()
         return f"{prefix}-{suffix}"
 
     def __str__(self) -> str:
@@ -297,12 +563,12 @@ class Bill(BaseModel):
 
     def save(self, *args, **kwargs):
         if not self.bill_number or self.bill_number == "":
-            self.bil = self.generate_unique_bill_number()
+            self.bill_number = self.generate_unique_bill_number()
         super().save(*args, **kwargs)
 
     def generate_unique_bill_number(self):
         prefix = "BLL"
-        suffix = "".join(random.choices(string.digits, k=5))
+        suffix = BILL_NUMBERS.next()
         return f"{prefix}-{suffix}"
 
     def __str__(self) -> str:
@@ -0,0 +1,112 @@
+import datetime
+
+from shared.cache import get_or_compute, invalidate
+
+from .models import Clinic, Patient, Reservation
+
+WEEK_CACHE = "weekly-appointments"
+WEEK_TIMEOUT = 60 * 10
+WEEK_DAYS = 5
+
+APPOINTMENT_COLUMNS = (
+    "id",
+    "reservation_number",
+    "reservation_date",
+    "start_time",
+    "end_time",
+    "status",
+    "reservation_type",
+    "patient_id",
+    "patient__first_name",
+    "patient__last_name",
+    "doctor_id",
+    "doctor__user__first_name",
+    "doctor__user__last_name",
+)
+
+
+def get_user_clinic(user):
+    """The clinic a user owns, or else the first one they are a member of."""
+    return (
+        Clinic.objects.filter(created_by=user).first()
+        or Clinic.objects.filter(members=user).first()
+    )
+
+
+def get_week_start(offset=0, today=None):
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=today.weekday(), weeks=-offset)
+
+
+def appointment(row):
+    return {
+        "id": row["id"],
+        "reservation_number": row["reservation_number"],
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "status": row["status"],
+        "reservation_type": row["reservation_type"],
+        "patient": {
+            "id": row["patient_id"],
+            "first_name": row["patient__first_name"],
+            "last_name": row["patient__last_name"],
+        },
+        "doctor": {
+            "id": row["doctor_id"],
+            "first_name": row["doctor__user__first_name"],
+            "last_name": row["doctor__user__last_name"],
+        },
+    }
+
+
+def get_week_dates(start):
+    return [start + datetime.timedelta(days=i) for i in range(WEEK_DAYS)]
+
+
+def compute_week(clinic_id, start):
+    """The clinic's appointments of the week starting on `start`, by day."""
+    dates = get_week_dates(start)
+    rows = (
+        Reservation.objects.filter(
+            patient__clinic=clinic_id, reservation_date__range=(dates[0], dates[-1])
+        )
+        .order_by("reservation_date", "start_time")
+        .values(*APPOINTMENT_COLUMNS)
+    )
+    appointments = {date: [] for date in dates}
+    for row in rows:
+        appointments[row["reservation_date"]].append(appointment(row))
+    return [{"date": date, "appointments": appointments[date]} for date in dates]
+
+
+def get_week(clinic_id, start):
+    return get_or_compute(
+        WEEK_CACHE,
+        clinic_id,
+        lambda: compute_week(clinic_id, start),
+        WEEK_TIMEOUT,
+        variant=start.isoformat(),
+    )
+
+
+def invalidate_weeks(clinic_id):
+    invalidate(WEEK_CACHE, clinic_id)
+
+
+def invalidate_doctor_weeks(user_id):
+    """The weeks of every clinic the user has appointments in as a doctor."""
+    clinic_ids = (
+        Reservation.objects.filter(doctor__user=user_id)
+        .values_list("patient__clinic", flat=True)
+        .distinct()
+    )
+    for clinic_id in clinic_ids:
+        invalidate_weeks(clinic_id)
+
+
+def invalidate_patient_weeks(patient_id):
+    clinic_id = (
+        Patient.objects.filter(pk=patient_id).values_list("clinic", flat=True).first()
+    )
+    if clinic_id is not None:
+        invalidate_weeks(clinic_id)
@@ -1,11 +1,15 @@
+import datetime
+
 from django.db.models import Sum
 from rest_framework import serializers
 
 from accounts.serializers import UserSerializer
+from shared.serializers import Nested, NestedSerializerMixin, SparseFieldsMixin
 
 from .models import (
     Category,
     Clinic,
+    ImportJob,
     Order,
     OrderItem,
     Patient,
@@ -17,43 +21,73 @@ from .models import (
 from .utils import send_order_email_to_vendor
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
 
 
-class ClinicSerializer(serializers.ModelSerializer):
+class ClinicSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Clinic
         fields = "__all__"
+        nested = {
+            "user": Nested(UserSerializer, source="created_by"),
+            "members": Nested(UserSerializer, many=True),
+        }
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".csv", ".tsv")
+
+    remaining_rows = serializers.IntegerField(read_only=True)
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["user"] = UserSerializer(instance.created_by).data
-        representation["members"] = UserSerializer(
-            instance.members.all(), many=True
-        ).data
-        return representation
+    class Meta:
+        model = ImportJob
+        exclude = ["worker", "heartbeat_at"]
+        read_only_fields = [
+            "owner",
+            "status",
+            "total_rows",
+            "rows_done",
+            "created_count",
+            "updated_count",
+            "unchanged_count",
+            "failed_count",
+            "errors",
+            "error",
+            "attempts",
+            "started_at",
+            "finished_at",
+        ]
+        extra_kwargs = {"file": {"write_only": True}}
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(self.EXTENSIONS):
+            raise serializers.ValidationError(
+                f"Upload one of these file types: {', '.join(self.EXTENSIONS)}."
+            )
+        return value
 
 
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
         fields = "__all__"
+        nested = {"created_by": Nested(UserSerializer)}
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["created_by"] = UserSerializer(instance.created_by).data
-        return representation
 
-
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     stock_status = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Product
         fields = "__all__"
+        nested = {
+            "created_by": Nested(UserSerializer),
+            "category": Nested(CategorySerializer),
+            "vendor": Nested(VendorSerializer),
+        }
 
     def get_stock_status(self, obj):
         if obj.stock_number <= 20 and obj.stock_number > 0:
@@ -62,17 +96,16 @@ class ProductSerializer(serializers.ModelSerializer):
             return "Out of stock"
         return "In stock"
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["created_by"] = UserSerializer(instance.created_by).data
-        representation["category"] = CategorySerializer(instance.category).data
-        representation["vendor"] = VendorSerializer(instance.vendor).data
-        return representation
 
+class OrderItemSerializer(NestedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = "__all__"
+        nested = {"product": Nested(ProductSerializer)}
 
-class OrderSerializer(serializers.ModelSerializer):
+
+class OrderSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     order_items = serializers.ListField(write_only=True)
-    products = serializers.SerializerMethodField(read_only=True)
     all_products = serializers.SerializerMethodField(read_only=True)
     received_products = serializers.SerializerMethodField(read_only=True)
     order_totals = serializers.SerializerMethodField(read_only=True)
@@ -81,22 +114,30 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = "__all__"
-
-    def get_products(self, obj):
-        return OrderItemSerializer(obj.items.all(), many=True).data
+        nested = {
+            "products": Nested(OrderItemSerializer, source="items", many=True),
+            "created_by": Nested(UserSerializer),
+            "vendor": Nested(VendorSerializer),
+        }
 
     def get_all_products(self, obj):
+        if hasattr(obj, "items_count"):
+            return obj.items_count
         return obj.items.all().count()
 
     def get_received_products(self, obj):
+        if hasattr(obj, "received_count"):
+            return obj.received_count
         return obj.items.filter(status="Received").count()
 
     def get_order_totals(self, obj):
+        if hasattr(obj, "items_total"):
+            return obj.items_total
         return obj.items.all().aggregate(total=Sum("total"))["total"]
 
     def get_reception_percentage(self, obj):
-        total = obj.items.all().count()
-        received = obj.items.filter(status="Received").count()
+        total = self.get_all_products(obj)
+        received = self.get_received_products(obj)
         percentage = f"{(received / total) * 100}%" if total else 0
         return percentage
 
@@ -130,6 +171,9 @@ class OrderSerializer(serializers.ModelSerializer):
         instance.notes = validated_data.get("notes", instance.notes)
         instance.vendor = validated_data.get("vendor", instance.vendor)
         instance.save()
+        # The items changed, so the list annotations on this instance are stale.
+        for annotation in ("items_count", "received_count", "items_total"):
+            instance.__dict__.pop(annotation, None)
         return instance
 
     def create(self, validated_data):
@@ -154,55 +198,62 @@ class OrderSerializer(serializers.ModelSerializer):
             order.save()
         return order
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["created_by"] = UserSerializer(instance.created_by).data
-        representation["vendor"] = VendorSerializer(instance.vendor).data
-        return representation
-
 
-class OrderItemSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = OrderItem
-        fields = "__all__"
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["product"] = ProductSerializer(instance.product).data
-        return representation
-
-
-class StaffSerializer(serializers.ModelSerializer):
+class StaffSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Staff
         fields = "__all__"
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["user"] = UserSerializer(instance.user).data
-        return representation
+        nested = {"user": Nested(UserSerializer)}
 
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Patient
         fields = "__all__"
+        nested = {
+            "created_by": Nested(UserSerializer),
+            "clinic": Nested(ClinicSerializer),
+        }
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["created_by"] = UserSerializer(instance.created_by).data
-        representation["clinic"] = ClinicSerializer(instance.clinic).data
-        return representation
 
-
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = "__all__"
+        nested = {
+            "created_by": Nested(UserSerializer),
+            "doctor": Nested(StaffSerializer),
+            "patient": Nested(PatientSerializer),
+        }
+
+    def validate(self, attrs):
+        start_time = attrs.get("start_time", getattr(self.instance, "start_time", None))
+        end_time = attrs.get("end_time", getattr(self.instance, "end_time", None))
+        if start_time and end_time and end_time <= start_time:
+            raise serializers.ValidationError(
+                {"end_time": "The end time must be after the start time."}
+            )
+        return attrs
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 62
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["created_by"] = UserSerializer(instance.created_by).data
-        representation["doctor"] = StaffSerializer(instance.doctor).data
-        representation["patient"] = PatientSerializer(instance.patient).data
-        return representation
+    doctor = serializers.UUIDField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    duration = serializers.IntegerField(min_value=5, max_value=8 * 60, default=30)
+    step = serializers.IntegerField(min_value=5, max_value=8 * 60, required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.setdefault("start_date", datetime.date.today())
+        end_date = attrs.setdefault("end_date", start_date + datetime.timedelta(days=6))
+        if end_date < start_date:
+            raise serializers.ValidationError(
+                {"end_date": "The end date must not be before the start date."}
+            )
+        if (end_date - start_date).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(
+                {"end_date": f"Search at most {self.MAX_DAYS} days at once."}
+            )
+        return attrs
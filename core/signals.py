@@ -1,7 +1,33 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Order, OrderItem
+from .exports import mark_export_changed
+from .inventory import apply_delta, product_delta
+from .models import (
+    Order,
+    OrderItem,
+    Patient,
+    Product,
+    Reservation,
+    Staff,
+    User,
+    Vendor,
+)
+from .schedule import (
+    invalidate_doctor_weeks,
+    invalidate_patient_weeks,
+    invalidate_weeks,
+)
+from .stats import invalidate_patient_stats, invalidate_staff_stats
+
+# The field the cached entries built from a model are scoped by, and the
+# functions invalidating them.
+CACHE_SCOPES = {
+    Staff: ("created_by_id", [invalidate_staff_stats]),
+    Patient: ("clinic_id", [invalidate_patient_stats, invalidate_weeks]),
+    Reservation: ("patient_id", [invalidate_patient_weeks]),
+}
 
 
 # Disable signal during certain operations to prevent recursion
@@ -52,3 +78,99 @@ def mark_order_items_received(sender, instance, **kwargs):
     #         order_item.save()
     #     # Enable signal after performing the operation
     #     enable_signals()
+
+
+@receiver(post_init, sender=Staff)
+@receiver(post_init, sender=Patient)
+@receiver(post_init, sender=Reservation)
+def remember_cache_scope(sender, instance, **kwargs):
+    field, _ = CACHE_SCOPES[sender]
+    instance._cache_scope = instance.__dict__.get(field)
+
+
+@receiver(post_save, sender=Staff)
+@receiver(post_save, sender=Patient)
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Staff)
+@receiver(post_delete, sender=Patient)
+@receiver(post_delete, sender=Reservation)
+def invalidate_caches(sender, instance, **kwargs):
+    field, invalidators = CACHE_SCOPES[sender]
+    # A row moved to another scope changes the entries of both.
+    scopes = {getattr(instance, field), instance._cache_scope} - {None}
+    instance._cache_scope = getattr(instance, field)
+    # After commit, so a concurrent read cannot cache the old data again.
+    for scope in scopes:
+        for invalidate in invalidators:
+            transaction.on_commit(
+                lambda invalidate=invalidate, scope=scope: invalidate(scope)
+            )
+
+
+@receiver(post_init, sender=User)
+def remember_name(sender, instance, **kwargs):
+    instance._name = (
+        instance.__dict__.get("first_name"),
+        instance.__dict__.get("last_name"),
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_doctor_names(sender, instance, created, **kwargs):
+    # Cached weeks show the doctors' names; logins and other saves leave them.
+    name = (instance.first_name, instance.last_name)
+    if created or name == instance._name:
+        return
+    instance._name = name
+    transaction.on_commit(lambda: invalidate_doctor_weeks(instance.pk))
+
+
+@receiver(pre_save, sender=Product)
+def lock_previous_product(sender, instance, **kwargs):
+    # Product.save runs in a transaction: the row stays locked until the
+    # summary delta below is applied.
+    instance._inventory_previous = None
+    if not instance._state.adding:
+        instance._inventory_previous = (
+            Product.objects.select_for_update()
+            .filter(pk=instance.pk)
+            .values_list("created_by", "stock_number", "price")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def update_inventory_summary(sender, instance, **kwargs):
+    previous = getattr(instance, "_inventory_previous", None)
+    delta = product_delta(instance.stock_number, instance.price)
+    if previous is not None:
+        owner_id, stock_number, price = previous
+        if owner_id == instance.created_by_id:
+            delta.subtract(product_delta(stock_number, price))
+        else:
+            apply_delta(owner_id, product_delta(stock_number, price, -1))
+    apply_delta(instance.created_by_id, delta)
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_inventory_summary(sender, instance, **kwargs):
+    apply_delta(
+        instance.created_by_id,
+        product_delta(instance.stock_number, instance.price, -1),
+    )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def mark_products_export_changed(sender, instance, **kwargs):
+    # Vendor names are exported with the products.
+    owners = {instance.created_by_id}
+    previous = getattr(instance, "_inventory_previous", None)
+    if previous is not None:
+        owners.add(previous[0])
+    for owner_id in owners - {None}:
+        transaction.on_commit(
+            lambda owner_id=owner_id: mark_export_changed(owner_id, "products")
+        )
@@ -0,0 +1,107 @@
+from django.db.models import Count, Q, Subquery
+from django.utils import timezone
+
+from shared.cache import get_or_compute, invalidate
+
+from .inventory import SUMMARY_FIELDS, empty_summary
+from .models import Clinic, InventorySummary, Patient, Staff
+
+STATS_TIMEOUT = 60 * 60
+
+STAFF_STATS = "staff-stats"
+PATIENT_STATS = "patient-stats"
+
+
+def percentage(value, total):
+    return f"{(value / total) * 100}%" if total else 0
+
+
+def get_product_stats(owner_id):
+    """Product stats from the owner's InventorySummary, with its update time."""
+    summary = (
+        InventorySummary.objects.filter(owner_id=owner_id)
+        .values(*SUMMARY_FIELDS, "updated_at")
+        .first()
+    )
+    if summary is None:
+        summary = dict(empty_summary(), updated_at=timezone.now())
+
+    products_count = summary["total_products"]
+    low_stock_products = summary["low_stock_products"]
+    out_of_stock_products = summary["out_of_stock_products"]
+    in_stock_products = summary["in_stock_products"]
+    data = {
+        "total_products": products_count,
+        "total_stock_value": summary["total_stock_value"] or 0,
+        "low_stock_products": {
+            "value": low_stock_products,
+            "percentage": percentage(low_stock_products, products_count),
+        },
+        "out_of_stock_products": {
+            "value": out_of_stock_products,
+            "percentage": percentage(out_of_stock_products, products_count),
+        },
+        "in_stock_products": {
+            "value": in_stock_products,
+            "percentage": percentage(in_stock_products, products_count),
+        },
+    }
+    return data, summary["updated_at"].timestamp()
+
+
+def compute_staff_stats(owner_id):
+    return Staff.objects.filter(created_by=owner_id).aggregate(
+        doctor_count=Count("pk", filter=Q(staff_type=Staff.StaffType.DOCTOR)),
+        nurse_count=Count("pk", filter=Q(staff_type=Staff.StaffType.NURSE)),
+        general_count=Count("pk", filter=Q(staff_type=Staff.StaffType.GENERAL)),
+    )
+
+
+def compute_patient_stats(clinic_id):
+    return Patient.objects.filter(clinic=clinic_id).aggregate(
+        active_patient_count=Count("pk", filter=Q(is_active=True)),
+        inactive_patient_count=Count("pk", filter=Q(is_active=False)),
+        total_count=Count("pk"),
+    )
+
+
+def compute_owner_patient_stats(owner_id):
+    # The owner's clinic is resolved in a subquery rather than a separate
+    # Clinic lookup; it is the clinic ClinicPatientStatsApi reports on.
+    clinic = Clinic.objects.filter(created_by=owner_id).values("pk")[:1]
+    return compute_patient_stats(Subquery(clinic))
+
+
+def get_dashboard(owner_id):
+    """
+    Every dashboard metric of an owner, one query per table at most, with the
+    time of the oldest number.
+    """
+    products, products_computed_at = get_product_stats(owner_id)
+    staff, staff_computed_at = get_staff_stats(owner_id)
+    patients = compute_owner_patient_stats(owner_id)
+    data = {"products": products, "staff": staff, "patients": patients}
+    return data, min(products_computed_at, staff_computed_at)
+
+
+def get_staff_stats(owner_id):
+    return get_or_compute(
+        STAFF_STATS, owner_id, lambda: compute_staff_stats(owner_id), STATS_TIMEOUT
+    )
+
+
+def get_patient_stats(clinic_id):
+    return get_or_compute(
+        PATIENT_STATS,
+        clinic_id,
+        lambda: compute_patient_stats(clinic_id),
+        STATS_TIMEOUT,
+    )
+
+
+def invalidate_staff_stats(owner_id):
+    invalidate(STAFF_STATS, owner_id)
+
+
+def invalidate_patient_stats(clinic_id):
+    invalidate(PATIENT_STATS, clinic_id)
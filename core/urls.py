@@ -13,12 +13,26 @@ router.register(r"orderitems", views.OrderItemApi, basename="orderitems")
 router.register(r"staff", views.StaffApi, basename="staff")
 router.register(r"patients", views.PatientApi, basename="patients")
 router.register(r"reservations", views.ReservationApi, basename="reservations")
+router.register(r"import/jobs", views.ImportJobApi, basename="import-jobs")
 
 urlpatterns = [
     path("import/products", views.ImportProductsApi.as_view(), name="import-products"),
     path("import/vendors", views.ImportVendorsApi.as_view(), name="import-vendors"),
     path("products/stats", views.ProductStatsApi.as_view(), name="products-stats"),
-    path("export/products", views.ExportProductsApi.as_view(), name="export-products"),
+    path(
+        "export/<slug:name>.<slug:extension>", views.ExportApi.as_view(), name="export"
+    ),
+    path("export/<slug:name>", views.ExportApi.as_view(), name="export-xlsx"),
+    path(
+        "analytics/<slug:name>.<slug:extension>",
+        views.AnalyticsExportApi.as_view(),
+        name="analytics-export",
+    ),
+    path(
+        "serve/products.<slug:extension>",
+        views.ServeProductsExcelApi.as_view(),
+        name="serve-products-format",
+    ),
     path(
         "serve/products", views.ServeProductsExcelApi.as_view(), name="serve-products"
     ),
@@ -28,6 +42,8 @@ urlpatterns = [
     path("test/pdf", views.TestPdfApi.as_view(), name="email-pdf"),
     path("staff/stats", views.ClinicStaffStatsApi.as_view(), name="staff-stats"),
     path("patient/stats", views.ClinicPatientStatsApi.as_view(), name="patient-stats"),
+    path("dashboard", views.DashboardApi.as_view(), name="dashboard"),
+    path("availability", views.AvailabilityApi.as_view(), name="availability"),
     path(
         "weekly/appointments",
         views.WeeklyAppointmentApi.as_view(),
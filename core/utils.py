@@ -1,17 +1,39 @@
+import hashlib
 import logging
 
 from django.utils import timezone
 
 from shared.email import TemplateEmail
-from shared.pdf import Pdf
+from shared.pdf import Pdf, PdfCache, get_template_version
 
 logger = logging.getLogger("django")
 
+order_pdfs = PdfCache()
 
-def generate_order_pdf(order, request):
-    items = order.items.all()
+
+def get_order_pdf_key(order):
+    """
+    A hash of everything the order PDF shows. The order's own fields are
+    hashed rather than its updated_at, which moves when email_sent is set.
+    """
     clinic = order.created_by.clinics.all()[0]
+    state = [
+        get_template_version("order"),
+        (order.pk, order.order_number, order.notes, order.created_at),
+        (clinic.pk, clinic.updated_at),
+        (order.vendor_id, order.vendor.updated_at if order.vendor_id else None),
+        list(
+            order.items.order_by("pk").values_list(
+                "pk", "updated_at", "product_id", "product__updated_at"
+            )
+        ),
+    ]
+    return hashlib.sha256(repr(state).encode()).hexdigest()
 
+
+def render_order_pdf(order, request):
+    items = order.items.all()
+    clinic = order.created_by.clinics.all()[0]
     selected_template = "order"
 
     pdf = Pdf().generate_pdf(
@@ -27,6 +49,19 @@ def generate_order_pdf(order, request):
     return pdf.get()
 
 
+def generate_order_pdf(order, request, key=None):
+    """
+    The order PDF, rendered once per state of the order (see
+    get_order_pdf_key) and read from the PDF cache after that.
+    """
+    key = key or get_order_pdf_key(order)
+    pdf = order_pdfs.get(key)
+    if pdf is None:
+        pdf = render_order_pdf(order, request)
+        order_pdfs.set(key, pdf)
+    return pdf
+
+
 def send_order_email_to_vendor(order, request):
     template = TemplateEmail(
         to=[order.vendor.email],
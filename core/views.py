@@ -1,23 +1,42 @@
 import calendar
 import datetime
 import logging
-import os
-import random
-
-import pandas as pd
-from django.conf import settings
-from django.db.models import F, Q, Sum
-from django.http import FileResponse, HttpResponse
-from rest_framework import permissions, status, viewsets
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from shared.pdf import Pdf
-
+from shared.cache import set_freshness_headers
+from shared.exports import (
+    CSV_CONTENT_TYPE,
+    XLSX_CONTENT_TYPE,
+    csv_response,
+    serve_file,
+    xlsx_response,
+)
+from shared.pdf import pdf_response
+from shared.views import BaseModelViewSet
+
+from .analytics import ANALYTICS_EXPORTS, CONTENT_TYPES, analytics_response
+from .availability import find_conflicts, find_slots, get_busy_intervals
+from .exceptions import ReservationConflict
+from .exports import EXPORT_DEBOUNCE, EXPORT_FORMATS, EXPORTS, get_export_file
+from .imports import FILE_ERRORS, ProductImporter, VendorImporter, read_frames
 from .models import (
+    RESERVATION_OVERLAP_CONSTRAINT,
     Category,
     Clinic,
+    ImportJob,
     Order,
     OrderItem,
     Patient,
@@ -27,9 +46,12 @@ from .models import (
     Vendor,
 )
 from .permissions import IsOwnerPermission
+from .schedule import get_user_clinic, get_week, get_week_dates, get_week_start
 from .serializers import (
+    AvailabilityQuerySerializer,
     CategorySerializer,
     ClinicSerializer,
+    ImportJobSerializer,
     OrderItemSerializer,
     OrderSerializer,
     PatientSerializer,
@@ -38,12 +60,18 @@ from .serializers import (
     StaffSerializer,
     VendorSerializer,
 )
-from .utils import send_order_email_to_vendor
+from .stats import (
+    get_dashboard,
+    get_patient_stats,
+    get_product_stats,
+    get_staff_stats,
+)
+from .utils import generate_order_pdf, get_order_pdf_key, send_order_email_to_vendor
 
 logger = logging.getLogger(__name__)
 
 
-class ClinicApi(viewsets.ModelViewSet):
+class ClinicApi(BaseModelViewSet):
     queryset = Clinic.objects.all()
     serializer_class = ClinicSerializer
     permission_classes = [IsOwnerPermission]
@@ -52,7 +80,7 @@ class ClinicApi(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
-class VendorApi(viewsets.ModelViewSet):
+class VendorApi(BaseModelViewSet):
     queryset = Vendor.objects.all()
     serializer_class = VendorSerializer
     permission_classes = [IsOwnerPermission]
@@ -64,7 +92,7 @@ class VendorApi(viewsets.ModelViewSet):
         return Vendor.objects.filter(created_by=self.request.user)
 
 
-class OrderApi(viewsets.ModelViewSet):
+class OrderApi(BaseModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsOwnerPermission]
@@ -77,6 +105,37 @@ class OrderApi(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    @action(detail=True)
+    def pdf(self, request, pk=None):
+        """The order PDF, rendered once per state of the order."""
+        order = get_object_or_404(self.get_queryset(), pk=pk)
+        self.check_object_permissions(request, order)
+        key = get_order_pdf_key(order)
+        etag = quote_etag(key)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = pdf_response(
+                generate_order_pdf(order, request, key),
+                filename=f"{order.order_number}.pdf",
+            )
+        response["ETag"] = etag
+        return response
+
+    def filter_queryset(self, queryset):
+        # Annotated here rather than in get_queryset so the conditional GET
+        # validator does not compute the per-order totals.
+        return (
+            super()
+            .filter_queryset(queryset)
+            .annotate(
+                items_count=Count("items"),
+                received_count=Count(
+                    "items", filter=Q(items__status=OrderItem.Status.RECEIVED)
+                ),
+                items_total=Sum("items__total"),
+            )
+        )
+
     def get_queryset(self):
         qs = Order.objects.filter(created_by=self.request.user)
         status = self.request.query_params.get("status", None)
@@ -92,22 +151,23 @@ class OrderApi(viewsets.ModelViewSet):
         return qs
 
 
-class CategoryApi(viewsets.ModelViewSet):
+class CategoryApi(BaseModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class ProductApi(viewsets.ModelViewSet):
+class ProductApi(BaseModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsOwnerPermission]
+    fast_read = True
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
     def get_queryset(self):
-        qs = Product.objects.filter(created_by=self.request.user)[:20]
+        qs = Product.objects.filter(created_by=self.request.user)
         status = self.request.query_params.get("status", None)
         stock_number = self.request.query_params.get("stock_number", None)
         category = self.request.query_params.get("category", None)
@@ -131,175 +191,142 @@ class ProductApi(viewsets.ModelViewSet):
             if status == "in_stock":
                 qs = qs.filter(stock_number__gt=20)
         if name:
-            qs = (
-                qs.filter(name__contains=name.upper()).order_by("name").distinct("name")
-            )
+            qs = qs.filter(name__contains=name.upper())
+            # One product per name, picked in a subquery so the paginator can
+            # still order the page by (updated_at, id).
+            qs = qs.filter(id__in=qs.order_by("name").distinct("name").values("id"))
         return qs
 
 
-class ImportVendorsApi(APIView):
+class ImportApi(APIView):
     parser_classes = [MultiPartParser]
     permission_classes = [IsOwnerPermission]
+    importer_class = None
 
     def post(self, request, format=None):
-        file_obj = request.data["file"]
-        try:
-            # Read the Excel file
-            df = pd.read_excel(file_obj)
-
-            # Validate and save each row
-            vendors = []
-            for _, row in df.iterrows():
-                vendor_data = {
-                    "name": row.get("name"),
-                    "created_by": request.user.id,
-                    "location": row.get("location"),
-                    "phone_number": row.get("contact_number"),
-                    "email": row.get("email"),
-                }
-                serializer = VendorSerializer(data=vendor_data)
-                if serializer.is_valid():
-                    vendors.append(serializer.save())
-                else:
-                    return Response(
-                        serializer.errors, status=status.HTTP_400_BAD_REQUEST
-                    )
-
+        file_obj = request.data.get("file")
+        if file_obj is None:
             return Response(
-                {
-                    "status": "success",
-                    "clients": VendorSerializer(vendors, many=True).data,
-                },
-                status=status.HTTP_201_CREATED,
+                {"file": ["No file was submitted."]},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-        except Exception as e:
+        mode = str(request.data.get("mode", ImportJob.Mode.CREATE)).capitalize()
+        if mode not in ImportJob.Mode.values:
+            return Response(
+                {"mode": [f"Choose one of {', '.join(ImportJob.Mode.values)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        importer = self.importer_class(request.user, mode=mode)
+        try:
+            # The file is read and imported one batch of rows at a time.
+            result = importer.run(read_frames(file_obj))
+        except FILE_ERRORS as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        if result["status"] == "failed":
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
 
-class ImportProductsApi(APIView):
-    parser_classes = [MultiPartParser]
+
+class ImportJobApi(BaseModelViewSet):
+    """
+    Imports run in the background by `manage.py import_worker`. POST a file
+    and a kind, then poll the job for its progress.
+    """
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
     permission_classes = [IsOwnerPermission]
+    parser_classes = [MultiPartParser]
+    http_method_names = ["get", "post", "head", "options"]
 
-    def post(self, request, format=None):
-        file_obj = request.data["file"]
-        try:
-            # Read the Excel file
-            df = pd.read_excel(file_obj)
-
-            # Validate and save each row
-            products = []
-            categories = Category.objects.all()
-            vendors = Vendor.objects.filter(created_by=request.user)
-            for _, row in df.iterrows():
-                product_data = {
-                    "name": row.get("name"),
-                    "created_by": request.user.id,
-                    "image_url": row.get("image"),
-                    "price": row.get("price").replace(",", ""),
-                    "stock_number": random.randint(0, 100),
-                    "vendor": random.choice(vendors).id,
-                    "category": random.choice(categories).id,
-                }
-                serializer = ProductSerializer(data=product_data)
-                if serializer.is_valid():
-                    products.append(serializer.save())
-                else:
-                    return Response(
-                        serializer.errors, status=status.HTTP_400_BAD_REQUEST
-                    )
+    def get_queryset(self):
+        return ImportJob.objects.filter(owner=self.request.user)
 
-            return Response(
-                {
-                    "status": "success",
-                    "clients": ProductSerializer(products, many=True).data,
-                },
-                status=status.HTTP_201_CREATED,
-            )
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+
+class ImportVendorsApi(ImportApi):
+    importer_class = VendorImporter
+
+
+class ImportProductsApi(ImportApi):
+    importer_class = ProductImporter
 
 
 class ProductStatsApi(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, format=None):
-        products = Product.objects.filter(created_by=request.user)
-        products_count = products.count()
-        low_stock_products = products.filter(
-            Q(stock_number__lte=20) & Q(stock_number__gt=0)
-        ).count()
-        out_of_stock_products = products.filter(stock_number=0).count()
-        total_product_value = products.aggregate(
-            total=Sum(F("price") * F("stock_number"))
-        )["total"]
-        return Response(
-            {
-                "total_products": products_count,
-                "total_stock_value": total_product_value if total_product_value else 0,
-                "low_stock_products": {
-                    "value": low_stock_products,
-                    "percentage": f"{(low_stock_products / products_count) * 100}%"
-                    if products_count
-                    else 0,
-                },
-                "out_of_stock_products": {
-                    "value": out_of_stock_products,
-                    "percentage": f"{(out_of_stock_products / products_count) * 100}%"
-                    if products_count
-                    else 0,
-                },
-                "in_stock_products": {
-                    "value": products_count
-                    - (low_stock_products + out_of_stock_products),
-                    "percentage": f"""{(
-                        (products_count - (low_stock_products + out_of_stock_products))
-                        / products_count
-                    )
-                    * 100}%"""
-                    if products_count
-                    else 0,
-                },
-            }
-        )
+        data, computed_at = get_product_stats(request.user.id)
+        return set_freshness_headers(Response(data), computed_at)
+
 
+class ExportApi(APIView):
+    """
+    `GET /export/<name>.csv` streams the export while it is read;
+    `GET /export/<name>` and `/export/<name>.xlsx` send an Excel workbook.
+    """
 
-class ExportProductsApi(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    extensions = ("csv", "xlsx")
 
-    def get(self, request, format=None):
-        products = Product.objects.all()[:10]
-        # Create a DataFrame
-        data = {
-            "Name": [product.name for product in products],
-            "Stock Number": [product.stock_number for product in products],
-            "Price": [product.price for product in products],
-            "Image URL": [product.image_url for product in products],
-        }
-        df = pd.DataFrame(data)
-
-        # Create a response object
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = "attachment; filename=products.xlsx"
+    def get(self, request, name, extension="xlsx", format=None):
+        export = EXPORTS.get(name)
+        if export is None or extension not in self.extensions:
+            raise NotFound()
+        filename = f"{name}-{datetime.date.today()}.{extension}"
+        rows = export.get_rows(request.user)
+        if extension == "csv":
+            return csv_response(export.header, rows, filename)
+        return xlsx_response(export.header, rows, filename, export.title)
 
-        # Write the DataFrame to the response object
-        df.to_excel(response, index=False, engine="openpyxl")
 
-        return response
+class AnalyticsExportApi(APIView):
+    """Typed columnar exports for notebooks (see core/analytics.py)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, name, extension):
+        export = ANALYTICS_EXPORTS.get(name)
+        if export is None:
+            raise NotFound(f'No "{name}" export.')
+        if extension not in CONTENT_TYPES:
+            raise NotFound(f'No "{extension}" export.')
+        schema, batches = export.get_batches(request.user)
+        filename = f"{name}-{datetime.date.today()}.{extension}"
+        return analytics_response(schema, batches, extension, filename)
 
 
 class ServeProductsExcelApi(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    """The owner's products as prebuilt by the `export_worker` command."""
 
-    def get(self, request, format=None):
-        file_path = os.path.join(settings.BASE_DIR, "exports/products.xlsx")
-        return FileResponse(
-            open(file_path, "rb"), as_attachment=True, filename="products.xlsx"
+    permission_classes = [permissions.IsAuthenticated]
+    content_types = {"csv": CSV_CONTENT_TYPE, "xlsx": XLSX_CONTENT_TYPE}
+
+    def get(self, request, extension="xlsx"):
+        if extension not in EXPORT_FORMATS:
+            raise NotFound(f'No "{extension}" export.')
+        export_file = get_export_file(request.user, "products")
+        file = getattr(export_file, f"{extension}_file")
+        if not file:
+            return Response(
+                {"detail": "The export is being prepared."},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": str(EXPORT_DEBOUNCE.seconds)},
+            )
+        return serve_file(
+            request,
+            file,
+            f"products.{extension}",
+            self.content_types[extension],
+            getattr(export_file, f"{extension}_hash"),
+            last_modified=export_file.built_at,
         )
 
 
-class OrderItemApi(viewsets.ModelViewSet):
+class OrderItemApi(BaseModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
     permission_classes = [IsOwnerPermission]
@@ -316,19 +343,7 @@ class TestEmailApi(APIView):
 class TestPdfApi(APIView):
     def get(self, request, format=None):
         order = Order.objects.first()
-        items = order.items.all()
-        clinic = order.created_by.clinics.all()[0]
-
-        selected_template = "order"
-        return (
-            Pdf()
-            .generate_pdf(
-                request,
-                selected_template,
-                {"order": order, "items": items, "clinic": clinic},
-            )
-            .to_response(disposition="inline")
-        )
+        return pdf_response(generate_order_pdf(order, request))
 
 
 class ChangeOrderStatusApi(APIView):
@@ -368,7 +383,7 @@ class SendOrderEmailApi(APIView):
         )
 
 
-class StaffApi(viewsets.ModelViewSet):
+class StaffApi(BaseModelViewSet):
     queryset = Staff.objects.all()
     serializer_class = StaffSerializer
     permission_classes = [IsOwnerPermission]
@@ -396,25 +411,17 @@ class ClinicStaffStatsApi(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, format=None):
-        qs = Staff.objects.filter(created_by=self.request.user)
-        doctor_count = qs.filter(staff_type="Doctor").count()
-        nurse_count = qs.filter(staff_type="Nurse").count()
-        general_count = qs.filter(staff_type="General").count()
-
-        return Response(
-            {
-                "doctor_count": doctor_count,
-                "nurse_count": nurse_count,
-                "general_count": general_count,
-            },
-            status=status.HTTP_200_OK,
+        data, computed_at = get_staff_stats(self.request.user.id)
+        return set_freshness_headers(
+            Response(data, status=status.HTTP_200_OK), computed_at
         )
 
 
-class PatientApi(viewsets.ModelViewSet):
+class PatientApi(BaseModelViewSet):
     queryset = Patient.objects.all()
     serializer_class = PatientSerializer
     permission_classes = [permissions.IsAuthenticated]
+    fast_read = True
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -440,59 +447,151 @@ class PatientApi(viewsets.ModelViewSet):
         return qs
 
 
+class DashboardApi(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, format=None):
+        data, computed_at = get_dashboard(request.user.id)
+        return set_freshness_headers(
+            Response(data, status=status.HTTP_200_OK), computed_at
+        )
+
+
 class ClinicPatientStatsApi(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, format=None):
         clinic = Clinic.objects.filter(created_by=self.request.user).first()
-        qs = Patient.objects.filter(clinic=clinic)
-
-        return Response(
-            {
-                "active_patient_count": qs.filter(is_active=True).count(),
-                "inactive_patient_count": qs.filter(is_active=False).count(),
-                "total_count": qs.count(),
-            },
-            status=status.HTTP_200_OK,
+        data, computed_at = get_patient_stats(clinic.id if clinic else None)
+        return set_freshness_headers(
+            Response(data, status=status.HTTP_200_OK), computed_at
         )
 
 
-class ReservationApi(viewsets.ModelViewSet):
+class ReservationApi(BaseModelViewSet):
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    fast_read = True
 
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        self.save_reservation(serializer, created_by=self.request.user)
 
+    def perform_update(self, serializer):
+        self.save_reservation(serializer)
 
-class WeeklyAppointmentApi(APIView):
-    permission_classes = [permissions.AllowAny]
+    def save_reservation(self, serializer, **kwargs):
+        # Double bookings are rejected by the reservation_no_overlap exclusion
+        # constraint, so concurrent bookings need no lock here.
+        instance = serializer.instance
+        try:
+            with transaction.atomic():
+                serializer.save(**kwargs)
+        except IntegrityError as exc:
+            diag = getattr(exc.__cause__, "diag", None)
+            if getattr(diag, "constraint_name", None) != RESERVATION_OVERLAP_CONSTRAINT:
+                raise
+            data = serializer.validated_data
+
+            def get(field):
+                return data.get(field, getattr(instance, field, None))
+
+            raise ReservationConflict(
+                find_conflicts(
+                    get("doctor"),
+                    get("reservation_date"),
+                    get("start_time"),
+                    get("end_time"),
+                    exclude_pk=instance.pk if instance else None,
+                )
+            )
 
-    def get_current_week_dates(self):
-        today = datetime.date.today()
-        start_of_week = today - datetime.timedelta(days=today.weekday())
-        current_week_dates = [
-            start_of_week + datetime.timedelta(days=i) for i in range(5)
-        ]
-        return current_week_dates
+
+class AvailabilityApi(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        dates = self.get_current_week_dates()
-        # Filter reservations for each date
-        reservations_by_date = []
-        for date in dates:
-            reservations = Reservation.objects.filter(reservation_date=date).order_by(
-                "start_time"
-            )
-            serializer = ReservationSerializer(reservations, many=True)
-            reservations_by_date.append(
-                {
-                    "date": date.day,  # date.strftime("%Y-%m-%d"),
-                    "day": calendar.day_name[date.weekday()][:3],
-                    "today": datetime.date.today().day == date.day,
-                    "appointments": serializer.data,
-                }
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        clinic = get_user_clinic(request.user)
+        if clinic is None:
+            return Response({"results": []})
+
+        doctors = Staff.objects.filter(
+            Q(user__in=clinic.members.all()) | Q(created_by=clinic.created_by_id),
+            staff_type=Staff.StaffType.DOCTOR,
+        )
+        if "doctor" in params:
+            doctors = doctors.filter(pk=params["doctor"])
+        doctors = list(
+            doctors.order_by("user__first_name", "user__last_name").values_list(
+                "id", "working_days", "user__first_name", "user__last_name"
             )
+        )
+
+        doctor_ids = [doctor[0] for doctor in doctors]
+        slots = find_slots(
+            [(doctor_id, working_days) for doctor_id, working_days, *_ in doctors],
+            get_busy_intervals(doctor_ids, params["start_date"], params["end_date"]),
+            params["start_date"],
+            params["end_date"],
+            params["duration"],
+            step=params.get("step"),
+            opening_hour=clinic.opening_hour,
+            closing_hour=clinic.closing_hour,
+            not_before=timezone.localtime().replace(tzinfo=None),
+        )
+        return Response(
+            {
+                "results": [
+                    {
+                        "doctor": doctor_id,
+                        "first_name": first_name,
+                        "last_name": last_name,
+                        "slots": [
+                            {"date": date, "start_time": start, "end_time": end}
+                            for date, start, end in slots[doctor_id]
+                        ],
+                    }
+                    for doctor_id, _, first_name, last_name in doctors
+                ]
+            }
+        )
+
 
-        return Response({"results": reservations_by_date})
+class WeeklyAppointmentApi(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_start(self):
+        try:
+            return get_week_start(int(self.request.query_params.get("week", 0)))
+        except (ValueError, OverflowError):
+            # OverflowError: a week before year 1 or after year 9999.
+            raise ValidationError({"week": "A valid week offset is required."})
+
+    def get(self, request):
+        start = self.get_start()
+        clinic = get_user_clinic(request.user)
+        if clinic is None:
+            days = [
+                {"date": date, "appointments": []} for date in get_week_dates(start)
+            ]
+            computed_at = time.time()
+        else:
+            days, computed_at = get_week(clinic.id, start)
+
+        today = datetime.date.today()
+        reservations_by_date = [
+            {
+                "date": day["date"].day,
+                "day": calendar.day_name[day["date"].weekday()][:3],
+                "today": day["date"] == today,
+                "appointments": day["appointments"],
+            }
+            for day in days
+        ]
+        return set_freshness_headers(
+            Response({"results": reservations_by_date}), computed_at
+        )
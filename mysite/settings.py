@@ -90,6 +90,19 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# e.g. CACHE_URL=rediscache://127.0.0.1:6379/1 in production.
+# Required unless DEBUG: the dashboard stats and weekly appointments are
+# invalidated, and the conditional GETs validated, through this cache, so
+# every worker process has to share it. locmemcache:// is per process.
+
+CACHES = {
+    "default": env.cache(
+        "CACHE_URL", default="locmemcache://" if DEBUG else environ.Env.NOTSET
+    )
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -131,6 +144,18 @@ STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
+# Import uploads and prebuilt exports. Outside MEDIA_ROOT, which may be served
+# publicly; the app serves them to their owner only.
+PRIVATE_FILES_DIR = env(
+    "PRIVATE_FILES_DIR", default=os.path.join(BASE_DIR, "private_files")
+)
+# An nginx `internal` location aliased to PRIVATE_FILES_DIR, e.g. "/protected/".
+# When set, prebuilt exports are sent by nginx through X-Accel-Redirect.
+EXPORTS_ACCEL_REDIRECT = env("EXPORTS_ACCEL_REDIRECT", default=None)
+# Rendered order PDFs, reused while what they show is unchanged. Outside
+# MEDIA_ROOT, which may be served publicly.
+PDF_CACHE_DIR = env("PDF_CACHE_DIR", default=os.path.join(BASE_DIR, "pdf_cache"))
+PDF_CACHE_SIZE = env.int("PDF_CACHE_SIZE", default=256 * 1024 * 1024)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -238,7 +263,8 @@ DEFAULT_FROM_EMAIL = "team@clinicsync.co"
 
 # images
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800
+# Larger uploads are written to a temporary file; imports stream from it.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440
 # end images
 
 
@@ -247,6 +273,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "shared.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "shared.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "shared.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
 }
 
 SIMPLE_JWT = {
@@ -0,0 +1,92 @@
+import time
+
+from django.core.cache import cache
+from django.utils.http import http_date
+
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_generation(name, scope):
+    return cache.get_or_set(f"{name}:{scope}:generation", 0, timeout=None)
+
+
+def invalidate(name, scope):
+    """
+    Bump the generation of `name` for `scope`, so the next read recomputes it.
+
+    Entries are keyed by generation rather than deleted: a value computed from
+    data read before the invalidation lands under the old key and is never
+    served.
+    """
+    key = f"{name}:{scope}:generation"
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The generation expired between add() and incr().
+        cache.add(key, 1, timeout=None)
+
+
+def get_model_changes(models):
+    """
+    The time, in nanoseconds, each of `models` last had a row changed, as
+    recorded by mark_model_changed. Read in one cache call.
+    """
+    keys = [f"changed:{model._meta.label_lower}" for model in models]
+    changes = cache.get_many(keys)
+    for key in keys:
+        if key not in changes:
+            # Unknown, or evicted: counted as changed now.
+            cache.add(key, time.time_ns(), timeout=None)
+            changes[key] = cache.get(key)
+    return [changes[key] for key in keys]
+
+
+def mark_model_changed(model):
+    cache.set(f"changed:{model._meta.label_lower}", time.time_ns(), timeout=None)
+
+
+def get_or_compute(name, scope, compute, timeout, variant=None):
+    """
+    Return `(value, computed_at)` for `name` in `scope` from the cache, calling
+    `compute` on a miss. `variant` tells apart several values of one scope,
+    which `invalidate(name, scope)` all invalidate at once.
+
+    Only one caller computes a missing entry; concurrent callers wait up to
+    LOCK_WAIT seconds for it instead of running the same queries at once.
+    """
+    key = f"{name}:{scope}:{get_generation(name, scope)}"
+    if variant is not None:
+        key = f"{key}:{variant}"
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    lock_key = f"{key}:lock"
+    locked = cache.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+    if not locked:
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry
+
+    try:
+        entry = (compute(), time.time())
+        cache.set(key, entry, timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return entry
+
+
+def set_freshness_headers(response, computed_at):
+    """Tell the client how old a cached value is."""
+    response["Age"] = str(max(0, int(time.time() - computed_at)))
+    response["X-Stats-Computed-At"] = http_date(computed_at)
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Caches each worker process keeps to itself (or not at all), which miss the
+# invalidations made by the others.
+UNSHARED_CACHES = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or settings.CACHES["default"]["BACKEND"] not in UNSHARED_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is not shared between worker processes, so "
+            "cached stats, weeks and ETags go stale on all but the one that "
+            "handled a change.",
+            hint="Set CACHE_URL to a Redis or database cache.",
+            id="shared.W001",
+        )
+    ]
@@ -0,0 +1,212 @@
+"""
+Spreadsheet exports written while the rows are read from the database.
+
+CSV is streamed: each chunk of rows is sent as soon as it is written, so the
+download starts at once and memory stays flat. An .xlsx file is a zip archive
+that can only be finished once every row is in, so it is written in
+openpyxl's write-only mode to a temporary file on disk and then streamed from
+there.
+
+Prebuilt files are served by `serve_file`, with an ETag, Range requests and
+the server's sendfile (or nginx's X-Accel-Redirect) doing the copying.
+"""
+import csv
+import datetime
+import hashlib
+import io
+import re
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from openpyxl import Workbook
+
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+ROWS_PER_CHUNK = 1000
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def iter_csv(header, rows, rows_per_chunk=ROWS_PER_CHUNK):
+    """Yield the CSV text of `header` and `rows`, `rows_per_chunk` at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The byte order mark makes Excel read the file as UTF-8.
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def tee_csv(file_obj, header, rows):
+    """Yield `rows`, writing them under `header` as CSV to binary `file_obj`."""
+    # utf-8-sig starts the file with the byte order mark, as iter_csv does.
+    text = io.TextIOWrapper(file_obj, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        yield row
+    text.flush()
+    # Leaves `file_obj` open.
+    text.detach()
+
+
+def xlsx_value(value):
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        # Excel has no time zones.
+        return timezone.make_naive(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def write_xlsx(file_obj, header, rows, title=None):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append([xlsx_value(value) for value in row])
+    workbook.save(file_obj)
+
+
+def csv_response(header, rows, filename):
+    response = StreamingHttpResponse(
+        iter_csv(header, rows), content_type=CSV_CONTENT_TYPE
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(header, rows, filename, title=None):
+    # Deleted when FileResponse closes it after the download.
+    file_obj = tempfile.TemporaryFile()
+    write_xlsx(file_obj, header, rows, title)
+    file_obj.seek(0)
+    return FileResponse(
+        file_obj,
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def file_hash(file_obj):
+    file_obj.seek(0)
+    digest = hashlib.file_digest(file_obj, "sha256").hexdigest()
+    file_obj.seek(0)
+    return digest
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    The `(first, last)` byte positions of a single `bytes=` range, or None
+    for a header that is malformed or asks for several ranges, which are
+    answered with the whole file.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-500 is the last 500 bytes.
+        if not int(last):
+            raise UnsatisfiableRange
+        return max(size - int(last), 0), size - 1
+    first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        raise UnsatisfiableRange
+    return first, last
+
+
+class FileRange:
+    """The `length` bytes of `file_obj` from its current position."""
+
+    def __init__(self, file_obj, length):
+        self.file_obj = file_obj
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file_obj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file_obj.close()
+
+
+def serve_file(request, file, filename, content_type, etag, last_modified=None):
+    """
+    Respond with the stored `file` (a FieldFile), honouring If-None-Match,
+    If-Range and single Range requests. With the EXPORTS_ACCEL_REDIRECT
+    setting, nginx sends the file itself from that internal location.
+    """
+    etag = f'"{etag}"'
+    timestamp = last_modified.timestamp() if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = file_response(request, file, filename, content_type, etag)
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(timestamp)
+    # Per owner, and revalidated with the ETag before each reuse.
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def file_response(request, file, filename, content_type, etag):
+    if settings.EXPORTS_ACCEL_REDIRECT:
+        # nginx answers Range and conditional requests itself.
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.EXPORTS_ACCEL_REDIRECT + file.name
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        return response
+
+    size = file.size
+    byte_range = None
+    if request.headers.get("Range") and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(request.headers["Range"], size)
+        except UnsatisfiableRange:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    file_obj = file.open("rb")
+    if byte_range is None:
+        response = FileResponse(
+            file_obj, as_attachment=True, filename=filename, content_type=content_type
+        )
+    else:
+        first, last = byte_range
+        file_obj.seek(first)
+        if last < size - 1:
+            # Without a fileno the server copies the range in Python; a range
+            # to the end of the file is sent from the real file.
+            file_obj = FileRange(file_obj, last - first + 1)
+        response = FileResponse(
+            file_obj,
+            status=206,
+            as_attachment=True,
+            filename=filename,
+            content_type=content_type,
+        )
+        response["Content-Length"] = last - first + 1
+        response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
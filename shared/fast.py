@@ -0,0 +1,245 @@
+import functools
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, relations
+from rest_framework.settings import api_settings
+
+from .serializers import get_nested
+
+
+def _converter(field):
+    """Return a callable producing the same value as `field.to_representation`."""
+    if isinstance(field, fields.ChoiceField):
+        return lambda value: field.choice_strings_to_values.get(str(value), value)
+    if isinstance(field, (fields.CharField, fields.UUIDField)):
+        if getattr(field, "uuid_format", "hex_verbose") == "hex_verbose":
+            return str
+    if isinstance(field, fields.IntegerField):
+        return int
+    if isinstance(field, fields.BooleanField):
+        return bool
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return lambda value: value
+    return field.to_representation
+
+
+def _is_iso_datetime(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    return (
+        isinstance(field, fields.DateTimeField)
+        and not hasattr(field, "timezone")
+        and settings.USE_TZ
+        and output_format is not None
+        and output_format.lower() == ISO_8601
+    )
+
+
+class Relation:
+    """A to-many relation loaded for a whole batch of rows in one query."""
+
+    def __init__(self, model_field, parent_column, child=None):
+        self.model_field = model_field
+        self.parent_column = parent_column
+        self.child = child
+
+    def get_lookup(self):
+        if self.model_field.concrete:
+            return self.model_field.related_query_name()
+        return self.model_field.field.name
+
+    def fetch(self, rows, context):
+        ids = {row[self.parent_column] for row in rows} - {None}
+        if not ids:
+            return {}
+
+        lookup = self.get_lookup()
+        queryset = self.model_field.related_model._default_manager.filter(
+            **{f"{lookup}__in": ids}
+        )
+        grouped = {}
+        if self.child is None:
+            pairs = queryset.values_list(lookup, "pk")
+            for parent, pk in pairs:
+                grouped.setdefault(parent, []).append(pk)
+            return grouped
+
+        child_rows = list(queryset.values(*self.child.columns, _fast_parent=F(lookup)))
+        self.child.load(child_rows, context)
+        for row in child_rows:
+            grouped.setdefault(row["_fast_parent"], []).append(
+                self.child.build(row, context, None)
+            )
+        return grouped
+
+
+class FastSerializer:
+    """
+    Read-only representation of a ModelSerializer built from `.values()` rows.
+
+    The serializer's fields and `Meta.nested` declarations are compiled once
+    into a list of columns and per-key steps; rows are then turned into the
+    same dicts the serializer would produce, without instantiating models.
+    Forward relations are read through joined columns and to-many relations
+    with one extra query per relation for the whole batch.
+    """
+
+    def __init__(self, serializer_class, prefix="", root=True):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.prefix = prefix
+        self.root = root
+        self.columns = []
+        self.relations = []
+        self.steps = []
+        self.method_columns = []
+        self.has_methods = False
+        self.compile()
+
+    def add_column(self, name):
+        column = f"{self.prefix}{name}"
+        if column not in self.columns:
+            self.columns.append(column)
+        return column
+
+    def compile(self):
+        serializer = self.serializer_class()
+        nested = get_nested(self.serializer_class)
+        pk_column = self.add_column(self.model._meta.pk.name)
+        if self.root:
+            self.add_column("updated_at")
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in nested:
+                # Filled in by the nested declaration below, in field order.
+                self.steps.append((name, lambda *args: None))
+            else:
+                step = self.compile_field(serializer, name, field, pk_column)
+                self.steps.append((name, step))
+
+        for name, declaration in nested.items():
+            model_field = self.model._meta.get_field(declaration.source)
+            if declaration.many:
+                child = FastSerializer(declaration.serializer_class, root=False)
+                relation = Relation(model_field, pk_column, child)
+                self.relations.append(relation)
+                self.steps.append((name, self.compile_relation(relation)))
+            else:
+                self.steps.append((name, self.compile_nested(declaration)))
+
+    def compile_field(self, serializer, name, field, pk_column):
+        if isinstance(field, fields.SerializerMethodField):
+            return self.compile_method(serializer, field)
+        if isinstance(field, relations.ManyRelatedField):
+            model_field = self.model._meta.get_field(field.source)
+            relation = Relation(model_field, pk_column)
+            self.relations.append(relation)
+            return self.compile_relation(relation)
+        if field.source == "*" or "." in field.source:
+            raise ImproperlyConfigured(
+                f"{self.serializer_class.__name__}.{name} has no column to read."
+            )
+        column = self.add_column(field.source)
+        self.method_columns.append((field.source, column))
+        if isinstance(field, fields.FileField):
+            return self.compile_file(field, column)
+        return self.compile_value(field, column)
+
+    def compile_value(self, field, column):
+        if _is_iso_datetime(field):
+            return self.compile_datetime(column)
+        convert = _converter(field)
+
+        def step(row, context, request, obj):
+            value = row[column]
+            return None if value is None else convert(value)
+
+        return step
+
+    def compile_datetime(self, column):
+        # DateTimeField.to_representation looks the current timezone up for
+        # every value; it is resolved once per batch instead.
+        def step(row, context, request, obj):
+            value = row[column]
+            if value is None:
+                return None
+            value = value.astimezone(context.timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return step
+
+    def compile_file(self, field, column):
+        model_field = self.model._meta.get_field(field.source)
+
+        def step(row, context, request, obj):
+            name = row[column]
+            if not name:
+                return None
+            url = model_field.attr_class(None, model_field, name).url
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return step
+
+    def compile_method(self, serializer, field):
+        self.has_methods = True
+        method = getattr(serializer, field.method_name)
+        return lambda row, context, request, obj: method(obj)
+
+    def compile_relation(self, relation):
+        pk_column = relation.parent_column
+        return lambda row, context, request, obj: context.loaded[relation].get(
+            row[pk_column], []
+        )
+
+    def compile_nested(self, declaration):
+        child = FastSerializer(
+            declaration.serializer_class,
+            prefix=f"{self.prefix}{declaration.source}__",
+            root=False,
+        )
+        for column in child.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+        self.relations.extend(child.relations)
+        null_column = self.add_column(declaration.source)
+        empty = dict(declaration.serializer_class(None).data)
+
+        def step(row, context, request, obj):
+            if row[null_column] is None:
+                return dict(empty)
+            return child.build(row, context, None)
+
+        return step
+
+    def load(self, rows, context):
+        for relation in self.relations:
+            context.loaded[relation] = relation.fetch(rows, context)
+
+    def build(self, row, context, request):
+        obj = None
+        if self.has_methods:
+            obj = SimpleNamespace(
+                **{attr: row[column] for attr, column in self.method_columns}
+            )
+        return {key: step(row, context, request, obj) for key, step in self.steps}
+
+    def values(self, queryset):
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows, request=None):
+        rows = list(rows)
+        context = SimpleNamespace(loaded={}, timezone=timezone.get_current_timezone())
+        self.load(rows, context)
+        return [self.build(row, context, request) for row in rows]
+
+
+@functools.lru_cache(maxsize=None)
+def get_fast_serializer(serializer_class):
+    return FastSerializer(serializer_class)
@@ -0,0 +1,74 @@
+"""
+Business numbers (order, reservation and bill numbers, SKU suffixes) leased in
+blocks from PostgreSQL sequences.
+
+Each sequence is created with `INCREMENT BY BLOCK_SIZE`, so one `nextval()`
+reserves `BLOCK_SIZE` numbers for the calling process, which hands them out
+without going back to the database. Sequences never give a value twice, even
+to concurrent transactions, so numbers are unique across processes and
+threads. Numbers left in a block when a process exits are skipped: numbers
+are unique and increasing per process, not gapless.
+"""
+import os
+import string
+import threading
+
+from django.db import connection
+
+# Must match the INCREMENT BY of the sequences (see core migration 0025).
+BLOCK_SIZE = 100
+
+BASE36_DIGITS = string.digits + string.ascii_uppercase
+
+
+def to_base36(number):
+    digits = []
+    while True:
+        number, remainder = divmod(number, 36)
+        digits.append(BASE36_DIGITS[remainder])
+        if not number:
+            return "".join(reversed(digits))
+
+
+class NumberAllocator:
+    def __init__(self, sequence, block_size=BLOCK_SIZE):
+        self.sequence = sequence
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.blocks = []
+        self.next_number = self.block_end = 0
+
+    def lease(self, blocks):
+        """Reserve `blocks` more blocks in one query."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                [self.sequence, blocks],
+            )
+            self.blocks.extend(start for (start,) in cursor.fetchall())
+
+    def allocate(self, count):
+        """Return `count` unique numbers, leasing any missing blocks at once."""
+        with self.lock:
+            if self.pid != os.getpid():
+                # A forked child must not hand out its parent's numbers.
+                self.reset()
+            numbers = []
+            while len(numbers) < count:
+                if self.next_number >= self.block_end:
+                    if not self.blocks:
+                        missing = count - len(numbers)
+                        self.lease(-(-missing // self.block_size))
+                    self.next_number = self.blocks.pop(0)
+                    self.block_end = self.next_number + self.block_size
+                take = min(count - len(numbers), self.block_end - self.next_number)
+                numbers.extend(range(self.next_number, self.next_number + take))
+                self.next_number += take
+            return numbers
+
+    def next(self):
+        return self.allocate(1)[0]
@@ -0,0 +1,126 @@
+import base64
+import binascii
+import uuid
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over BaseModel's `-updated_at` ordering with `id` as the
+    tiebreaker. Pages are fetched with a `(updated_at, id)` range condition
+    instead of an OFFSET, so deep pages cost the same as the first one.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.reverse = False
+        self.has_cursor = False
+
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            queryset = queryset.order_by("-updated_at", "-id")
+        else:
+            self.has_cursor = True
+            self.reverse, updated_at, pk = cursor
+            if self.reverse:
+                queryset = queryset.filter(updated_at__gte=updated_at).exclude(
+                    Q(updated_at=updated_at) & Q(id__lte=pk)
+                )
+                queryset = queryset.order_by("updated_at", "id")
+            else:
+                queryset = queryset.filter(updated_at__lte=updated_at).exclude(
+                    Q(updated_at=updated_at) & Q(id__gte=pk)
+                )
+                queryset = queryset.order_by("-updated_at", "-id")
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            direction, updated_at, pk = decoded.split("|")
+            updated_at = parse_datetime(updated_at)
+            pk = uuid.UUID(pk)
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if direction not in ("n", "p") or updated_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return direction == "p", updated_at, pk
+
+    def encode_cursor(self, item, reverse):
+        direction = "p" if reverse else "n"
+        if isinstance(item, dict):
+            updated_at, pk = item["updated_at"], item["id"]
+        else:
+            updated_at, pk = item.updated_at, item.id
+        raw = f"{direction}|{updated_at.isoformat()}|{pk}"
+        encoded = base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.page or not (self.has_more or self.reverse):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_cursor:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        if self.reverse and not self.has_more:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
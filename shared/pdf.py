@@ -2,20 +2,242 @@ from __future__ import unicode_literals
 
 import io
 import logging
+import mimetypes
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
 
 import PyPDF2
-import weasyprint
 from django.conf import settings
+from django.contrib.staticfiles import finders
 from django.core.files.storage import FileSystemStorage
 from django.http import HttpResponse
-from django.template.loader import render_to_string
+from django.template.loader import get_template, render_to_string
+from django.utils._os import safe_join
 from rest_framework.response import Response
-from weasyprint import CSS, HTML
+from weasyprint import CSS, HTML, default_url_fetcher
 from weasyprint.text.fonts import FontConfiguration
 
 logger = logging.getLogger("weasyprint")
 logger.addHandler(logging.FileHandler("weasyprint.log"))
 
+PAGE_CSS = """
+    @page { size: %s %s; margin: 1cm; }
+    table {
+        page-break-inside: auto !important;
+    }
+"""
+
+ASSET_CACHE_SIZE = 32 * 1024 * 1024
+# Bigger files are read each time rather than pushing the others out.
+MAX_CACHED_ASSET = 4 * 1024 * 1024
+
+# Parsed stylesheets and their font configuration, per thread: Pango font
+# maps must not be shared between threads.
+_stylesheets = threading.local()
+
+
+def get_stylesheets(selected_template, page_size="A4", layout="portrait"):
+    """
+    Return the font configuration and stylesheets of a template. They are
+    parsed, and the fonts of its @font-face rules loaded, once per thread
+    and page setup, and again when the template's CSS file changes.
+    """
+    path = os.path.join(settings.STATIC_ROOT, "css", f"{selected_template}.css")
+    mtime = os.stat(path).st_mtime_ns
+    if not hasattr(_stylesheets, "cache"):
+        _stylesheets.cache = {}
+    cache = _stylesheets.cache
+    key = (selected_template, page_size, layout)
+    cached = cache.get(key)
+    if cached is None or cached[0] != mtime:
+        font_config = FontConfiguration()
+        stylesheets = [
+            CSS(string=PAGE_CSS % (page_size, layout)),
+            CSS(path, font_config=font_config),
+        ]
+        cached = cache[key] = (mtime, font_config, stylesheets)
+    return cached[1], cached[2]
+
+
+def clear_stylesheets():
+    """Forget the stylesheets parsed by the current thread."""
+    _stylesheets.cache = {}
+
+
+class AssetCache:
+    """
+    The bytes of local files, least recently used first, up to `max_size`
+    bytes in all. A file is read again once its mtime or size changes.
+    """
+
+    def __init__(self, max_size=ASSET_CACHE_SIZE, max_asset_size=MAX_CACHED_ASSET):
+        self.max_size = max_size
+        self.max_asset_size = max_asset_size
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def read(self, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                return data
+        with open(path, "rb") as asset:
+            data = asset.read()
+        if len(data) <= self.max_asset_size:
+            with self.lock:
+                if key not in self.entries:
+                    self.entries[key] = data
+                    self.size += len(data)
+                while self.size > self.max_size:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.size -= len(evicted)
+        return data
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+assets = AssetCache()
+
+
+class LocalUrlFetcher:
+    """
+    A WeasyPrint url_fetcher reading the URLs under STATIC_URL and MEDIA_URL
+    on `hosts` from STATIC_ROOT and MEDIA_ROOT. A render would otherwise
+    request its images and fonts from this same server over HTTP, holding
+    a worker per asset, or deadlocking a server with a single worker.
+    Other URLs go to WeasyPrint's default fetcher.
+    """
+
+    def __init__(self, hosts=()):
+        self.hosts = set(hosts)
+
+    def get_path(self, url):
+        """The local file of `url`, or None for a URL served elsewhere."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return None
+        for base_url, root in (
+            (settings.STATIC_URL, settings.STATIC_ROOT),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT),
+        ):
+            base = urlsplit(base_url)
+            # A relative STATIC_URL or MEDIA_URL is on the site's own hosts.
+            host = parts.netloc == base.netloc or (
+                not base.netloc and parts.netloc in self.hosts
+            )
+            if not root or not host or not parts.path.startswith(base.path):
+                continue
+            name = unquote(parts.path[len(base.path) :])
+            # Raises SuspiciousFileOperation for a path outside the root.
+            path = safe_join(root, name)
+            if root == settings.STATIC_ROOT and not os.path.isfile(path):
+                # Not collected yet, as in development.
+                path = finders.find(name) or path
+            return path
+        return None
+
+    def __call__(self, url, timeout=10, ssl_context=None):
+        path = self.get_path(url)
+        if path is None:
+            return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+        # A missing file fails here instead of with a 404 over HTTP.
+        return {
+            "string": assets.read(path),
+            "mime_type": mimetypes.guess_type(path)[0],
+            "filename": os.path.basename(path),
+        }
+
+
+def get_template_version(selected_template):
+    """The mtimes of a template and of its CSS, which its renders depend on."""
+    template = get_template(f"{selected_template}.html")
+    css = os.path.join(settings.STATIC_ROOT, "css", f"{selected_template}.css")
+    return os.stat(template.origin.name).st_mtime_ns, os.stat(css).st_mtime_ns
+
+
+class PdfCache:
+    """
+    Rendered PDFs on disk, named by a hash of what they were rendered from,
+    so a changed source gets a new entry instead of invalidating one. Once
+    the files add up to more than PDF_CACHE_SIZE bytes, the least recently
+    used are deleted. A file's mtime is its last use.
+    """
+
+    def __init__(self, directory=None, max_size=None):
+        self._directory = directory
+        self._max_size = max_size
+
+    @property
+    def directory(self):
+        return self._directory or settings.PDF_CACHE_DIR
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.PDF_CACHE_SIZE
+
+    def get_path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as pdf:
+                data = pdf.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Never rendered, or evicted by another process meanwhile.
+            return None
+        return data
+
+    def set(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        # Written aside and renamed, so a reader never sees half a file.
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as pdf:
+            pdf.write(data)
+        os.replace(pdf.name, self.get_path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def pdf_response(pdf, filename="document.pdf", disposition="inline"):
+    response = HttpResponse(pdf, content_type="application/pdf;")
+    response["Content-Disposition"] = f"{disposition}; filename={filename}"
+    response["Content-Transfer-Encoding"] = "binary"
+
+    return response
+
 
 class Pdf:
     pdf = None
@@ -29,30 +251,17 @@ class Pdf:
         layout="portrait",
     ):
         context = {} if context is None else context
-        font_config = FontConfiguration()
+        font_config, stylesheets = get_stylesheets(selected_template, page_size, layout)
         html_string = render_to_string(f"{selected_template}.html", context)
-        css = weasyprint.CSS(
-            string="""
-                @page { size: %s %s; margin: 1cm; }
-                table {
-                    page-break-inside: auto !important;
-                }
-                """
-            % (page_size, layout)
-        )
 
         self.pdf = HTML(
-            string=html_string, base_url=request.build_absolute_uri()
+            string=html_string,
+            base_url=request.build_absolute_uri(),
+            url_fetcher=LocalUrlFetcher(hosts=[request.get_host()]),
         ).write_pdf(
             font_config=font_config,
             presentational_hints=True,
-            stylesheets=[
-                css,
-                CSS(
-                    settings.STATIC_ROOT + f"/css/{selected_template}.css",
-                    font_config=font_config,
-                ),
-            ],
+            stylesheets=stylesheets,
         )
 
         return self
@@ -97,11 +306,7 @@ class Pdf:
         return self
 
     def to_response(self, filename="document.pdf", disposition="inline"):
-        response = HttpResponse(self.pdf, content_type="application/pdf;")
-        response["Content-Disposition"] = f"{disposition}; filename={filename}"
-        response["Content-Transfer-Encoding"] = "binary"
-
-        return response
+        return pdf_response(self.pdf, filename, disposition)
 
     def get(self):
         return self.pdf
@@ -0,0 +1,71 @@
+from django.db.models import Prefetch
+
+from .serializers import get_nested
+
+
+def get_queryset_plan(serializer_class, prefix="", sparse=None):
+    """
+    Walk the `Meta.nested` declarations of a serializer and return the
+    `select_related` paths and `Prefetch` objects its representation needs.
+    With `sparse`, only the relations the request expands are planned.
+    """
+    model = serializer_class.Meta.model
+    select_related, prefetch_related = [], []
+
+    for key, nested in get_nested(serializer_class, sparse).items():
+        child_sparse = sparse.child(key) if sparse else None
+        field = model._meta.get_field(nested.source)
+        path = f"{prefix}{nested.source}"
+
+        if field.many_to_many or field.one_to_many:
+            queryset = field.related_model._default_manager.all()
+            prefetch_related.append(
+                Prefetch(
+                    path,
+                    queryset=plan_queryset(
+                        queryset, nested.serializer_class, child_sparse
+                    ),
+                )
+            )
+            continue
+
+        select_related.append(path)
+        child_select, child_prefetch = get_queryset_plan(
+            nested.serializer_class, prefix=f"{path}__", sparse=child_sparse
+        )
+        select_related.extend(child_select)
+        prefetch_related.extend(child_prefetch)
+
+    return select_related, prefetch_related
+
+
+def plan_queryset(queryset, serializer_class, sparse=None):
+    """Apply the serializer's queryset plan to `queryset`."""
+    select_related, prefetch_related = get_queryset_plan(
+        serializer_class, sparse=sparse
+    )
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+def get_related_models(serializer_class, sparse=None):
+    """
+    Return the models of every relation the serializer's representation
+    renders, nested ones included, in the order they are first reached.
+    """
+    model = serializer_class.Meta.model
+    models = []
+
+    for key, nested in get_nested(serializer_class, sparse).items():
+        child_sparse = sparse.child(key) if sparse else None
+        related_model = model._meta.get_field(nested.source).related_model
+        for child in [
+            related_model,
+            *get_related_models(nested.serializer_class, sparse=child_sparse),
+        ]:
+            if child not in models:
+                models.append(child)
+    return models
@@ -0,0 +1,120 @@
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_tree(value):
+    """Parse `id,name,vendor.name` into `{"id": {}, "name": {}, "vendor": {"name": {}}}`."""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+class Sparse:
+    """
+    The fields and expansions requested for one level of a representation.
+
+    `fields` is a tree of field names to render, or None for every field.
+    `expand` is a tree of nested serializers to render; a dotted path in
+    `fields` expands the relation it goes through.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = dict(expand or {})
+        for name, subtree in (fields or {}).items():
+            if subtree:
+                self.expand.setdefault(name, {})
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        fields = request.query_params.get("fields")
+        expand = request.query_params.get("expand")
+        if not fields and expand is None:
+            return None
+        return cls(
+            parse_field_tree(fields) if fields else None,
+            parse_field_tree(expand or ""),
+        )
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields or name in self.expand
+
+    def expands(self, name):
+        return name in self.expand
+
+    def child(self, name):
+        fields = self.fields.get(name) if self.fields else None
+        return Sparse(fields or None, self.expand.get(name))
+
+
+class SparseFieldsMixin:
+    """
+    Limits a read to the `?fields=` the request asked for.
+
+    Nested serializers receive their part of the request through the `sparse`
+    argument; the root serializer reads it from the request in its context.
+    """
+
+    def __init__(self, *args, sparse=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if sparse is None:
+            sparse = Sparse.from_request(self.context.get("request"))
+        self.sparse = sparse
+
+        if sparse is not None and sparse.fields is not None:
+            for name in list(self.fields):
+                if not sparse.includes(name):
+                    self.fields.pop(name)
+
+
+class Nested:
+    """Declares a serializer nested into a parent's representation.
+
+    `source` is the relation on the parent instance and defaults to the key the
+    nested data is rendered under. Declared in a serializer's `Meta.nested` so
+    the representation and the queryset planner share one description.
+    """
+
+    def __init__(self, serializer_class, source=None, many=False):
+        self.serializer_class = serializer_class
+        self.source = source
+        self.many = many
+
+    def bind(self, key):
+        if self.source is None:
+            self.source = key
+
+    def to_representation(self, instance, sparse=None):
+        value = getattr(instance, self.source)
+        if self.many:
+            value = value.all()
+        kwargs = {"many": self.many}
+        if sparse is not None:
+            kwargs["sparse"] = sparse
+        return self.serializer_class(value, **kwargs).data
+
+
+def get_nested(serializer_class, sparse=None):
+    meta = getattr(serializer_class, "Meta", None)
+    nested = getattr(meta, "nested", {})
+    for key, declaration in nested.items():
+        declaration.bind(key)
+    if sparse is None:
+        return nested
+    return {key: value for key, value in nested.items() if sparse.expands(key)}
+
+
+class NestedSerializerMixin(SparseFieldsMixin):
+    """Renders the serializers declared in `Meta.nested` over the plain fields."""
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        for key, nested in get_nested(self.__class__, self.sparse).items():
+            sparse = self.sparse.child(key) if self.sparse else None
+            representation[key] = nested.to_representation(instance, sparse)
+        return representation
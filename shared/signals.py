@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import mark_model_changed
+
+
+def mark_changed_on_commit(*models):
+    # After commit, so a read in between cannot pair the old rows with the
+    # new change time.
+    for model in set(models):
+        transaction.on_commit(lambda model=model: mark_model_changed(model))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def mark_saved_model_changed(sender, **kwargs):
+    mark_changed_on_commit(sender)
+
+
+@receiver(m2m_changed)
+def mark_related_models_changed(sender, instance, model, action, **kwargs):
+    if action.startswith("post_"):
+        mark_changed_on_commit(type(instance), model)
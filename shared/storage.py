@@ -0,0 +1,30 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+
+class PrivateStorage(FileSystemStorage):
+    """
+    Files in PRIVATE_FILES_DIR, which is kept apart from MEDIA_ROOT and never
+    served: they are only read by the app, which checks who may see them.
+    """
+
+    @property
+    def base_location(self):
+        return settings.PRIVATE_FILES_DIR
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("Private files have no URL.")
+
+
+private_storage = PrivateStorage()
+
+
+def get_private_storage():
+    # A callable keeps the storage out of the migrations.
+    return private_storage
@@ -0,0 +1,111 @@
+import datetime
+import io
+import os
+import tempfile
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from core.analytics import ANALYTICS_EXPORTS, write_parquet
+from core.models import Clinic, Order, OrderItem, Patient, Product, Reservation, Staff
+
+from .base_test import BaseTest
+
+
+class AnalyticsExportTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        product = Product.objects.create(created_by=self.user, name="Gauze", price=1)
+        self.order = Order.objects.create(created_by=self.user)
+        # Floats would make these 0.30000000000000004.
+        for price in ("0.10", "0.20"):
+            OrderItem.objects.create(
+                order=self.order, product=product, price=Decimal(price)
+            )
+        other = get_user_model().objects.create(
+            email="other@test.com", first_name="o", last_name="o"
+        )
+        Order.objects.create(created_by=other)
+
+    def download(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return pa.BufferReader(b"".join(response.streaming_content))
+
+    def test_orders_parquet_is_typed(self):
+        table = pq.read_table(self.download("/analytics/orders.parquet"))
+        self.assertEqual(table.num_rows, 1)
+        self.assertEqual(table.schema.field("items_amount").type, pa.decimal128(18, 2))
+        self.assertEqual(table.schema.field("items_count").type, pa.int32())
+        self.assertEqual(
+            table.schema.field("created_at").type, pa.timestamp("us", tz="UTC")
+        )
+        row = table.to_pylist()[0]
+        self.assertEqual(row["id"], str(self.order.pk))
+        self.assertEqual(row["items_amount"], Decimal("0.30"))
+        self.assertEqual(row["created_at"], self.order.created_at)
+
+    def test_order_items_arrow_file_and_stream(self):
+        table = pa.ipc.open_file(
+            self.download("/analytics/order-items.arrow")
+        ).read_all()
+        self.assertEqual(
+            sorted(table["price"].to_pylist()), [Decimal("0.10"), Decimal("0.20")]
+        )
+        self.assertEqual(set(table["product__name"].to_pylist()), {"Gauze"})
+
+        response = self.client.get("/analytics/order-items.arrows")
+        self.assertTrue(response.streaming)
+        reader = pa.ipc.open_stream(b"".join(response.streaming_content))
+        self.assertEqual(reader.read_all().num_rows, 2)
+
+    def test_reservations_and_patients(self):
+        clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        patient = Patient.objects.create(clinic=clinic, first_name="Jane", age=30)
+        doctor = Staff.objects.create(
+            user=self.user, staff_type=Staff.StaffType.DOCTOR, working_days=[]
+        )
+        Reservation.objects.create(
+            patient=patient,
+            doctor=doctor,
+            reservation_date=datetime.date(2024, 7, 15),
+            start_time=datetime.time(9),
+            end_time=datetime.time(9, 30),
+        )
+        reservations = pq.read_table(self.download("/analytics/reservations.parquet"))
+        row = reservations.to_pylist()[0]
+        self.assertEqual(row["reservation_date"], datetime.date(2024, 7, 15))
+        self.assertEqual(row["start_time"], datetime.time(9))
+        self.assertEqual(row["patient_id"], str(patient.pk))
+        patients = pq.read_table(self.download("/analytics/patients.parquet"))
+        self.assertEqual(patients["first_name"].to_pylist(), ["Jane"])
+
+    def test_batches_are_row_groups(self):
+        schema, batches = ANALYTICS_EXPORTS["order-items"].get_batches(
+            self.user, batch_size=1
+        )
+        buffer = io.BytesIO()
+        write_parquet(buffer, schema, batches)
+        buffer.seek(0)
+        self.assertEqual(pq.ParquetFile(buffer).metadata.num_row_groups, 2)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "orders.parquet")
+            call_command(
+                "export_analytics",
+                "orders",
+                output,
+                owner=self.user.email,
+                stdout=io.StringIO(),
+            )
+            self.assertEqual(pq.read_table(output).num_rows, 1)
+        with self.assertRaises(CommandError):
+            call_command("export_analytics", "orders", "orders.csv", owner="x")
+
+    def test_unknown_export(self):
+        self.assertEqual(self.client.get("/analytics/users.parquet").status_code, 404)
+        self.assertEqual(self.client.get("/analytics/orders.csv").status_code, 404)
@@ -0,0 +1,124 @@
+import datetime
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+
+from core.availability import find_slots, merge_intervals, parse_working_days
+from core.models import Clinic, Patient, Reservation, Staff
+
+from .base_test import BaseTest
+
+MONDAY = datetime.date(2024, 7, 15)
+
+
+def times(slots):
+    return [(start.strftime("%H:%M"), end.strftime("%H:%M")) for _, start, end in slots]
+
+
+class AvailabilityEngineTest(SimpleTestCase):
+    def test_parse_working_days(self):
+        self.assertEqual(
+            parse_working_days(["Monday", " wed ", 4, "Someday", 9]), {0, 2, 4}
+        )
+
+    def test_merge_intervals(self):
+        self.assertEqual(
+            merge_intervals([(60, 90), (10, 20), (15, 30), (30, 40)]),
+            [[10, 40], [60, 90]],
+        )
+
+    def test_slots_avoid_reservations(self):
+        slots = find_slots(
+            [("doctor", ["Monday"])],
+            {
+                ("doctor", MONDAY): [(9 * 60, 10 * 60 + 15), (11 * 60, 11 * 60 + 30)],
+                ("other", MONDAY): [(8 * 60, 17 * 60)],
+            },
+            MONDAY,
+            MONDAY + datetime.timedelta(days=6),
+            duration=60,
+            step=30,
+            opening_hour=datetime.time(8),
+            closing_hour=datetime.time(13),
+        )
+        self.assertEqual(
+            times(slots["doctor"]),
+            [("08:00", "09:00"), ("11:30", "12:30"), ("12:00", "13:00")],
+        )
+        self.assertEqual({date for date, *_ in slots["doctor"]}, {MONDAY})
+
+    def test_past_slots_are_skipped(self):
+        slots = find_slots(
+            [("doctor", ["Monday", "Tuesday"])],
+            {},
+            MONDAY - datetime.timedelta(days=7),
+            MONDAY + datetime.timedelta(days=1),
+            duration=60,
+            not_before=datetime.datetime.combine(MONDAY, datetime.time(15, 10)),
+        )
+        self.assertEqual(
+            [(date, start.hour) for date, start, _ in slots["doctor"]],
+            [(MONDAY, 16)]
+            + [(MONDAY + datetime.timedelta(days=1), h) for h in range(8, 17)],
+        )
+
+
+class AvailabilityApiTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.clinic = Clinic.objects.create(
+            name="Clinic",
+            created_by=self.user,
+            opening_hour=datetime.time(9),
+            closing_hour=datetime.time(12),
+        )
+        self.doctor = self.create_doctor(self.clinic)
+        other_clinic = Clinic.objects.create(name="Other Clinic")
+        self.create_doctor(other_clinic)
+        self.patient = Patient.objects.create(clinic=self.clinic, first_name="J", age=3)
+
+    def create_doctor(self, clinic):
+        user = get_user_model().objects.create(
+            email=f"{uuid.uuid4().hex}@test.com", first_name="Doc", last_name="Tor"
+        )
+        clinic.members.add(user)
+        return Staff.objects.create(
+            user=user,
+            staff_type=Staff.StaffType.DOCTOR,
+            working_days=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
+        )
+
+    def test_free_slots_of_the_clinic_doctors(self):
+        start = datetime.date.today() + datetime.timedelta(days=7)
+        start -= datetime.timedelta(days=start.weekday())
+        for status, hour in (
+            (Reservation.Status.PENDING, 9),
+            (Reservation.Status.CANCELLED, 10),
+        ):
+            Reservation.objects.create(
+                patient=self.patient,
+                doctor=self.doctor,
+                reservation_date=start,
+                start_time=datetime.time(hour),
+                end_time=datetime.time(hour, 30),
+                status=status,
+            )
+        response = self.client.get(
+            f"/availability?start_date={start}&end_date={start}&duration=30"
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["doctor"] for result in results], [str(self.doctor.id)]
+        )
+        self.assertEqual(
+            [slot["start_time"] for slot in results[0]["slots"]],
+            ["09:30:00", "10:00:00", "10:30:00", "11:00:00", "11:30:00"],
+        )
+
+    def test_invalid_range(self):
+        response = self.client.get(
+            "/availability?start_date=2024-07-15&end_date=2024-12-31"
+        )
+        self.assertEqual(response.status_code, 400)
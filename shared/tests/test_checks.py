@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase, override_settings
+
+from shared.checks import check_shared_cache
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+REDIS = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    @override_settings(DEBUG=False, CACHES=LOCMEM)
+    def test_process_local_cache_warns(self):
+        self.assertEqual(
+            [message.id for message in check_shared_cache(None)], ["shared.W001"]
+        )
+
+    def test_shared_cache_or_debug_passes(self):
+        with override_settings(DEBUG=False, CACHES=REDIS):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(DEBUG=True, CACHES=LOCMEM):
+            self.assertEqual(check_shared_cache(None), [])
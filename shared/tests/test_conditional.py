@@ -0,0 +1,123 @@
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.imports import ProductImporter
+from core.models import Clinic, Order, OrderItem, Product, Vendor
+
+from .base_test import BaseTest
+
+
+class ConditionalGetTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.vendor = Vendor.objects.create(
+            created_by=self.user, name="Test Vendor", email="test@vendor.com"
+        )
+        self.product = Product.objects.create(
+            created_by=self.user, vendor=self.vendor, name="Test Product", price=10
+        )
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, headers=headers)
+        response.query_count = len(context.captured_queries)
+        return response
+
+    def assertNotModified(self, url, **headers):
+        response = self.get(url, **headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        return response
+
+    def test_list_etag(self):
+        response = self.get("/products/")
+        self.assertEqual(response.status_code, 200)
+        not_modified = self.assertNotModified(
+            "/products/", if_none_match=response["ETag"]
+        )
+        self.assertLess(not_modified.query_count, response.query_count)
+
+    def test_list_last_modified(self):
+        response = self.get("/products/")
+        self.assertNotModified(
+            "/products/", if_modified_since=response["Last-Modified"]
+        )
+
+    def test_detail_etag(self):
+        url = f"/products/{self.product.id}/"
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(url, if_none_match=response["ETag"])
+
+        other = Product.objects.create(created_by=self.user, name="Other", price=1)
+        other_response = self.get(f"/products/{other.id}/")
+        self.assertNotEqual(other_response["ETag"], response["ETag"])
+
+    def test_missing_object_is_not_found(self):
+        url = f"/products/{self.vendor.id}/"
+        self.assertEqual(self.get(url, if_none_match="*").status_code, 404)
+
+    def test_changes_invalidate_the_etag(self):
+        etag = self.get("/products/")["ETag"]
+
+        self.vendor.name = "Renamed Vendor"
+        self.vendor.save()
+        response = self.get("/products/", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+
+        Product.objects.create(created_by=self.user, name="Other", price=1)
+        response = self.get("/products/", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        self.product.delete()
+        response = self.get("/products/", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_string_is_part_of_the_etag(self):
+        etag = self.get("/products/")["ETag"]
+        response = self.get("/products/?fields=id", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_to_many_changes_invalidate_the_etag(self):
+        order = Order.objects.create(created_by=self.user, vendor=self.vendor)
+        etag = self.get("/orders/")["ETag"]
+        OrderItem.objects.create(
+            order=order, product=self.product, price=10, quantity=1
+        )
+        self.assertEqual(self.get("/orders/", if_none_match=etag).status_code, 200)
+
+    def test_validator_reads_only_the_root_rows(self):
+        order = Order.objects.create(created_by=self.user, vendor=self.vendor)
+        OrderItem.objects.create(order=order, product=self.product, price=10)
+        etag = self.get("/orders/")["ETag"]
+        with CaptureQueriesContext(connection) as context:
+            self.assertNotModified("/orders/", if_none_match=etag)
+        validator = context.captured_queries[-1]["sql"]
+        self.assertIn('FROM "core_order"', validator)
+        self.assertNotIn("JOIN", validator)
+
+    def test_nested_changes_invalidate_the_etag(self):
+        order = Order.objects.create(created_by=self.user, vendor=self.vendor)
+        OrderItem.objects.create(order=order, product=self.product, price=10)
+        etag = self.get("/orders/")["ETag"]
+
+        # Bulk imports send no signals.
+        ProductImporter(self.user, mode="Upsert").run(
+            pd.DataFrame(
+                {"name": ["Test Product"], "sku": [self.product.sku], "price": [12]}
+            )
+        )
+        self.assertEqual(self.get("/orders/", if_none_match=etag).status_code, 200)
+
+        clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        etag = self.get("/clinics/")["ETag"]
+        member = get_user_model().objects.create(
+            email="member@test.com", first_name="m", last_name="m"
+        )
+        clinic.members.add(member)
+        self.assertEqual(self.get("/clinics/", if_none_match=etag).status_code, 200)
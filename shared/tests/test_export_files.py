@@ -0,0 +1,163 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import override_settings
+from openpyxl import load_workbook
+
+from core.exports import EXPORT_DEBOUNCE, claim_export_file, process_export_files
+from core.imports import ProductImporter
+from core.models import ExportFile, Product
+
+from .base_test import BaseTest
+
+
+class ExportFileTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.private_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.private_root)
+        settings = override_settings(PRIVATE_FILES_DIR=self.private_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for index in range(3):
+            Product.objects.create(
+                created_by=self.user, name=f"Product {index}", price=index + 1
+            )
+
+    def build(self):
+        call_command("export_worker", "--once", stdout=io.StringIO())
+        return ExportFile.objects.get(owner=self.user, name="products")
+
+    def quiet(self):
+        """Move the last change back past the debounce."""
+        ExportFile.objects.update(
+            changed_at=F("changed_at") - EXPORT_DEBOUNCE,
+            dirty_since=F("dirty_since") - EXPORT_DEBOUNCE,
+        )
+
+    def download(self, path="/serve/products.csv", headers=None):
+        response = self.client.get(path, headers=headers)
+        content = b""
+        if response.status_code in (200, 206):
+            content = b"".join(response.streaming_content)
+        return response, content
+
+    def test_first_download_queues_a_build(self):
+        response = self.client.get("/serve/products")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Retry-After"], "30")
+
+        self.build()
+        response, content = self.download("/serve/products")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(int(response["Content-Length"]), len(content))
+        self.assertIn("products.xlsx", response["Content-Disposition"])
+        export_file = ExportFile.objects.get()
+        self.assertTrue(
+            os.path.exists(os.path.join(self.private_root, export_file.xlsx_file.name))
+        )
+        rows = list(load_workbook(io.BytesIO(content))["Products"].values)
+        self.assertEqual(len(rows), 4)
+
+        response, content = self.download()
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+        self.assertEqual(
+            sorted(row[0] for row in rows[1:]), ["Product 0", "Product 1", "Product 2"]
+        )
+
+    def test_downloads_do_not_query_the_rows(self):
+        self.client.get("/serve/products.csv")
+        self.build()
+        with self.assertNumQueries(2):
+            # The user and the export file.
+            response, _ = self.download()
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_and_ranges(self):
+        self.client.get("/serve/products.csv")
+        self.build()
+        response, content = self.download()
+        etag = response["ETag"]
+
+        response, _ = self.download(headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        response, part = self.download(headers={"Range": "bytes=3-12"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(part, content[3:13])
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Content-Range"], f"bytes 3-12/{len(content)}")
+
+        response, part = self.download(headers={"Range": "bytes=-5"})
+        self.assertEqual(part, content[-5:])
+        response, part = self.download(headers={"Range": "bytes=10-", "If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(part, content[10:])
+
+        # A range of an older version gets the whole new file.
+        response, part = self.download(
+            headers={"Range": "bytes=10-", "If-Range": '"old"'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(part, content)
+
+        response, _ = self.download(headers={"Range": f"bytes={len(content)}-"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(content)}")
+
+    def test_changes_are_debounced(self):
+        self.client.get("/serve/products.csv")
+        export_file = self.build()
+        etag = export_file.csv_hash
+        old_name = export_file.csv_file.name
+
+        product = Product.objects.first()
+        product.name = "Renamed"
+        product.save()
+        ProductImporter(self.user).run(pd.DataFrame({"name": ["New"], "price": [5]}))
+        export_file.refresh_from_db()
+        self.assertIsNotNone(export_file.dirty_since)
+        # Not rebuilt while the rows are still changing.
+        self.assertIsNone(claim_export_file("worker"))
+
+        self.quiet()
+        export_file = self.build()
+        self.assertIsNone(export_file.dirty_since)
+        self.assertNotEqual(export_file.csv_hash, etag)
+        self.assertFalse(export_file.csv_file.storage.exists(old_name))
+        response, content = self.download()
+        self.assertEqual(response["ETag"], f'"{export_file.csv_hash}"')
+        self.assertIn(b"Renamed", content)
+        self.assertIn(b"New", content)
+        self.assertEqual(process_export_files("worker"), 0)
+
+    def test_other_owners_exports_are_untouched(self):
+        self.client.get("/serve/products.csv")
+        self.build()
+        other = get_user_model().objects.create(
+            email="other@test.com", first_name="o", last_name="o"
+        )
+        Product.objects.create(created_by=other, name="Other", price=1)
+        self.assertIsNone(
+            ExportFile.objects.get(owner=self.user, name="products").dirty_since
+        )
+
+    @override_settings(EXPORTS_ACCEL_REDIRECT="/protected/")
+    def test_accel_redirect(self):
+        self.client.get("/serve/products.csv")
+        export_file = self.build()
+        response = self.client.get("/serve/products.csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected/{export_file.csv_file.name}"
+        )
+        self.assertEqual(response["ETag"], f'"{export_file.csv_hash}"')
+        self.assertEqual(response.content, b"")
@@ -0,0 +1,84 @@
+import csv
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from openpyxl import load_workbook
+
+from core.models import Clinic, Order, OrderItem, Patient, Product, Reservation, Staff
+from shared.exports import iter_csv
+
+from .base_test import BaseTest
+
+
+class ExportTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        for index in range(3):
+            Product.objects.create(
+                created_by=self.user, name=f"Product {index}", price=index + 1
+            )
+        other = get_user_model().objects.create(
+            email="other@test.com", first_name="o", last_name="o"
+        )
+        Product.objects.create(created_by=other, name="Not mine", price=1)
+
+    def read_csv(self, response):
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_products_csv_is_streamed(self):
+        response = self.client.get("/export/products.csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn("products-", response["Content-Disposition"])
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0][:2], ["Name", "SKU"])
+        self.assertEqual(
+            sorted(row[0] for row in rows[1:]), ["Product 0", "Product 1", "Product 2"]
+        )
+
+    def test_products_xlsx(self):
+        response = self.client.get("/export/products")
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook["Products"].values)
+        self.assertEqual(rows[0][0], "Name")
+        self.assertEqual(len(rows), 4)
+        self.assertIsInstance(rows[1][-1], datetime.datetime)
+
+    def test_orders_patients_and_reservations(self):
+        order = Order.objects.create(created_by=self.user, notes="Urgent")
+        product = Product.objects.first()
+        for quantity in (1, 2):
+            OrderItem.objects.create(
+                order=order, product=product, quantity=quantity, price=10
+            )
+        clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        patient = Patient.objects.create(clinic=clinic, first_name="Jane", age=30)
+        doctor = Staff.objects.create(
+            user=self.user, staff_type=Staff.StaffType.DOCTOR, working_days=[]
+        )
+        Reservation.objects.create(
+            patient=patient,
+            doctor=doctor,
+            reservation_date=datetime.date(2024, 7, 15),
+            start_time=datetime.time(9),
+            end_time=datetime.time(9, 30),
+        )
+
+        orders = self.read_csv(self.client.get("/export/orders.csv"))
+        self.assertEqual(orders[1][2:5], ["Pending", "2", "30.0"])
+        patients = self.read_csv(self.client.get("/export/patients.csv"))
+        self.assertEqual(patients[1][0], "Jane")
+        reservations = self.read_csv(self.client.get("/export/reservations.csv"))
+        self.assertEqual(reservations[1][1:4], ["2024-07-15", "09:00:00", "09:30:00"])
+
+    def test_unknown_export(self):
+        self.assertEqual(self.client.get("/export/users.csv").status_code, 404)
+        self.assertEqual(self.client.get("/export/products.pdf").status_code, 404)
+
+    def test_csv_chunks(self):
+        chunks = list(iter_csv(["n"], ([i] for i in range(5)), rows_per_chunk=2))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual("".join(chunks), "\ufeffn\r\n0\r\n1\r\n2\r\n3\r\n4\r\n")
@@ -0,0 +1,119 @@
+import datetime
+import uuid
+
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.models import (
+    Category,
+    Clinic,
+    Patient,
+    Product,
+    Reservation,
+    Staff,
+    Vendor,
+)
+from core.serializers import (
+    PatientSerializer,
+    ProductSerializer,
+    ReservationSerializer,
+)
+from shared.fast import get_fast_serializer
+
+from .base_test import BaseTest
+
+
+class FastSerializerTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.request = Request(APIRequestFactory().get("/"))
+
+        vendor = Vendor.objects.create(
+            created_by=self.user,
+            name="Test Vendor",
+            email="test@vendor.com",
+            phone_number="123-456-7890",
+            location="123 Vendor St",
+        )
+        category = Category.objects.create(name="Test Category")
+        for index, stock_number in enumerate([0, 5, 50]):
+            Product.objects.create(
+                created_by=self.user,
+                vendor=vendor,
+                category=category,
+                name=f"Product {index}",
+                price="1234.5",
+                stock_number=stock_number,
+                image="products/test.png",
+            )
+        Product.objects.create(name="Orphan Product", price=1)
+
+        clinic = Clinic.objects.create(
+            name="Test Clinic",
+            created_by=self.user,
+            opening_hour=datetime.time(8),
+        )
+        doctors = []
+        for index in range(2):
+            user = get_user_model().objects.create(
+                email=f"{uuid.uuid4().hex}@test.com",
+                first_name=f"Doctor {index}",
+                last_name="test",
+            )
+            clinic.members.add(user)
+            doctors.append(
+                Staff.objects.create(
+                    created_by=self.user, user=user, working_days=["Monday"]
+                )
+            )
+        Clinic.objects.create(name="Empty Clinic")
+        patient = Patient.objects.create(
+            created_by=self.user,
+            clinic=clinic,
+            first_name="Jane",
+            age=30,
+            last_visit=datetime.date(2024, 7, 1),
+        )
+        Patient.objects.create(clinic=clinic, first_name="John", age=40)
+        for doctor in doctors:
+            Reservation.objects.create(
+                created_by=self.user,
+                patient=patient,
+                doctor=doctor,
+                reservation_date=datetime.date(2024, 7, 15),
+                start_time=datetime.time(9, 30),
+                end_time=datetime.time(10),
+            )
+        Reservation.objects.create(patient=patient, doctor=doctors[0])
+
+    def assertSameJson(self, serializer_class, queryset):
+        expected = serializer_class(
+            queryset, many=True, context={"request": self.request}
+        ).data
+        fast_serializer = get_fast_serializer(serializer_class)
+        rows = fast_serializer.values(queryset)
+        actual = fast_serializer.serialize(rows, self.request)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_products(self):
+        self.assertSameJson(ProductSerializer, Product.objects.all())
+
+    def test_patients(self):
+        self.assertSameJson(PatientSerializer, Patient.objects.all())
+
+    def test_reservations(self):
+        self.assertSameJson(ReservationSerializer, Reservation.objects.all())
+
+    def test_list_endpoint_uses_the_fast_path(self):
+        response = self.client.get("/products/")
+        expected = ProductSerializer(
+            Product.objects.filter(created_by=self.user),
+            many=True,
+            context={"request": Request(response.wsgi_request)},
+        ).data
+        self.assertEqual(
+            JSONRenderer().render(response.json()["results"]),
+            JSONRenderer().render(expected),
+        )
@@ -0,0 +1,135 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from core.imports import VendorImporter
+from core.jobs import (
+    STALE_AFTER,
+    LostJob,
+    checkpoint,
+    claim_job,
+    process_job,
+    process_jobs,
+)
+from core.models import ImportJob, Vendor
+
+from .base_test import BaseTest
+
+
+def vendors_csv(count):
+    lines = ["name,location,email,contact_number"]
+    lines += [f"Vendor {i},Nairobi,{i}@vendor.com,0700{i}" for i in range(count)]
+    lines.append("No email,Nairobi,,0700")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class Crash(BaseException):
+    """Stands in for the worker process being killed."""
+
+
+class ImportJobTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.private_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.private_root)
+        settings = override_settings(
+            MEDIA_ROOT=self.media_root, PRIVATE_FILES_DIR=self.private_root
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_job(self, data, name="vendors.csv"):
+        job = ImportJob(owner=self.user, kind=ImportJob.Kind.VENDORS)
+        job.file.save(name, ContentFile(data))
+        return job
+
+    def test_submit_and_poll_a_job(self):
+        response = self.client.post(
+            "/import/jobs/",
+            {"kind": "Vendors", "file": SimpleUploadedFile("v.csv", vendors_csv(3))},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["status"], "Pending")
+        # Stored privately, under a name that does not tell whose it is.
+        name = ImportJob.objects.get().file.name
+        self.assertRegex(name, r"^imports/[0-9a-f]{32}\.csv$")
+        self.assertTrue(os.path.exists(os.path.join(self.private_root, name)))
+        self.assertEqual(os.listdir(self.media_root), [])
+
+        call_command("import_worker", "--once", stdout=io.StringIO())
+        job = self.client.get(f"/import/jobs/{response.json()['id']}/").json()
+        self.assertEqual(job["status"], "Complete")
+        self.assertEqual(
+            [job[key] for key in ("total_rows", "rows_done", "remaining_rows")],
+            [4, 4, 0],
+        )
+        self.assertEqual((job["created_count"], job["failed_count"]), (3, 1))
+        self.assertEqual(job["errors"][0]["row"], 5)
+        self.assertEqual(Vendor.objects.count(), 3)
+        # The upload is removed once the job is done.
+        self.assertFalse(ImportJob.objects.get().file)
+        self.assertFalse(any(files for _, _, files in os.walk(self.private_root)))
+
+    def test_crashed_job_resumes_from_its_checkpoint(self):
+        job = self.create_job(vendors_csv(25))
+        frames = []
+        import_frame = VendorImporter.import_frame
+
+        def crash_on_third_frame(importer, df):
+            frames.append(df.index[0])
+            if len(frames) == 3:
+                raise Crash
+            import_frame(importer, df)
+
+        with mock.patch.object(VendorImporter, "import_frame", crash_on_third_frame):
+            with self.assertRaises(Crash):
+                process_job(claim_job("first"), chunk_size=10)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_done), (ImportJob.Status.RUNNING, 20))
+        self.assertEqual(Vendor.objects.count(), 20)
+
+        # Not abandoned until the heartbeat is old.
+        self.assertIsNone(claim_job("second"))
+        ImportJob.objects.update(heartbeat_at=job.heartbeat_at - STALE_AFTER)
+        resumed = claim_job("second")
+        self.assertEqual((resumed.pk, resumed.attempts), (job.pk, 2))
+        process_job(resumed, chunk_size=10)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.COMPLETE)
+        self.assertEqual((job.created_count, job.failed_count), (25, 1))
+        self.assertEqual(Vendor.objects.count(), 25)
+
+        # The first worker lost its lease and cannot write to the job any more.
+        resumed.worker = "first"
+        with self.assertRaises(LostJob):
+            checkpoint(resumed, rows_done=0)
+
+    def test_broken_file_fails_the_job(self):
+        job = self.create_job(b"not a spreadsheet", name="vendors.xlsx")
+        process_jobs("worker")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ImportJob.Status.FAILED, 1))
+        self.assertTrue(job.error)
+        self.assertFalse(job.file)
+        self.assertFalse(any(files for _, _, files in os.walk(self.private_root)))
+
+    def test_failure_of_a_lost_job_is_not_saved(self):
+        job = self.create_job(b"not a spreadsheet", name="vendors.xlsx")
+        claimed = claim_job("first")
+        ImportJob.objects.update(worker="second")
+        # Logged, not raised into the worker loop.
+        process_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (ImportJob.Status.RUNNING, "second"))
+        self.assertTrue(job.file.storage.exists(job.file.name))
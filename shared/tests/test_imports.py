@@ -0,0 +1,300 @@
+import io
+import os
+import threading
+import unittest
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.imports import ProductImporter, VendorImporter, read_frames
+from core.inventory import verify_summaries
+from core.models import Category, InventorySummary, Product, Vendor
+
+from .base_test import BaseTest
+
+
+def excel_file(rows, name="products.xlsx"):
+    buffer = io.BytesIO()
+    pd.DataFrame(rows).to_excel(buffer, index=False)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class ProductImportTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Syrups")
+        self.vendor = Vendor.objects.create(
+            created_by=self.user,
+            name="MediCare Supplies Ltd",
+            email="contact@medicare.co.ke",
+            phone_number="123",
+            location="Nairobi",
+        )
+
+    def test_import_products(self):
+        rows = [
+            {
+                "Name": "BENYLIN 4 FLU 200ML",
+                "Price": "2,080",
+                "Stock": 5,
+                "Category": "syrups",
+                "Vendor": "MEDICARE SUPPLIES LTD",
+                "Image": "https://example.com/benylin.jpg",
+            },
+            {"Name": "ABSOLUT CAPS 30S", "Price": 213.5, "Stock": 40},
+            {"Name": None, "Price": "12", "Stock": 1},
+            {"Name": "Bad price", "Price": "twelve", "Stock": -1},
+            {"Name": "Unknown vendor", "Price": "1", "Vendor": "Nobody"},
+        ]
+        response = self.client.post(
+            "/import/products", {"file": excel_file(rows)}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data["created"], data["failed"]), (2, 3))
+        self.assertEqual(
+            {error["row"]: sorted(error["errors"]) for error in data["errors"]},
+            {4: ["name"], 5: ["price", "stock_number"], 6: ["vendor"]},
+        )
+
+        benylin = Product.objects.get(name="BENYLIN 4 FLU 200ML")
+        self.assertEqual(str(benylin.price), "2080.00")
+        self.assertEqual(benylin.category, self.category)
+        self.assertEqual(benylin.vendor, self.vendor)
+        self.assertTrue(benylin.sku.startswith("BEN-"))
+        self.assertIsNone(Product.objects.get(name="ABSOLUT CAPS 30S").vendor)
+
+        summary = InventorySummary.objects.get(owner=self.user)
+        self.assertEqual(summary.total_products, 2)
+        self.assertEqual(str(summary.total_stock_value), "18940.00")
+        self.assertEqual(verify_summaries([self.user.pk]), {})
+
+    def test_chunks_and_duplicate_skus(self):
+        Product.objects.create(name="Existing", price=1, sku="SKU-1")
+        df = pd.DataFrame(
+            {
+                "name": [f"Product {i}" for i in range(25)],
+                "price": ["1.50"] * 25,
+                "sku": ["SKU-1", "SKU-2", "SKU-2"] + [None] * 22,
+            }
+        )
+        with CaptureQueriesContext(connection) as queries:
+            result = ProductImporter(self.user, chunk_size=10).run(df)
+        inserts = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith('INSERT INTO "core_product"')
+        ]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual((result["created"], result["failed"]), (22, 3))
+        self.assertEqual(Product.objects.filter(created_by=self.user).count(), 22)
+
+    def test_rejected_file(self):
+        response = self.client.post(
+            "/import/products",
+            {"file": excel_file([{"name": "No price"}])},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"][0]["errors"],
+            {"price": ["This field is required."]},
+        )
+        self.assertFalse(Product.objects.exists())
+
+
+def rss():
+    """The resident set size of this process, in bytes."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class StreamingImportTest(BaseTest):
+    def test_read_frames(self):
+        data = "name;email\nA;a@x.com\n\t\nB\nC;c@x.com;extra\n".replace(";", "\t")
+        frames = list(
+            read_frames(SimpleUploadedFile("vendors.tsv", data.encode()), size=2)
+        )
+        self.assertEqual([list(frame.index) for frame in frames], [[0], [2, 3]])
+        self.assertEqual(frames[1].values.tolist(), [["B", None], ["C", "c@x.com"]])
+
+        workbook = excel_file([{"name": "A"}, {"name": None}, {"name": "C"}])
+        frames = list(read_frames(workbook, size=10))
+        self.assertEqual(frames[0]["name"].to_dict(), {0: "A", 2: "C"})
+
+    def test_import_vendors_csv(self):
+        data = (
+            "name,location,email,contact_number\n"
+            "MediCare,Nairobi,contact@medicare.co.ke,+254 712 345678\n"
+            "HealthPlus,Mombasa,not-an-email,\n"
+        )
+        response = self.client.post(
+            "/import/vendors",
+            {"file": SimpleUploadedFile("vendors.csv", data.encode("utf-8-sig"))},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.json()["errors"],
+            [
+                {
+                    "row": 3,
+                    "errors": {
+                        "email": ["Enter a valid email address."],
+                        "phone_number": ["This field is required."],
+                    },
+                }
+            ],
+        )
+        vendor = Vendor.objects.get()
+        self.assertEqual(
+            (vendor.name, vendor.phone_number, vendor.created_by),
+            ("MediCare", "+254 712 345678", self.user),
+        )
+
+    @unittest.skipUnless(
+        os.environ.get("SLOW_TESTS") and os.path.exists("/proc/self/statm"),
+        "Set SLOW_TESTS=1 to import 500k rows (a few minutes).",
+    )
+    def test_large_import_memory_is_bounded(self):
+        rows, ceiling = 500_000, 64 * 1024 * 1024
+        upload = TemporaryUploadedFile("vendors.csv", "text/csv", 0, "utf-8")
+        upload.write(b"name,location,email,contact_number\n")
+        for index in range(rows):
+            upload.write(f"V{index},Nairobi,{index}@x.com,0700{index}\n".encode())
+        upload.seek(0)
+
+        baseline, peak, done = rss(), [0], threading.Event()
+
+        def sample():
+            while not done.wait(0.05):
+                peak[0] = max(peak[0], rss())
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        try:
+            result = VendorImporter(self.user).run(read_frames(upload))
+        finally:
+            done.set()
+            sampler.join()
+            upload.close()
+        self.assertEqual(result["created"], rows)
+        self.assertLess(peak[0] - baseline, ceiling)
+
+
+class UpsertImportTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.vendor = Vendor.objects.create(
+            created_by=self.user,
+            name="MediCare",
+            email="contact@medicare.co.ke",
+            phone_number="123",
+            location="Nairobi",
+        )
+        self.catalog = pd.DataFrame(
+            {
+                "name": ["Gauze", "Syrup", "Syrup"],
+                "sku": ["GAU-1", None, None],
+                "price": ["10", "5", "5"],
+                "stock": [30, 10, 0],
+                "vendor": [None, "MediCare", None],
+            }
+        )
+        ProductImporter(self.user).run(self.catalog)
+
+    def upsert(self, df):
+        return ProductImporter(self.user, mode="Upsert").run(df)
+
+    def test_unchanged_catalog_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.upsert(self.catalog)
+        self.assertEqual(
+            [result[key] for key in ("created", "updated", "unchanged")], [0, 0, 3]
+        )
+        self.assertFalse(
+            [
+                query
+                for query in queries.captured_queries
+                if query["sql"].startswith(("INSERT", "UPDATE"))
+            ]
+        )
+
+        # Prices that are not whole numbers are stored as Decimals.
+        catalog = self.catalog.assign(price=["10.10", "19.99", "0.3"])
+        self.upsert(catalog)
+        updated_at = list(Product.objects.order_by("pk").values_list("updated_at"))
+        result = self.upsert(catalog)
+        self.assertEqual(
+            [result[key] for key in ("created", "updated", "unchanged")], [0, 0, 3]
+        )
+        self.assertEqual(
+            list(Product.objects.order_by("pk").values_list("updated_at")), updated_at
+        )
+
+    def test_changed_rows_are_updated_in_place(self):
+        gauze = Product.objects.get(sku="GAU-1")
+        syrup = Product.objects.get(name="Syrup", vendor=self.vendor)
+        catalog = self.catalog.copy()
+        catalog.loc[0, "price"] = "12.50"
+        catalog.loc[1, "stock"] = 3
+        catalog.loc[3] = ["Bandage", None, "2", 50, None]
+
+        result = self.upsert(catalog)
+        self.assertEqual(
+            [result[key] for key in ("created", "updated", "unchanged")], [1, 2, 1]
+        )
+        self.assertEqual(Product.objects.count(), 4)
+        gauze.refresh_from_db()
+        syrup.refresh_from_db()
+        self.assertEqual((str(gauze.price), syrup.stock_number), ("12.50", 3))
+        self.assertEqual(verify_summaries([self.user.pk]), {})
+
+    def test_row_matching_the_product_of_a_sku_row_is_rejected(self):
+        result = self.upsert(
+            pd.DataFrame(
+                {"name": ["Gauze", "Gauze"], "sku": ["GAU-1", None], "price": [11, 12]}
+            )
+        )
+        self.assertEqual((result["updated"], result["failed"]), (1, 1))
+        self.assertEqual(
+            result["errors"],
+            [
+                {
+                    "row": 3,
+                    "errors": {"sku": ["This row matches the same product as row 2."]},
+                }
+            ],
+        )
+        self.assertEqual(str(Product.objects.get(sku="GAU-1").price), "11.00")
+        self.assertEqual(Product.objects.filter(name="Gauze").count(), 1)
+
+    def test_other_owners_skus_are_not_taken_over(self):
+        Product.objects.filter(sku="GAU-1").update(created_by=None)
+        result = self.upsert(self.catalog.iloc[:1])
+        self.assertEqual(
+            result["errors"][0]["errors"],
+            {"sku": ["A product with this SKU already exists."]},
+        )
+
+    def test_vendors_are_matched_on_email(self):
+        df = pd.DataFrame(
+            {
+                "name": ["MediCare", "HealthPlus"],
+                "email": ["CONTACT@medicare.co.ke", "info@healthplus.co.ke"],
+                "contact_number": ["456", "789"],
+                "location": ["Nairobi", "Mombasa"],
+            }
+        )
+        result = VendorImporter(self.user, mode="Upsert").run(df)
+        self.assertEqual(
+            [result[key] for key in ("created", "updated", "unchanged")], [1, 1, 0]
+        )
+        self.vendor.refresh_from_db()
+        self.assertEqual(
+            (self.vendor.phone_number, self.vendor.email),
+            ("456", "CONTACT@medicare.co.ke"),
+        )
+        self.assertEqual(Vendor.objects.count(), 2)
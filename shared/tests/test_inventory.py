@@ -0,0 +1,87 @@
+import uuid
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import InventorySummary, Product
+
+from .base_test import BaseTest
+
+
+class InventorySummaryTest(BaseTest):
+    def create_product(self, stock_number, price=10, owner=None):
+        return Product.objects.create(
+            created_by=owner or self.user,
+            name="Product",
+            price=price,
+            stock_number=stock_number,
+        )
+
+    def get_stats(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/products/stats")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(
+            "core_product", " ".join(q["sql"] for q in context.captured_queries)
+        )
+        return response.json()
+
+    def assertSummaryIsInStep(self):
+        call_command("inventory_summary", stdout=StringIO())
+
+    def test_deltas_follow_product_writes(self):
+        product = self.create_product(5)
+        self.create_product(0)
+        self.create_product(50, price=2)
+        stats = self.get_stats()
+        self.assertEqual(stats["total_products"], 3)
+        self.assertEqual(stats["low_stock_products"]["value"], 1)
+        self.assertEqual(stats["out_of_stock_products"]["value"], 1)
+        self.assertEqual(stats["in_stock_products"]["value"], 1)
+        self.assertEqual(stats["total_stock_value"], 150.0)
+
+        product.stock_number = 0
+        product.price = 3
+        product.save()
+        stats = self.get_stats()
+        self.assertEqual(stats["low_stock_products"]["value"], 0)
+        self.assertEqual(stats["out_of_stock_products"]["value"], 2)
+        self.assertEqual(stats["total_stock_value"], 100.0)
+
+        product.delete()
+        self.assertEqual(self.get_stats()["total_products"], 2)
+        self.assertSummaryIsInStep()
+
+    def test_stale_instances_apply_the_stored_values(self):
+        product = self.create_product(5)
+        stale = Product.objects.get(pk=product.pk)
+        product.stock_number = 0
+        product.save()
+        stale.name = "Renamed"
+        stale.save()
+        self.assertSummaryIsInStep()
+
+    def test_moving_a_product_updates_both_owners(self):
+        other = get_user_model().objects.create(
+            email=f"{uuid.uuid4().hex}@test.com", first_name="a", last_name="b"
+        )
+        product = self.create_product(5)
+        self.create_product(5, owner=other)
+        product.created_by = other
+        product.save()
+        self.assertEqual(self.get_stats()["total_products"], 0)
+        self.assertEqual(InventorySummary.objects.get(owner=other).total_products, 2)
+        self.assertSummaryIsInStep()
+
+    def test_command_verifies_and_rebuilds(self):
+        self.create_product(5)
+        Product.objects.update(stock_number=0)
+        with self.assertRaises(CommandError):
+            call_command("inventory_summary", stdout=StringIO())
+
+        call_command("inventory_summary", "--rebuild", stdout=StringIO())
+        self.assertEqual(self.get_stats()["out_of_stock_products"]["value"], 1)
+        self.assertSummaryIsInStep()
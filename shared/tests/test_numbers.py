@@ -0,0 +1,82 @@
+import datetime
+import threading
+from unittest import mock
+
+from django.db import connection
+
+from core.models import Bill, Clinic, Order, Patient, Product, Reservation, Staff
+from shared.numbers import NumberAllocator, to_base36
+
+from .base_test import BaseTest
+
+SEQUENCE = "core_order_number_seq"
+
+
+class NumberAllocatorTest(BaseTest):
+    def test_numbers_are_leased_in_blocks(self):
+        allocator = NumberAllocator(SEQUENCE)
+        with self.assertNumQueries(1):
+            numbers = [allocator.next() for _ in range(100)]
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 100)))
+        with self.assertNumQueries(1):
+            more = allocator.allocate(250)
+        self.assertEqual(len(set(numbers + more)), 350)
+
+    def test_allocators_never_share_numbers(self):
+        allocators = [NumberAllocator(SEQUENCE) for _ in range(4)]
+        numbers = []
+
+        def allocate(allocator):
+            try:
+                for _ in range(5):
+                    numbers.extend(allocator.allocate(70))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate, args=(a,)) for a in allocators]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(numbers), 4 * 5 * 70)
+        self.assertEqual(len(set(numbers)), len(numbers))
+
+    def test_forked_process_leases_its_own_block(self):
+        allocator = NumberAllocator(SEQUENCE)
+        first = allocator.next()
+        with mock.patch("os.getpid", return_value=allocator.pid + 1):
+            self.assertGreaterEqual(allocator.next(), first + allocator.block_size)
+
+    def test_to_base36(self):
+        self.assertEqual(to_base36(0), "0")
+        self.assertEqual(to_base36(36**5), "100000")
+        self.assertEqual(to_base36(46655), "ZZZ")
+
+
+class BusinessNumbersTest(BaseTest):
+    def test_models_get_unique_numbers(self):
+        clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        patient = Patient.objects.create(clinic=clinic, first_name="J", age=3)
+        doctor = Staff.objects.create(
+            user=self.user, staff_type=Staff.StaffType.DOCTOR, working_days=[]
+        )
+        orders = [Order.objects.create(created_by=self.user) for _ in range(3)]
+        self.assertEqual(len({order.order_number for order in orders}), 3)
+        self.assertRegex(orders[0].order_number, r"^ORD-\d{6,}$")
+
+        products = [
+            Product.objects.create(name="Gauze", price=1, created_by=self.user)
+            for _ in range(3)
+        ]
+        self.assertEqual(len({product.sku for product in products}), 3)
+        self.assertRegex(products[0].sku, r"^GAU-[0-9A-Z]{6,}$")
+
+        reservation = Reservation.objects.create(
+            patient=patient,
+            doctor=doctor,
+            reservation_date=datetime.date(2024, 7, 15),
+        )
+        self.assertRegex(reservation.reservation_number, r"^RSV-\d{6,}$")
+        bill = Bill.objects.create(reservation=reservation)
+        bill.refresh_from_db()
+        self.assertRegex(bill.bill_number, r"^BLL-\d{6,}$")
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.models import Clinic, Order, OrderItem, Product, Vendor
+from core.utils import generate_order_pdf, get_order_pdf_key
+from shared.pdf import PdfCache
+
+from .base_test import BaseTest
+
+PDF = b"%PDF-1.7 order"
+
+
+class OrderPdfTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(PDF_CACHE_DIR=directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        patcher = mock.patch("core.utils.Pdf")
+        self.Pdf = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.Pdf.return_value.generate_pdf.return_value.get.return_value = PDF
+
+        Clinic.objects.create(name="Clinic", created_by=self.user)
+        vendor = Vendor.objects.create(
+            created_by=self.user, name="Vendor", email="vendor@test.com"
+        )
+        self.product = Product.objects.create(
+            created_by=self.user, name="Gauze", price=1
+        )
+        self.order = Order.objects.create(created_by=self.user, vendor=vendor)
+        self.item = OrderItem.objects.create(
+            order=self.order, product=self.product, price=1
+        )
+        self.request = RequestFactory().get("/")
+
+    @property
+    def renders(self):
+        return self.Pdf.return_value.generate_pdf.call_count
+
+    def test_rendered_once_per_state(self):
+        self.assertEqual(generate_order_pdf(self.order, self.request), PDF)
+        self.assertEqual(generate_order_pdf(self.order, self.request), PDF)
+        self.assertEqual(self.renders, 1)
+
+        self.item.quantity = 5
+        self.item.save()
+        generate_order_pdf(self.order, self.request)
+        self.assertEqual(self.renders, 2)
+
+    def test_key_follows_what_the_pdf_shows(self):
+        key = get_order_pdf_key(self.order)
+        # Sending the order does not change its PDF.
+        self.order.email_sent = True
+        self.order.save()
+        self.assertEqual(get_order_pdf_key(self.order), key)
+
+        self.product.name = "Sterile gauze"
+        self.product.save()
+        self.assertNotEqual(get_order_pdf_key(self.order), key)
+
+        key = get_order_pdf_key(self.order)
+        self.order.notes = "Before Friday"
+        self.order.save()
+        self.assertNotEqual(get_order_pdf_key(self.order), key)
+
+    def test_pdf_action(self):
+        path = f"/orders/{self.order.pk}/pdf/"
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f"{self.order.order_number}.pdf", response["Content-Disposition"])
+        self.assertEqual(response.content, PDF)
+
+        response = self.client.get(path, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.renders, 1)
+
+        other = get_user_model().objects.create(
+            email="other@test.com", first_name="o", last_name="o"
+        )
+        order = Order.objects.create(created_by=other)
+        self.assertEqual(self.client.get(f"/orders/{order.pk}/pdf/").status_code, 404)
+
+
+class PdfCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = PdfCache(self.directory, max_size=10)
+
+    def touch(self, key, mtime_ns):
+        os.utime(self.cache.get_path(key), ns=(mtime_ns, mtime_ns))
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", b"pdf")
+        self.assertEqual(self.cache.get("a"), b"pdf")
+        self.assertEqual(os.listdir(self.directory), ["a.pdf"])
+
+    def test_least_recently_used_are_evicted(self):
+        self.cache.set("a", b"aaaa")
+        self.touch("a", 1)
+        self.cache.set("b", b"bbbb")
+        self.touch("b", 2)
+        # Reading "a" makes "b" the least recently used.
+        self.cache.get("a")
+        self.cache.set("c", b"cccc")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), b"aaaa")
+        self.assertEqual(self.cache.get("c"), b"cccc")
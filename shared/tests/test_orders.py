@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Category, Order, OrderItem, Product, Vendor
+
+from .base_test import BaseTest
+
+
+class OrderListTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.vendor = Vendor.objects.create(
+            created_by=self.user,
+            name="Test Vendor",
+            email="test@vendor.com",
+            phone_number="123-456-7890",
+            location="123 Vendor St",
+        )
+        self.category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            created_by=self.user,
+            vendor=self.vendor,
+            category=self.category,
+            name="Test Product",
+            price=10,
+        )
+
+    def create_order(self, received=0, pending=2):
+        order = Order.objects.create(created_by=self.user, vendor=self.vendor)
+        for status, count in (
+            (OrderItem.Status.RECEIVED, received),
+            (OrderItem.Status.PENDING, pending),
+        ):
+            for _ in range(count):
+                OrderItem.objects.create(
+                    order=order,
+                    product=self.product,
+                    price=10,
+                    quantity=2,
+                    status=status,
+                )
+        return order
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/orders/")
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_order_list_query_count_is_constant(self):
+        self.create_order()
+        one_order = self.count_list_queries()
+        for _ in range(4):
+            self.create_order()
+        self.assertEqual(self.count_list_queries(), one_order)
+
+    def test_order_list_uses_annotated_totals(self):
+        self.create_order(received=1, pending=3)
+        order = self.client.get("/orders/").json()["results"][0]
+        self.assertEqual(order["all_products"], 4)
+        self.assertEqual(order["received_products"], 1)
+        self.assertEqual(order["order_totals"], 80.0)
+        self.assertEqual(order["reception_percentage"], "25.0%")
+        self.assertEqual(len(order["products"]), 4)
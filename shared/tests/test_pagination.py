@@ -0,0 +1,51 @@
+from django.utils import timezone
+
+from core.models import Product
+
+from .base_test import BaseTest
+
+
+class KeysetPaginationTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        for index in range(7):
+            Product.objects.create(
+                created_by=self.user, name=f"Product {index}", price=index
+            )
+
+    def walk(self, url, link="next"):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids.extend(product["id"] for product in data["results"])
+            url = data[link]
+        return ids
+
+    def expected_ids(self):
+        products = Product.objects.filter(created_by=self.user).order_by(
+            "-updated_at", "-id"
+        )
+        return [str(pk) for pk in products.values_list("id", flat=True)]
+
+    def test_pages_follow_updated_at_then_id(self):
+        first_page = self.client.get("/products/?page_size=3").json()
+        self.assertEqual(len(first_page["results"]), 3)
+        self.assertIsNone(first_page["previous"])
+        self.assertEqual(self.walk("/products/?page_size=3"), self.expected_ids())
+
+    def test_ties_on_updated_at_are_broken_by_id(self):
+        Product.objects.update(updated_at=timezone.now())
+        self.assertEqual(self.walk("/products/?page_size=2"), self.expected_ids())
+
+    def test_previous_link_returns_to_the_earlier_page(self):
+        first_page = self.client.get("/products/?page_size=3").json()
+        second_page = self.client.get(first_page["next"]).json()
+        back = self.client.get(second_page["previous"]).json()
+        self.assertEqual(back["results"], first_page["results"])
+        self.assertIsNone(back["previous"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/products/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from shared.pdf import (
+    AssetCache,
+    LocalUrlFetcher,
+    Pdf,
+    assets,
+    clear_stylesheets,
+    get_stylesheets,
+)
+
+
+@mock.patch("shared.pdf.FontConfiguration")
+@mock.patch("shared.pdf.CSS")
+class StylesheetCacheTest(SimpleTestCase):
+    def setUp(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        os.mkdir(os.path.join(static_root, "css"))
+        self.path = os.path.join(static_root, "css", "order.css")
+        with open(self.path, "w") as css_file:
+            css_file.write("html { color: red; }")
+        settings = override_settings(STATIC_ROOT=static_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        clear_stylesheets()
+        self.addCleanup(clear_stylesheets)
+
+    def test_parsed_once_per_page_setup(self, CSS, FontConfiguration):
+        font_config, stylesheets = get_stylesheets("order")
+        self.assertEqual(get_stylesheets("order"), (font_config, stylesheets))
+        self.assertEqual(FontConfiguration.call_count, 1)
+        self.assertEqual(CSS.call_count, 2)
+        CSS.assert_called_with(self.path, font_config=font_config)
+
+        get_stylesheets("order", "A5", "landscape")
+        self.assertEqual(FontConfiguration.call_count, 2)
+        self.assertIn("A5 landscape", CSS.call_args_list[2].kwargs["string"])
+
+    def test_changed_css_is_parsed_again(self, CSS, FontConfiguration):
+        get_stylesheets("order")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        get_stylesheets("order")
+        self.assertEqual(FontConfiguration.call_count, 2)
+        self.assertEqual(CSS.call_count, 4)
+
+    @mock.patch("shared.pdf.render_to_string", return_value="<p>Order</p>")
+    @mock.patch("shared.pdf.HTML")
+    def test_renders_reuse_the_stylesheets(
+        self, HTML, render_to_string, CSS, FontConfiguration
+    ):
+        request = RequestFactory().get("/")
+        for _ in range(3):
+            Pdf().generate_pdf(request, "order", {})
+        self.assertEqual(FontConfiguration.call_count, 1)
+        font_config, stylesheets = get_stylesheets("order")
+        HTML.return_value.write_pdf.assert_called_with(
+            font_config=font_config,
+            presentational_hints=True,
+            stylesheets=stylesheets,
+        )
+
+
+class LocalUrlFetcherTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for name in ("static", "media"):
+            os.mkdir(os.path.join(self.root, name))
+        self.write("static/logo.png", b"png")
+        self.write("media/clinic-logos/logo one.jpg", b"jpeg")
+        settings = override_settings(
+            STATIC_ROOT=os.path.join(self.root, "static"),
+            MEDIA_ROOT=os.path.join(self.root, "media"),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        assets.clear()
+        self.fetcher = LocalUrlFetcher(hosts=["testserver"])
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as asset:
+            asset.write(data)
+        return path
+
+    @mock.patch("shared.pdf.default_url_fetcher")
+    def test_static_and_media_are_read_from_disk(self, default_url_fetcher):
+        result = self.fetcher("http://testserver/static/logo.png")
+        self.assertEqual(result["string"], b"png")
+        self.assertEqual(result["mime_type"], "image/png")
+        result = self.fetcher("https://testserver/media/clinic-logos/logo%20one.jpg")
+        self.assertEqual(result["string"], b"jpeg")
+        self.assertEqual(result["mime_type"], "image/jpeg")
+        with self.assertRaises(FileNotFoundError):
+            self.fetcher("http://testserver/media/missing.png")
+        with self.assertRaises(SuspiciousFileOperation):
+            self.fetcher("http://testserver/static/../media/clinic-logos/x.jpg")
+        default_url_fetcher.assert_not_called()
+
+    @mock.patch("shared.pdf.default_url_fetcher")
+    def test_other_urls_use_the_default_fetcher(self, default_url_fetcher):
+        for url in (
+            "http://cdn.example.com/static/logo.png",
+            "http://testserver/api/products",
+            "file:///etc/hostname",
+        ):
+            self.fetcher(url)
+            default_url_fetcher.assert_called_with(url, timeout=10, ssl_context=None)
+
+    def test_assets_are_cached_until_they_change(self):
+        self.fetcher("http://testserver/static/logo.png")
+        with mock.patch("builtins.open") as open_:
+            self.fetcher("http://testserver/static/logo.png")
+        open_.assert_not_called()
+
+        path = self.write("static/logo.png", b"new png")
+        self.assertEqual(assets.read(path), b"new png")
+
+    def test_least_recently_used_assets_are_evicted(self):
+        cache = AssetCache(max_size=10, max_asset_size=6)
+        first = self.write("a", b"aaaa")
+        second = self.write("b", b"bbbb")
+        cache.read(first)
+        cache.read(second)
+        cache.read(first)
+        cache.read(self.write("c", b"cccc"))
+        self.assertEqual(
+            [key[0] for key in cache.entries], [first, os.path.join(self.root, "c")]
+        )
+        self.assertEqual(cache.size, 8)
+        cache.read(self.write("big", b"1234567"))
+        self.assertEqual(cache.size, 8)
+
+    @mock.patch("shared.pdf.render_to_string", return_value="<p>Order</p>")
+    @mock.patch("shared.pdf.get_stylesheets", return_value=(None, []))
+    @mock.patch("shared.pdf.HTML")
+    def test_renders_use_the_local_fetcher(self, HTML, *mocks):
+        Pdf().generate_pdf(RequestFactory().get("/"), "order", {})
+        fetcher = HTML.call_args.kwargs["url_fetcher"]
+        self.assertIsInstance(fetcher, LocalUrlFetcher)
+        self.assertEqual(fetcher.hosts, {"testserver"})
@@ -0,0 +1,95 @@
+import datetime
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import (
+    Category,
+    Clinic,
+    Order,
+    OrderItem,
+    Patient,
+    Product,
+    Reservation,
+    Staff,
+    Vendor,
+)
+
+from .base_test import BaseTest
+
+ENDPOINTS = [
+    "/clinics/",
+    "/vendors/",
+    "/products/",
+    "/categories/",
+    "/orders/",
+    "/orderitems/",
+    "/staff/",
+    "/patients/",
+    "/reservations/",
+]
+
+
+class QueryCountTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.clinic = Clinic.objects.create(name="Test Clinic", created_by=self.user)
+
+    def create_member(self):
+        return get_user_model().objects.create(
+            email=f"{uuid.uuid4().hex}@test.com", first_name="test", last_name="test"
+        )
+
+    def create_records(self):
+        member = self.create_member()
+        self.clinic.members.add(member)
+        Clinic.objects.create(name="Other Clinic", created_by=self.user)
+        vendor = Vendor.objects.create(
+            created_by=self.user,
+            name="Test Vendor",
+            email="test@vendor.com",
+            phone_number="123-456-7890",
+            location="123 Vendor St",
+        )
+        product = Product.objects.create(
+            created_by=self.user,
+            vendor=vendor,
+            category=Category.objects.create(name="Test Category"),
+            name="Test Product",
+            price=10,
+        )
+        order = Order.objects.create(created_by=self.user, vendor=vendor)
+        OrderItem.objects.create(order=order, product=product, price=10)
+        doctor = Staff.objects.create(
+            created_by=self.user,
+            user=member,
+            staff_type=Staff.StaffType.DOCTOR,
+            working_days=["Monday"],
+        )
+        patient = Patient.objects.create(
+            created_by=self.user, clinic=self.clinic, first_name="Jane", age=30
+        )
+        Reservation.objects.create(
+            created_by=self.user,
+            patient=patient,
+            doctor=doctor,
+            reservation_date=datetime.date.today(),
+            start_time=datetime.time(9),
+            end_time=datetime.time(10),
+        )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(context.captured_queries)
+
+    def test_list_query_counts_do_not_grow_with_rows(self):
+        self.create_records()
+        counts = {url: self.count_queries(url) for url in ENDPOINTS}
+        for _ in range(3):
+            self.create_records()
+        for url in ENDPOINTS:
+            self.assertEqual(self.count_queries(url), counts[url], url)
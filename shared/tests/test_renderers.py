@@ -0,0 +1,70 @@
+import datetime
+import decimal
+import io
+import uuid
+import zoneinfo
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.models import OrderItem
+from shared.parsers import ORJSONParser
+from shared.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def assertSameJson(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_the_drf_renderer(self):
+        self.assertSameJson(
+            {
+                "id": uuid.uuid4(),
+                "name": "Prodüct   line",
+                "price": decimal.Decimal("1234.50"),
+                "count": 3,
+                "ratio": 0.25,
+                "active": True,
+                "missing": None,
+                "status": OrderItem.Status.RECEIVED,
+                "label": gettext_lazy("Name"),
+                "tags": ["a", "b"],
+                "date": datetime.date(2024, 7, 15),
+                "time": datetime.time(9, 30),
+                "duration": datetime.timedelta(minutes=30),
+                "created_at": datetime.datetime(
+                    2024, 7, 15, 9, 30, 0, 123456, tzinfo=datetime.timezone.utc
+                ),
+                "updated_at": datetime.datetime(
+                    2024, 7, 15, 9, 30, tzinfo=zoneinfo.ZoneInfo("Africa/Cairo")
+                ),
+                "nested": [{"id": uuid.uuid4(), "items": ({"n": 1},)}],
+            }
+        )
+
+    def test_indented_output_falls_back_to_the_drf_renderer(self):
+        data = {"id": uuid.uuid4(), "items": [1, 2]}
+        context = {"indent": 4}
+        self.assertEqual(
+            ORJSONRenderer().render(data, renderer_context=context),
+            JSONRenderer().render(data, renderer_context=context),
+        )
+
+    def test_none_renders_an_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def test_matches_the_drf_parser(self):
+        body = b'{"name": "Prod\\u00fcct", "price": 1.5, "items": [1, null]}'
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
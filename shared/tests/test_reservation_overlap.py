@@ -0,0 +1,151 @@
+import datetime
+import threading
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from rest_framework.test import APIClient
+
+from core.models import Clinic, Patient, Reservation, Staff
+
+from .base_test import BaseTest
+
+DATE = datetime.date(2024, 7, 15)
+
+
+class ReservationOverlapTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        self.doctor = self.create_doctor()
+        self.patient = Patient.objects.create(clinic=self.clinic, first_name="J", age=3)
+
+    def create_doctor(self):
+        user = get_user_model().objects.create(
+            email=f"{uuid.uuid4().hex}@test.com", first_name="Doc", last_name="Tor"
+        )
+        self.clinic.members.add(user)
+        return Staff.objects.create(
+            user=user, staff_type=Staff.StaffType.DOCTOR, working_days=["Monday"]
+        )
+
+    def payload(self, start, end, doctor=None):
+        return {
+            "patient": str(self.patient.id),
+            "doctor": str((doctor or self.doctor).id),
+            "reservation_date": str(DATE),
+            "start_time": start,
+            "end_time": end,
+        }
+
+    def book(self, start, end, doctor=None, client=None):
+        return (client or self.client).post(
+            "/reservations/", self.payload(start, end, doctor), format="json"
+        )
+
+    def test_overlapping_reservation_is_a_conflict(self):
+        first = self.book("10:00", "10:30")
+        self.assertEqual(first.status_code, 201)
+        response = self.book("10:15", "10:45")
+        self.assertEqual(response.status_code, 409)
+        data = response.json()
+        self.assertEqual(data["conflicts"][0]["id"], first.json()["id"])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_moving_onto_another_reservation_is_a_conflict(self):
+        self.book("10:00", "10:30")
+        second = self.book("11:00", "11:30").json()
+        response = self.client.patch(
+            f"/reservations/{second['id']}/",
+            {"start_time": "10:20", "end_time": "10:50"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_back_to_back_and_cancelled_reservations(self):
+        self.assertEqual(self.book("10:00", "10:30").status_code, 201)
+        self.assertEqual(self.book("10:30", "11:00").status_code, 201)
+        Reservation.objects.filter(start_time=datetime.time(10)).update(
+            status=Reservation.Status.CANCELLED
+        )
+        self.assertEqual(self.book("09:45", "10:30").status_code, 201)
+        self.assertEqual(
+            self.book("10:00", "10:30", self.create_doctor()).status_code, 201
+        )
+
+    def test_end_time_must_follow_start_time(self):
+        response = self.book("10:30", "10:00")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end_time", response.json())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Reservation.objects.create(
+                patient=self.patient,
+                doctor=self.doctor,
+                reservation_date=DATE,
+                start_time=datetime.time(10),
+                end_time=datetime.time(10),
+            )
+
+    def test_concurrent_bookings_of_one_slot(self):
+        barrier = threading.Barrier(2)
+        statuses = []
+
+        def book():
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION="Bearer " + self.token)
+            try:
+                barrier.wait()
+                statuses.append(self.book("10:00", "10:30", client=client).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(statuses), [201, 409])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_other_doctors_are_not_blocked(self):
+        booked, release = threading.Event(), threading.Event()
+        other_doctor = self.create_doctor()
+        statuses = []
+
+        def hold_booking():
+            try:
+                with transaction.atomic():
+                    Reservation.objects.create(
+                        patient=self.patient,
+                        doctor=self.doctor,
+                        reservation_date=DATE,
+                        start_time=datetime.time(10),
+                        end_time=datetime.time(10, 30),
+                    )
+                    booked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        def book_other_doctor():
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION="Bearer " + self.token)
+            try:
+                statuses.append(
+                    self.book("10:00", "10:30", other_doctor, client).status_code
+                )
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_booking)
+        holder.start()
+        self.assertTrue(booked.wait(10))
+        booker = threading.Thread(target=book_other_doctor)
+        booker.start()
+        booker.join(5)
+        finished = not booker.is_alive()
+        release.set()
+        booker.join()
+        holder.join()
+        self.assertTrue(finished)
+        self.assertEqual(statuses, [201])
@@ -0,0 +1,90 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Category, Clinic, Patient, Product, Reservation, Staff, Vendor
+
+from .base_test import BaseTest
+
+
+class SparseFieldsTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.vendor = Vendor.objects.create(
+            created_by=self.user,
+            name="Test Vendor",
+            email="test@vendor.com",
+            phone_number="123-456-7890",
+            location="123 Vendor St",
+        )
+        self.product = Product.objects.create(
+            created_by=self.user,
+            vendor=self.vendor,
+            category=Category.objects.create(name="Test Category"),
+            name="Test Product",
+            price=10,
+        )
+
+    def get_product(self, query):
+        response = self.client.get(f"/products/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"][0]
+
+    def test_fields_limit_the_representation(self):
+        product = self.get_product("fields=id,name,stock_status")
+        self.assertEqual(set(product), {"id", "name", "stock_status"})
+
+    def test_unexpanded_relation_renders_its_key(self):
+        product = self.get_product("fields=id,vendor")
+        self.assertEqual(product["vendor"], str(self.vendor.id))
+
+    def test_expand_renders_the_nested_serializer(self):
+        product = self.get_product("fields=id&expand=vendor")
+        self.assertEqual(product["vendor"]["name"], "Test Vendor")
+        self.assertEqual(product["vendor"]["created_by"], str(self.user.id))
+
+        product = self.get_product("fields=id&expand=vendor.created_by")
+        self.assertEqual(product["vendor"]["created_by"]["full_name"], "test test")
+
+    def test_dotted_fields_expand_the_relation(self):
+        product = self.get_product("fields=id,vendor.name")
+        self.assertEqual(product["vendor"], {"name": "Test Vendor"})
+
+    def test_expand_without_fields_keeps_every_plain_field(self):
+        product = self.get_product("expand=category")
+        self.assertEqual(product["category"]["name"], "Test Category")
+        self.assertEqual(product["vendor"], str(self.vendor.id))
+        self.assertEqual(product["created_by"], str(self.user.id))
+        self.assertEqual(product["price"], "10.00")
+
+    def test_sparse_reads_skip_unrequested_relations(self):
+        with CaptureQueriesContext(connection) as full:
+            self.client.get("/products/")
+        with CaptureQueriesContext(connection) as sparse:
+            self.client.get("/products/?fields=id,name")
+        self.assertNotIn("core_vendor", sparse.captured_queries[-1]["sql"])
+        self.assertIn("core_vendor", full.captured_queries[-1]["sql"])
+
+    def test_nested_reservation_fields(self):
+        clinic = Clinic.objects.create(name="Test Clinic", created_by=self.user)
+        patient = Patient.objects.create(
+            created_by=self.user, clinic=clinic, first_name="Jane", age=30
+        )
+        doctor = Staff.objects.create(
+            created_by=self.user, user=self.user, working_days=["Monday"]
+        )
+        Reservation.objects.create(
+            patient=patient,
+            doctor=doctor,
+            reservation_date=datetime.date.today(),
+        )
+        response = self.client.get(
+            "/reservations/?fields=id,patient.first_name,patient.clinic.name"
+        )
+        reservation = response.json()["results"][0]
+        self.assertEqual(set(reservation), {"id", "patient"})
+        self.assertEqual(
+            reservation["patient"],
+            {"first_name": "Jane", "clinic": {"name": "Test Clinic"}},
+        )
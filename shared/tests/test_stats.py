@@ -0,0 +1,106 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Clinic, Patient, Staff
+from shared.cache import get_or_compute
+
+from .base_test import BaseTest
+
+
+class StatsCacheTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        response.tables = " ".join(query["sql"] for query in context.captured_queries)
+        return response
+
+    def test_staff_stats_are_cached_until_a_staff_member_changes(self):
+        response = self.get("/staff/stats")
+        self.assertEqual(response.json()["doctor_count"], 0)
+        self.assertIn("X-Stats-Computed-At", response)
+        self.assertEqual(response["Age"], "0")
+        self.assertNotIn("core_staff", self.get("/staff/stats").tables)
+
+        Staff.objects.create(
+            created_by=self.user,
+            user=self.user,
+            staff_type=Staff.StaffType.DOCTOR,
+            working_days=["Monday"],
+        )
+        self.assertEqual(self.get("/staff/stats").json()["doctor_count"], 1)
+
+    def test_patient_stats_follow_the_clinic(self):
+        clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        other_clinic = Clinic.objects.create(name="Other Clinic")
+        patient = Patient.objects.create(
+            clinic=clinic, first_name="Jane", age=30, is_active=True
+        )
+        stats = self.get("/patient/stats").json()
+        self.assertEqual(stats["active_patient_count"], 1)
+
+        patient.clinic = other_clinic
+        patient.save()
+        self.assertEqual(self.get("/patient/stats").json()["total_count"], 0)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    get_or_compute("test", "scope", compute, 60)[0]
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_dashboard_matches_the_separate_endpoints(self):
+        clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        Patient.objects.create(clinic=clinic, first_name="Jane", age=30)
+        Staff.objects.create(
+            created_by=self.user,
+            user=self.user,
+            staff_type=Staff.StaffType.NURSE,
+            working_days=["Monday"],
+        )
+        expected = {
+            "products": self.get("/products/stats").json(),
+            "staff": self.get("/staff/stats").json(),
+            "patients": self.get("/patient/stats").json(),
+        }
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/dashboard")
+        self.assertEqual(response.json(), expected)
+        self.assertIn("X-Stats-Computed-At", response)
+        tables = [
+            table
+            for query in context.captured_queries
+            for table in ("core_inventorysummary", "core_staff", "core_patient")
+            if f'FROM "{table}"' in query["sql"]
+        ]
+        self.assertEqual(
+            sorted(tables), ["core_inventorysummary", "core_patient", "core_staff"]
+        )
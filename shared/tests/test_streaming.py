@@ -0,0 +1,46 @@
+import json
+from unittest import mock
+
+from core.models import Order, Product, Vendor
+from core.views import OrderApi, ProductApi
+
+from .base_test import BaseTest
+
+
+class StreamingListTest(BaseTest):
+    def stream(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return json.loads(b"".join(response.streaming_content))
+
+    def by_id(self, items):
+        return sorted(items, key=lambda item: item["id"])
+
+    def test_streams_every_row_in_chunks(self):
+        for index in range(25):
+            Product.objects.create(
+                created_by=self.user, name=f"Product {index}", price=index
+            )
+        with mock.patch.object(ProductApi, "stream_chunk_size", 10):
+            products = self.stream("/products/?stream=1")
+
+        self.assertEqual(len(products), 25)
+        paginated = self.client.get("/products/?page_size=100").json()["results"]
+        self.assertEqual(self.by_id(products), self.by_id(paginated))
+
+    def test_streams_through_the_serializer_class(self):
+        vendor = Vendor.objects.create(
+            created_by=self.user, name="Test Vendor", email="test@vendor.com"
+        )
+        for _ in range(3):
+            Order.objects.create(created_by=self.user, vendor=vendor)
+        with mock.patch.object(OrderApi, "stream_chunk_size", 2):
+            orders = self.stream("/orders/?stream=1")
+
+        paginated = self.client.get("/orders/").json()["results"]
+        self.assertEqual(self.by_id(orders), self.by_id(paginated))
+
+    def test_empty_list(self):
+        self.assertEqual(self.stream("/products/?stream=1"), [])
@@ -0,0 +1,111 @@
+import datetime
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Clinic, Patient, Reservation, Staff
+from core.schedule import get_week_start
+
+from .base_test import BaseTest
+
+
+class WeeklyAppointmentTest(BaseTest):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.clinic = Clinic.objects.create(name="Clinic", created_by=self.user)
+        self.patient = Patient.objects.create(
+            clinic=self.clinic, first_name="Jane", last_name="Doe", age=30
+        )
+        doctor_user = get_user_model().objects.create(
+            email=f"{uuid.uuid4().hex}@test.com", first_name="Gregory", last_name="H"
+        )
+        self.doctor = Staff.objects.create(
+            created_by=self.user, user=doctor_user, working_days=["Monday"]
+        )
+        self.monday = get_week_start()
+
+    def reserve(self, date, start, patient=None):
+        return Reservation.objects.create(
+            patient=patient or self.patient,
+            doctor=self.doctor,
+            reservation_date=date,
+            start_time=datetime.time(start),
+            end_time=datetime.time(start + 1),
+        )
+
+    def get_week(self, query=""):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"/weekly/appointments{query}")
+        self.assertEqual(response.status_code, 200)
+        response.query_count = len(context.captured_queries)
+        return response
+
+    def test_week_is_grouped_by_day_and_ordered(self):
+        self.reserve(self.monday, 11)
+        self.reserve(self.monday, 9)
+        self.reserve(self.monday + datetime.timedelta(days=2), 10)
+        self.reserve(self.monday + datetime.timedelta(days=7), 10)
+
+        days = self.get_week().json()["results"]
+        self.assertEqual(
+            [day["day"] for day in days], ["Mon", "Tue", "Wed", "Thu", "Fri"]
+        )
+        self.assertEqual(days[0]["date"], self.monday.day)
+        self.assertEqual(
+            [a["start_time"] for a in days[0]["appointments"]], ["09:00:00", "11:00:00"]
+        )
+        self.assertEqual(len(days[2]["appointments"]), 1)
+        appointment = days[0]["appointments"][0]
+        self.assertEqual(appointment["patient"]["first_name"], "Jane")
+        self.assertEqual(appointment["doctor"]["first_name"], "Gregory")
+        self.assertEqual(
+            sum(day["today"] for day in days),
+            int(datetime.date.today().weekday() < 5),
+        )
+
+    def test_week_offset(self):
+        self.reserve(self.monday + datetime.timedelta(weeks=-2), 9)
+        days = self.get_week("?week=-2").json()["results"]
+        self.assertEqual(len(days[0]["appointments"]), 1)
+        self.assertFalse(any(day["today"] for day in days))
+        for week in ("next", "1000000", "-1000000", "10" * 20):
+            response = self.client.get(f"/weekly/appointments?week={week}")
+            self.assertEqual(response.status_code, 400)
+
+    def test_other_clinics_are_not_visible(self):
+        other_clinic = Clinic.objects.create(name="Other Clinic")
+        other_patient = Patient.objects.create(
+            clinic=other_clinic, first_name="John", age=40
+        )
+        self.reserve(self.monday, 9, patient=other_patient)
+        days = self.get_week().json()["results"]
+        self.assertEqual(sum(len(day["appointments"]) for day in days), 0)
+
+    def test_week_is_cached_until_a_reservation_changes(self):
+        reservation = self.reserve(self.monday, 9)
+        first = self.get_week()
+        cached = self.get_week()
+        self.assertLess(cached.query_count, first.query_count)
+
+        reservation.start_time = datetime.time(14)
+        reservation.end_time = datetime.time(15)
+        reservation.save()
+        days = self.get_week().json()["results"]
+        self.assertEqual(days[0]["appointments"][0]["start_time"], "14:00:00")
+
+        reservation.delete()
+        days = self.get_week().json()["results"]
+        self.assertEqual(days[0]["appointments"], [])
+
+    def test_week_is_refreshed_when_a_doctor_is_renamed(self):
+        self.reserve(self.monday, 9)
+        self.get_week()
+        user = self.doctor.user
+        user.first_name = "Greg"
+        user.save()
+        days = self.get_week().json()["results"]
+        self.assertEqual(days[0]["appointments"][0]["doctor"]["first_name"], "Greg")
@@ -1 +1,162 @@
-# Create your views here.
+import hashlib
+import itertools
+
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import viewsets
+from rest_framework.response import Response
+
+from .cache import get_model_changes
+from .fast import get_fast_serializer
+from .planner import get_related_models, plan_queryset
+from .renderers import ORJSONRenderer
+from .serializers import Sparse
+
+
+class BaseModelViewSet(viewsets.ModelViewSet):
+    """
+    ModelViewSet that loads the relations its serializer nests, so list and
+    detail responses cost a fixed number of queries. Relations left out by
+    `?fields=`/`?expand=` are not loaded.
+
+    `?stream=1` returns the whole unpaginated list as a streamed JSON array,
+    read through a server-side cursor `stream_chunk_size` rows at a time.
+
+    Reads carry an ETag and Last-Modified derived from `updated_at` of the
+    rows and the last changes to the models they render, so unchanged lists and
+    objects are answered with a 304 before anything is serialized.
+    """
+
+    # Serve full (non-sparse) list reads from `.values()` rows through the
+    # compiled FastSerializer instead of the serializer class.
+    fast_read = False
+
+    stream_query_param = "stream"
+    stream_chunk_size = 500
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sparse = Sparse.from_request(self.request)
+        return plan_queryset(queryset, self.get_serializer_class(), sparse)
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_validators(self.get_validator_queryset())
+        return self.conditional(request, validators, self.get_list_response)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_validator_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        validators = self.get_validators(queryset)
+        return self.conditional(request, validators, super().retrieve)
+
+    def get_validator_queryset(self):
+        # Only the filter backends: the validator does not load the relations.
+        return super().filter_queryset(self.get_queryset())
+
+    def get_validators(self, queryset):
+        """
+        Return the `(etag, last_modified)` of a read, or None when there is
+        no row.
+
+        The rows are validated by their count and latest `updated_at`, read
+        from the (owner, -updated_at, -id) index. The relations the
+        representation renders are validated by when their models last
+        changed, from the cache, instead of being joined.
+        """
+        values = queryset.order_by().aggregate(
+            count=Count("pk"), updated_at=Max("updated_at")
+        )
+        if not values["count"]:
+            return None
+
+        sparse = Sparse.from_request(self.request)
+        models = get_related_models(self.get_serializer_class(), sparse=sparse)
+        changes = get_model_changes(models)
+        last_modified = max(
+            [values["updated_at"].timestamp(), *(change / 1e9 for change in changes)]
+        )
+        key = "|".join(
+            [
+                self.request.build_absolute_uri(),
+                str(self.request.user.pk),
+                self.request.accepted_media_type or "",
+                *(str(value) for value in [*values.values(), *changes]),
+            ]
+        )
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        return f"W/{etag}", int(last_modified)
+
+    def conditional(self, request, validators, respond):
+        if validators is None:
+            return respond(request, *self.args, **self.kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = respond(request, *self.args, **self.kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_list_response(self, request, *args, **kwargs):
+        if self.is_streaming(request):
+            return self.stream(request)
+
+        if not self.fast_read or Sparse.from_request(request) is not None:
+            return super().list(request, *args, **kwargs)
+
+        fast_serializer = get_fast_serializer(self.get_serializer_class())
+        queryset = fast_serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            data = fast_serializer.serialize(page, request)
+            return self.get_paginated_response(data)
+        return Response(fast_serializer.serialize(queryset, request))
+
+    def is_streaming(self, request):
+        value = request.query_params.get(self.stream_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    def stream(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.fast_read and Sparse.from_request(request) is None:
+            fast_serializer = get_fast_serializer(self.get_serializer_class())
+            rows = fast_serializer.values(queryset)
+
+            def serialize(batch):
+                return fast_serializer.serialize(batch, request)
+
+        else:
+            rows = queryset
+            serializer_class = self.get_serializer_class()
+            context = self.get_serializer_context()
+
+            def serialize(batch):
+                return serializer_class(batch, many=True, context=context).data
+
+        iterator = rows.iterator(chunk_size=self.stream_chunk_size)
+        return StreamingHttpResponse(
+            self.iter_json_array(map(serialize, self.iter_batches(iterator))),
+            content_type="application/json",
+        )
+
+    def iter_batches(self, iterator):
+        while batch := list(itertools.islice(iterator, self.stream_chunk_size)):
+            yield batch
+
+    def iter_json_array(self, batches):
+        """Yield a JSON array one chunk per batch, never holding the whole list."""
+        renderer = ORJSONRenderer()
+        opening = b"["
+        for batch in batches:
+            yield opening + b",".join(renderer.render(item) for item in batch)
+            opening = b","
+        yield b"[]" if opening == b"[" else b"]"